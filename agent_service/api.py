@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import hmac
 import logging
 import math
 import os
@@ -10,16 +11,16 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
 from fastapi import Body, Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from agent_service.config import get_settings
 from agent_service.database import get_db
 from agent_service.database.models import Meeting, Organization, Speaker, User, UserGmailCredentials
+from agent_service.clients import close_http_client, get_http_client, runpod_webhooks
 from agent_service.auth import (
 	verify_password,
 	get_password_hash,
@@ -28,6 +29,8 @@ from agent_service.auth import (
 )
 from agent_service.dependencies import get_current_user, get_current_organization
 from agent_service.service import AgentService
+from agent_service.utils import fast_json
+from agent_service.summarizers.summary_cache import summary_cache_stats
 from agent_service.services import NameSuggestionService, SpeakerService
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
@@ -38,9 +41,9 @@ from langchain_core.prompts import ChatPromptTemplate
 USE_RUNPOD = os.getenv("USE_RUNPOD", "true").lower() == "true"
 
 if USE_RUNPOD:
-    from agent_service.services.runpod_client import enqueue_meeting_processing, get_processing_status
+    from agent_service.services.runpod_client import enqueue_meeting_processing_async
 else:
-    from agent_service.services.processing_queue import enqueue_meeting_processing, get_processing_status
+    from agent_service.services.processing_queue import enqueue_meeting_processing_async
 from agent_service.services.s3_model_storage import configure_huggingface_cache_for_s3
 
 # Configure HuggingFace to use minimal local cache (models will be in S3)
@@ -208,6 +211,12 @@ settings = get_settings()
 service = AgentService(settings)
 
 
+@app.on_event("shutdown")
+async def close_shared_http_client() -> None:
+	"""Close the pooled HTTP client shared by Ivrit/RunPod calls."""
+	await close_http_client()
+
+
 @app.post("/process")
 async def process_audio(file: UploadFile = File(...)) -> JSONResponse:  # type: ignore[call-arg]
 	data = await file.read()
@@ -226,6 +235,12 @@ async def healthz() -> dict[str, str]:
 	return {"status": "ok"}
 
 
+@app.get("/metrics/summary_cache")
+async def summary_cache_metrics() -> dict[str, Any]:
+	"""Summary cache hit/miss counters for this process."""
+	return summary_cache_stats()
+
+
 # ---- Authentication Endpoints ----
 
 class RegisterRequest(BaseModel):
@@ -832,10 +847,9 @@ async def transcribe(request: Request, file: UploadFile | None = File(None)) ->
 					model = TranscribeUrlRequest(**body)
 					language = model.language
 					filename = model.filename or filename
-					async with httpx.AsyncClient(timeout=settings.request_timeout_seconds) as client:
-						resp = await client.get(model.url)
-						resp.raise_for_status()
-						data = resp.content
+					resp = await get_http_client(settings).get(model.url, timeout=settings.request_timeout_seconds)
+					resp.raise_for_status()
+					data = resp.content
 			except Exception as e:  # noqa: BLE001
 				raise HTTPException(status_code=400, detail=f"Provide a file upload, raw audio body, JSON with base64, or JSON with url. Error: {e}")
 
@@ -863,6 +877,7 @@ class AnalyzeRequest(BaseModel):
 	persona: str | None = None
 	length: str | None = None
 	speaker_segments: list[dict[str, Any]] | None = None
+	use_cache: bool = True  # False forces a fresh LLM call
 
 
 class MeetingUploadRequest(BaseModel):
@@ -884,6 +899,44 @@ def _extract_keypoints(markdown_text: str) -> list[str]:
 	return points[:10]
 
 
+# Disable proxy buffering so Server-Sent Events reach the client as they are produced
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse_event(event: str, data: Any) -> bytes:
+	"""Encode one Server-Sent Event (JSON data on a single line)."""
+	return b"event: " + event.encode("utf-8") + b"\ndata: " + fast_json.dumps(data) + b"\n\n"
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(req: AnalyzeRequest) -> StreamingResponse:
+	"""
+	Stream a summary as Server-Sent Events.
+
+	Emits `delta` events ({"delta": text}) as the model produces the summary, then a
+	`done` event with the full summary and key points (or an `error` event).
+	"""
+	speaker_segments = req.speaker_segments or None
+
+	async def _events():
+		logger = logging.getLogger(__name__)
+		parts: list[str] = []
+		try:
+			async for delta in service.summarizer.summarize_stream(
+				req.transcript, speaker_segments=speaker_segments, use_cache=req.use_cache
+			):
+				parts.append(delta)
+				yield _sse_event("delta", {"delta": delta})
+		except Exception as e:
+			logger.error(f"Streaming summary failed: {e}", exc_info=True)
+			yield _sse_event("error", {"detail": str(e)})
+			return
+		markdown = "".join(parts)
+		yield _sse_event("done", {"summary": markdown, "keyPoints": _extract_keypoints(markdown)})
+
+	return StreamingResponse(_events(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
 @app.post("/analyze")
 async def analyze(req: AnalyzeRequest) -> JSONResponse:
 	# Parse speaker_segments if provided in the request
@@ -894,7 +947,9 @@ async def analyze(req: AnalyzeRequest) -> JSONResponse:
 		# Support legacy format where transcript might be a dict with segments
 		speaker_segments = req.transcript.get("speaker_segments")
 
-	result = await service.summarizer.summarize(req.transcript, speaker_segments=speaker_segments)
+	result = await service.summarizer.summarize(
+		req.transcript, speaker_segments=speaker_segments, use_cache=req.use_cache
+	)
 	markdown = result.text
 	key_points = _extract_keypoints(markdown)
 	run_id = f"nvidia-{uuid.uuid4()}"
@@ -922,6 +977,7 @@ async def analyze(req: AnalyzeRequest) -> JSONResponse:
 async def upload_meeting(
 	file: UploadFile = File(...),
 	title: str = Form(""),
+	diarization_backend: str | None = Form(None),
 	current_user: User = Depends(get_current_user),
 	organization: Organization = Depends(get_current_organization),
 	db: Session = Depends(get_db),
@@ -930,29 +986,40 @@ async def upload_meeting(
 	Upload a new audio file for processing.
 	Requires authentication - uses organization from logged-in user.
 	Creates a meeting record and triggers async processing.
+	Optional `diarization_backend` form field ("pyannote", "lightweight" or "guided")
+	selects the local diarization backend for this job.
 	"""
 	import boto3
-	from agent_service.config import get_settings
+	from agent_service.config import DIARIZATION_BACKENDS, get_settings
 	from agent_service.services.orchestrator import ProcessingOrchestrator
 	import logging
 
 	logger = logging.getLogger(__name__)
 
+	# Reject unknown backends here; the worker would otherwise fail the whole job
+	if diarization_backend is not None:
+		diarization_backend = diarization_backend.strip().lower() or None
+	if diarization_backend is not None and diarization_backend not in DIARIZATION_BACKENDS:
+		raise HTTPException(
+			status_code=400,
+			detail=f"Unsupported diarization_backend {diarization_backend!r}; expected one of: {', '.join(DIARIZATION_BACKENDS)}",
+		)
+
 	try:
 		settings = get_settings()
 		# Use organization from authenticated user
 		org_id = organization.id
 
-		# Save audio to S3 or local storage
+		# Save audio to S3 or local storage, streaming from the spooled upload
+		# (never holding the whole recording in memory)
 		audio_s3_key = None
-		audio_bytes = None
 		import os
+		import shutil
 
 		if file:
-			logger.info(f"Reading uploaded file: {file.filename}, size: {file.size if hasattr(file, 'size') else 'unknown'}")
-			audio_bytes = await file.read()
-			logger.info(f"Read {len(audio_bytes)/(1024*1024):.1f}MB from uploaded file")
-			
+			logger.info(f"Streaming uploaded file: {file.filename}, size: {file.size if hasattr(file, 'size') else 'unknown'}")
+			await file.seek(0)
+
 			# Upload to S3 if configured
 			if settings.s3_bucket:
 				logger.info(f"Uploading to S3 bucket: {settings.s3_bucket}")
@@ -963,11 +1030,12 @@ async def upload_meeting(
 					aws_secret_access_key=settings.aws_secret_access_key,
 				)
 				audio_s3_key = f"meetings/{org_id}/{uuid.uuid4()}/{file.filename or 'audio.wav'}"
-				s3_client.put_object(
-					Bucket=settings.s3_bucket,
-					Key=audio_s3_key,
-					Body=audio_bytes,
-					ContentType=file.content_type or "audio/wav",
+				await asyncio.to_thread(
+					s3_client.upload_fileobj,
+					file.file,
+					settings.s3_bucket,
+					audio_s3_key,
+					ExtraArgs={"ContentType": file.content_type or "audio/wav"},
 				)
 				logger.info(f"Successfully uploaded to S3: {audio_s3_key}")
 			else:
@@ -978,7 +1046,7 @@ async def upload_meeting(
 				temp_meeting_id = uuid.uuid4()
 				local_path = f"{uploads_dir}/{temp_meeting_id}_{file.filename or 'audio.wav'}"
 				with open(local_path, "wb") as f:
-					f.write(audio_bytes)
+					await asyncio.to_thread(shutil.copyfileobj, file.file, f)
 				# Store absolute path to avoid working directory issues
 				audio_s3_key = os.path.abspath(local_path)
 				logger.info(f"Saved to local storage: {audio_s3_key}")
@@ -1013,10 +1081,11 @@ async def upload_meeting(
 			db.commit()
 
 		# Trigger async processing
-		task_id = enqueue_meeting_processing(
+		task_id = await enqueue_meeting_processing_async(
 			meeting_id=meeting.id,
 			organization_id=org_id,
 			audio_s3_key=audio_s3_key,
+			diarization_backend=diarization_backend,
 		)
 
 		logger.info(f"Meeting {meeting.id} uploaded successfully, task {task_id} enqueued")
@@ -1037,6 +1106,28 @@ async def upload_meeting(
 		raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.post("/webhooks/runpod")
+async def runpod_webhook(payload: dict[str, Any] = Body(...), token: str | None = None) -> JSONResponse:
+	"""
+	Receive RunPod job completion pushes (configured via ivrit_runpod_webhook_url).
+
+	Resolves the transcription waiting on the job in this process, and publishes the
+	result to Redis for waiters in other processes (e.g. Celery workers). Requires
+	ivrit_runpod_webhook_secret; without it the endpoint accepts nothing.
+	"""
+	secret = settings.ivrit_runpod_webhook_secret
+	if not secret:
+		raise HTTPException(status_code=404, detail="RunPod webhooks are not enabled")
+	if not hmac.compare_digest(token or "", secret):
+		raise HTTPException(status_code=401, detail="Invalid webhook token")
+	try:
+		delivered = await runpod_webhooks.deliver_completion(payload)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	logger.info(f"RunPod webhook for job {payload.get('id')}: status={payload.get('status')}, delivered={delivered}")
+	return JSONResponse({"received": True})
+
+
 @app.get("/meetings")
 async def list_meetings(
 	status: str | None = None,
@@ -1262,17 +1353,17 @@ async def get_meeting_transcript(
 	).order_by(TranscriptionSegment.start_time_seconds).all()
 
 	transcript_segments = [
-		{
-			"start": seg.start_time_seconds,
-			"end": seg.end_time_seconds,
-			"text": seg.hebrew_text,
-			"speaker": seg.unidentified_speaker_label,
-			"speaker_id": str(seg.speaker_id) if seg.speaker_id else None,
-		}
+		fast_json.make_segment(
+			start=seg.start_time_seconds,
+			end=seg.end_time_seconds,
+			text=seg.hebrew_text,
+			speaker=seg.unidentified_speaker_label,
+			speaker_id=str(seg.speaker_id) if seg.speaker_id else None,
+		)
 		for seg in segments
 	]
 
-	return JSONResponse(
+	return fast_json.FastJSONResponse(
 		{
 			"meeting_id": meeting_id,
 			"transcript_segments": transcript_segments,
@@ -1311,6 +1402,92 @@ async def get_meeting_summary(
 	)
 
 
+@app.get("/meetings/{meeting_id}/summary/stream")
+async def stream_meeting_summary(
+	meeting_id: str,
+	current_user: User = Depends(get_current_user),
+	db: Session = Depends(get_db),
+) -> StreamingResponse:
+	"""
+	Stream a meeting summary as Server-Sent Events. Requires authentication.
+
+	An existing summary is sent as a single `done` event. Otherwise the summary is
+	generated from the stored transcript, forwarded as `delta` events, and persisted
+	when the stream completes.
+	"""
+	from agent_service.database import MeetingSummary, TranscriptionSegment, get_db_session
+
+	meeting_uuid = uuid.UUID(meeting_id)
+	meeting = db.get(Meeting, meeting_uuid)
+	if not meeting:
+		raise HTTPException(status_code=404, detail="Meeting not found")
+	
+	# Verify meeting belongs to user's organization
+	if meeting.organization_id != current_user.organization_id:
+		raise HTTPException(status_code=403, detail="Meeting does not belong to your organization")
+
+	existing = db.query(MeetingSummary).filter(MeetingSummary.meeting_id == meeting_uuid).first()
+	if existing:
+		summary_json = existing.summary_json
+
+		async def _existing():
+			yield _sse_event("done", {"meeting_id": meeting_id, "summary": summary_json})
+
+		return StreamingResponse(_existing(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+	segments = db.query(TranscriptionSegment).filter(
+		TranscriptionSegment.meeting_id == meeting_uuid
+	).order_by(TranscriptionSegment.start_time_seconds).all()
+	if not segments:
+		raise HTTPException(status_code=404, detail="Transcript not found for this meeting")
+
+	# Group stored segments by speaker (the summarizer's speaker_segments format), labelled
+	# like the transcript endpoints: the identified speaker's name, else the SPK_* label
+	speaker_ids = {seg.speaker_id for seg in segments if seg.speaker_id}
+	speaker_names = {
+		speaker_id: name
+		for speaker_id, name in db.query(Speaker.id, Speaker.name).filter(Speaker.id.in_(speaker_ids))
+	} if speaker_ids else {}
+	groups: dict[str, list[dict[str, Any]]] = {}
+	for seg in segments:
+		label = speaker_names.get(seg.speaker_id) or seg.unidentified_speaker_label or "SPK_UNKNOWN"
+		groups.setdefault(label, []).append(
+			{"start": seg.start_time_seconds, "end": seg.end_time_seconds, "text": seg.hebrew_text or ""}
+		)
+	speaker_segments = [{"speaker": label, "segments": segs} for label, segs in groups.items()]
+	transcript_text = " ".join(seg.hebrew_text or "" for seg in segments)
+
+	async def _events():
+		logger = logging.getLogger(__name__)
+		parts: list[str] = []
+		try:
+			async for delta in service.summarizer.summarize_stream(transcript_text, speaker_segments=speaker_segments):
+				parts.append(delta)
+				yield _sse_event("delta", {"delta": delta})
+		except Exception as e:
+			logger.error(f"Streaming summary for meeting {meeting_id} failed: {e}", exc_info=True)
+			yield _sse_event("error", {"detail": str(e)})
+			return
+
+		markdown = "".join(parts)
+		summary_data = {
+			"summary": markdown,
+			"keyPoints": _extract_keypoints(markdown),
+			"actionItems": [],
+			"speakerAware": True,
+		}
+		try:
+			# The request's session is closed once streaming starts; use a fresh one
+			with get_db_session() as session:
+				if not session.query(MeetingSummary).filter(MeetingSummary.meeting_id == meeting_uuid).first():
+					session.add(MeetingSummary(meeting_id=meeting_uuid, summary_json=summary_data))
+		except Exception as e:
+			logger.error(f"Failed to persist streamed summary for meeting {meeting_id}: {e}", exc_info=True)
+		yield _sse_event("done", {"meeting_id": meeting_id, "summary": summary_data})
+
+	return StreamingResponse(_events(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
 @app.get("/meetings/{meeting_id}/communication_health")
 async def get_meeting_communication_health(
 	meeting_id: str,
@@ -1392,7 +1569,7 @@ async def get_meeting_communication_health(
 		"error": None,
 	}
 	
-	final_state = asr_workflow.invoke(initial_state)
+	final_state = await asr_workflow.ainvoke(initial_state)
 	
 	return JSONResponse(
 		{
@@ -1606,7 +1783,7 @@ async def analyze_retail(
 	Analyze retail data (CSV/Excel) using XGBoost.
 	Requires authentication.
 	"""
-	from agent_service.xg_agent.agent import create_agent_workflow
+	from agent_service.xg_agent.agent import get_compiled_workflow
 	from agent_service.xg_agent.data_processing import load_and_preprocess_data
 	import tempfile
 	import os
@@ -1627,9 +1804,8 @@ async def analyze_retail(
 		# Load and preprocess data
 		df = load_and_preprocess_data(tmp_path)
 		
-		# Create and run the agent workflow
-		workflow = create_agent_workflow(mode="retail")
-		app_workflow = workflow.compile()
+		# Run the agent workflow (compiled once per process)
+		app_workflow = get_compiled_workflow(mode="retail")
 		
 		initial_state = {
 			"data": df.to_dict(),
@@ -1647,7 +1823,7 @@ async def analyze_retail(
 			"engineered_features": {}
 		}
 		
-		final_state = app_workflow.invoke(initial_state)
+		final_state = await app_workflow.ainvoke(initial_state)
 		
 		return RetailAnalysisResponse(
 			summary=final_state["summary"],
@@ -1671,12 +1847,11 @@ async def analyze_emails(
 	Analyze emails from Gmail using XG Agent workflow.
 	Requires authentication and Gmail credentials configured.
 	"""
-	from agent_service.xg_agent.agent import create_agent_workflow
+	from agent_service.xg_agent.agent import get_compiled_workflow
 	
 	try:
-		# Create and run the email analysis workflow
-		workflow = create_agent_workflow(mode="email")
-		app_workflow = workflow.compile()
+		# Run the email analysis workflow (compiled once per process)
+		app_workflow = get_compiled_workflow(mode="email")
 		
 		initial_state = {
 			"data": {},
@@ -1696,7 +1871,7 @@ async def analyze_emails(
 			"user_id": str(current_user.id)  # Pass user_id for Gmail credentials lookup
 		}
 		
-		final_state = app_workflow.invoke(initial_state)
+		final_state = await app_workflow.ainvoke(initial_state)
 		
 		return EmailAnalysisResponse(
 			emails_count=len(final_state["emails"]),
@@ -1725,14 +1900,13 @@ async def run_retail_workflow(
 	Run retail analysis workflow.
 	Requires authentication.
 	"""
-	from agent_service.xg_agent.agent import create_agent_workflow
+	from agent_service.xg_agent.agent import get_compiled_workflow
 	import uuid
 	
 	workflow_id = str(uuid.uuid4())
 	
 	try:
-		workflow = create_agent_workflow(mode="retail")
-		app_workflow = workflow.compile()
+		app_workflow = get_compiled_workflow(mode="retail")
 		
 		initial_state = {
 			"data": request.data or {},
@@ -1747,7 +1921,7 @@ async def run_retail_workflow(
 			"email_summary": ""
 		}
 		
-		final_state = app_workflow.invoke(initial_state)
+		final_state = await app_workflow.ainvoke(initial_state)
 		
 		return WorkflowResponse(
 			workflow_id=workflow_id,
@@ -1777,14 +1951,13 @@ async def run_email_workflow(
 	Run email analysis workflow.
 	Requires authentication and Gmail credentials.
 	"""
-	from agent_service.xg_agent.agent import create_agent_workflow
+	from agent_service.xg_agent.agent import get_compiled_workflow
 	import uuid
 	
 	workflow_id = str(uuid.uuid4())
 	
 	try:
-		workflow = create_agent_workflow(mode="email")
-		app_workflow = workflow.compile()
+		app_workflow = get_compiled_workflow(mode="email")
 		
 		initial_state = {
 			"data": {},
@@ -1804,7 +1977,7 @@ async def run_email_workflow(
 			"user_id": str(current_user.id)  # Pass user_id for Gmail credentials lookup
 		}
 		
-		final_state = app_workflow.invoke(initial_state)
+		final_state = await app_workflow.ainvoke(initial_state)
 		
 		return WorkflowResponse(
 			workflow_id=workflow_id,
@@ -1923,7 +2096,7 @@ async def run_meeting_workflow(
 		# Run workflow starting from summarize node (skip audio processing)
 		# Actually, we should run the full workflow but it will skip audio nodes if segments already exist
 		# Let's run from preprocess_transcript by invoking with the state already set
-		final_state = asr_workflow.invoke(initial_state)
+		final_state = await asr_workflow.ainvoke(initial_state)
 		
 		# Extract communication health results
 		return WorkflowResponse(
@@ -12,10 +12,7 @@ from pathlib import Path
 from typing import Any
 
 from agent_service.service import AgentService
-from agent_service.clients.ivrit_client import (
-	_extract_runpod_output_text,
-	_extract_runpod_segments,
-)
+from agent_service.clients.ivrit_client import normalize_transcription_payload
 
 
 def _format_srt_timestamp(seconds: float) -> str:
@@ -70,9 +67,8 @@ def _load_transcript_file(path: Path) -> tuple[str, list[dict[str, Any]] | None]
 			try:
 				payload = ast.literal_eval(text_val)
 				# Extract text + segments from payload using client helpers
-				text_parsed = _extract_runpod_output_text(payload)
-				segments_parsed = _extract_runpod_segments(payload)
-				return text_parsed or "", segments_parsed
+				parsed = normalize_transcription_payload(payload)
+				return parsed.text or "", parsed.segments
 			except Exception:
 				pass
 		return (text_val if isinstance(text_val, str) else str(text_val)), (segments if isinstance(segments, list) else None)
@@ -88,6 +84,7 @@ def main() -> None:
 	parser.add_argument("--out-dir", help="Directory to write outputs (defaults to the audio file directory)")
 	parser.add_argument("--variant", help="Optional variant suffix to append to filenames (e.g., v2)")
 	parser.add_argument("--from-transcript", help="Reuse an existing transcript file (.json or .txt); skips transcription")
+	parser.add_argument("--no-cache", action="store_true", help="Ignore cached summaries and call the LLM again")
 	args = parser.parse_args()
 
 	p = Path(args.path)
@@ -102,7 +99,7 @@ def main() -> None:
 			if not transcript_path.exists():
 				raise FileNotFoundError(f"Transcript file not found: {transcript_path}")
 			transcript_text, segments = _load_transcript_file(transcript_path)
-			summary = await service.summarizer.summarize(transcript_text)
+			summary = await service.summarizer.summarize(transcript_text, use_cache=not args.no_cache)
 			print("=== TRANSCRIPT (reused) ===")
 			print(transcript_text)
 			print("\n=== SUMMARY ===")
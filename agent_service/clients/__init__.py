@@ -1,7 +1,11 @@
-from .ivrit_client import IvritClient, IvritTranscriptionError
+from .ivrit_client import IvritClient, IvritTranscriptionError, close_http_client, get_http_client
+from .runpod_jobs import RunPodJobClient, RunPodJobError
 
 __all__ = [
 	"IvritClient",
 	"IvritTranscriptionError",
+	"RunPodJobClient",
+	"RunPodJobError",
+	"close_http_client",
+	"get_http_client",
 ]
-
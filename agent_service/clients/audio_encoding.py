@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import logging
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Sample rate the ASR model consumes; uploading more is wasted bandwidth
+UPLOAD_SAMPLE_RATE = 16000
+
+_CODECS = ("auto", "flac", "opus", "none")
+_FORMATS = {
+	"flac": ("FLAC", "PCM_16", ".flac"),
+	"opus": ("OGG", "OPUS", ".ogg"),
+	"none": ("WAV", "PCM_16", ".wav"),
+}
+
+
+def encode_for_upload(
+	samples: Any,
+	sample_rate: int,
+	codec: str = "auto",
+	max_bytes: int | None = None,
+) -> tuple[bytes, str]:
+	"""
+	Encode mono samples for upload according to the codec policy.
+
+	Policy:
+		- "auto": lossless FLAC; Opus only if FLAC would exceed `max_bytes`
+		- "flac" / "opus": always that codec
+		- "none": 16-bit PCM WAV
+
+	Args:
+		samples: Mono float samples at `sample_rate` (should be 16 kHz)
+		sample_rate: Sample rate of `samples`
+		codec: Codec policy
+		max_bytes: Size budget (e.g. the RunPod blob threshold) used by "auto"
+
+	Returns:
+		Tuple of (encoded bytes, file extension including the dot)
+
+	Raises:
+		ValueError: If the codec is unknown
+	"""
+	if codec not in _CODECS:
+		raise ValueError(f"Unsupported upload codec: {codec} (expected one of {', '.join(_CODECS)})")
+
+	encoded, extension = _encode(samples, sample_rate, "flac" if codec == "auto" else codec)
+	if codec == "auto" and max_bytes is not None and len(encoded) > max_bytes:
+		logger.info(f"FLAC upload is {len(encoded) / (1024 * 1024):.1f}MB (over budget), using Opus")
+		encoded, extension = _encode(samples, sample_rate, "opus")
+	return encoded, extension
+
+
+@lru_cache(maxsize=1)
+def transcoding_available() -> bool:
+	"""True if librosa and soundfile are installed (checked once per process)."""
+	missing = [name for name in ("librosa", "soundfile") if importlib.util.find_spec(name) is None]
+	if missing:
+		logger.info(f"Upload transcoding disabled ({', '.join(missing)} not installed); sending original audio")
+		return False
+	return True
+
+
+def transcode_for_upload(
+	data: bytes,
+	filename: str,
+	codec: str = "auto",
+	max_bytes: int | None = None,
+) -> tuple[bytes, str]:
+	"""
+	Re-encode an audio file as 16 kHz mono for upload.
+
+	The original is kept when the policy is "none", when the audio stack (librosa,
+	soundfile) is not installed (e.g. the API image, see requirements-cpu.txt), when
+	decoding fails, or when the re-encoded audio would not be smaller (e.g. an already
+	compact MP3 under budget).
+
+	Args:
+		data: Original audio bytes
+		filename: Original file name (extension is replaced on re-encoding)
+		codec: Codec policy (see encode_for_upload)
+		max_bytes: Size budget used by the "auto" policy
+
+	Returns:
+		Tuple of (bytes to upload, file name to send)
+	"""
+	if codec == "none" or not data:
+		return data, filename
+	if not transcoding_available():
+		return data, filename
+
+	try:
+		from agent_service.services.audio_processor import AudioProcessor
+
+		samples, sample_rate = AudioProcessor(default_sample_rate=UPLOAD_SAMPLE_RATE).load_audio(audio_bytes=data)
+		encoded, extension = encode_for_upload(samples, sample_rate, codec=codec, max_bytes=max_bytes)
+	except (ImportError, RuntimeError, ValueError) as e:
+		logger.warning(f"Could not transcode {filename} for upload, sending original: {e}")
+		return data, filename
+
+	if len(encoded) >= len(data) and (max_bytes is None or len(data) <= max_bytes):
+		logger.debug(f"Keeping original {filename}: re-encoded audio is not smaller")
+		return data, filename
+
+	stem = filename.rsplit(".", 1)[0] if "." in filename else filename
+	logger.info(
+		f"Transcoded {filename} for upload: {len(data) / (1024 * 1024):.1f}MB -> "
+		f"{len(encoded) / (1024 * 1024):.1f}MB ({extension[1:]})"
+	)
+	return encoded, f"{stem}{extension}"
+
+
+def _encode(samples: Any, sample_rate: int, codec: str) -> tuple[bytes, str]:
+	import numpy as np
+	import soundfile as sf
+
+	audio_format, subtype, extension = _FORMATS[codec]
+	buffer = io.BytesIO()
+	sf.write(buffer, np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0), sample_rate, format=audio_format, subtype=subtype)
+	return buffer.getvalue(), extension
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from agent_service.utils.frame_energy import frame_energy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AudioChunk:
+	"""
+	One chunk of a long recording submitted as its own transcription job.
+
+	`start`/`end` are the audio actually sent (including overlap padding);
+	`own_start`/`own_end` is the region this chunk is authoritative for when stitching.
+	"""
+
+	index: int
+	start: float
+	end: float
+	own_start: float
+	own_end: float
+
+
+def plan_chunks(
+	audio: np.ndarray,
+	sample_rate: int,
+	min_chunk_seconds: float = 300.0,
+	max_chunk_seconds: float = 600.0,
+	overlap_seconds: float = 5.0,
+	frame_seconds: float = 0.05,
+) -> list[AudioChunk]:
+	"""
+	Split a recording into chunks cut at the quietest point between min and max length.
+
+	Args:
+		audio: Mono audio samples
+		sample_rate: Sample rate of `audio`
+		min_chunk_seconds: Minimum chunk length before a cut is considered
+		max_chunk_seconds: Maximum chunk length
+		overlap_seconds: Audio added on each side of a cut so words at the boundary are
+			fully heard by both neighbouring chunks
+		frame_seconds: Energy frame length used to locate silences
+
+	Returns:
+		Chunks ordered by time (a single chunk if the audio is short)
+	"""
+	duration = len(audio) / float(sample_rate)
+	if duration <= max_chunk_seconds:
+		return [AudioChunk(index=0, start=0.0, end=duration, own_start=0.0, own_end=duration)]
+
+	# Frame energy (dB); smoothed over ~0.5 s so cuts land in pauses, not between phonemes
+	frame_length = max(1, int(frame_seconds * sample_rate))
+	n_frames = len(audio) // frame_length
+	energy_db = 10 * np.log10(frame_energy(audio, frame_length, frame_length) + 1e-10)
+	smooth = max(1, int(0.5 / frame_seconds))
+	energy_db = np.convolve(energy_db, np.ones(smooth) / smooth, mode="same")
+
+	cuts = [0.0]
+	while duration - cuts[-1] > max_chunk_seconds:
+		window_start = int((cuts[-1] + min_chunk_seconds) / frame_seconds)
+		window_end = min(int((cuts[-1] + max_chunk_seconds) / frame_seconds), n_frames)
+		if window_end <= window_start:
+			cuts.append(min(cuts[-1] + max_chunk_seconds, duration))
+			continue
+		quietest = window_start + int(np.argmin(energy_db[window_start:window_end]))
+		cuts.append((quietest + 0.5) * frame_seconds)
+	cuts.append(duration)
+
+	chunks = []
+	for i in range(len(cuts) - 1):
+		chunks.append(
+			AudioChunk(
+				index=i,
+				start=max(0.0, cuts[i] - overlap_seconds),
+				end=min(duration, cuts[i + 1] + overlap_seconds),
+				own_start=cuts[i],
+				own_end=cuts[i + 1],
+			)
+		)
+	logger.info(
+		f"Planned {len(chunks)} chunks for {duration:.0f}s of audio "
+		f"(cuts at {', '.join(f'{cut:.0f}s' for cut in cuts[1:-1])})"
+	)
+	return chunks
+
+
+def stitch_chunk_segments(
+	chunks: list[AudioChunk],
+	chunk_segments: list[list[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+	"""
+	Re-stitch per-chunk transcription segments into one timeline.
+
+	Timestamps are shifted by each chunk's start offset. Each chunk only keeps the
+	segments whose midpoint lies in its own region, so text heard by both chunks in
+	an overlap is kept exactly once. Chunk-local speaker labels are mapped onto the
+	labels already assigned by earlier chunks using their co-occurrence in the
+	overlap region; speakers with no counterpart get new labels.
+
+	Args:
+		chunks: Chunk plan (same order as `chunk_segments`)
+		chunk_segments: Segments returned for each chunk (chunk-relative times)
+
+	Returns:
+		Stitched segments ordered by start time, with global speaker labels
+	"""
+	stitched: list[dict[str, Any]] = []
+	previous: list[dict[str, Any]] = []
+	n_speakers = 0
+
+	for chunk, segments in zip(chunks, chunk_segments):
+		shifted = [_shift_segment(seg, chunk.start) for seg in segments or []]
+
+		# Map this chunk's labels to global ones through the overlap with the previous chunk
+		mapping: dict[str, str] = {}
+		if previous:
+			overlap_start, overlap_end = chunk.start, chunk.own_start + (chunk.own_start - chunk.start)
+			cooccurrence: dict[tuple[str, str], float] = {}
+			for seg in shifted:
+				for prev in previous:
+					shared = min(seg["end"], prev["end"], overlap_end) - max(seg["start"], prev["start"], overlap_start)
+					if shared > 0:
+						key = (_speaker(seg), prev["speaker"])
+						cooccurrence[key] = cooccurrence.get(key, 0.0) + shared
+			used: set[str] = set()
+			for (local, global_label), _ in sorted(cooccurrence.items(), key=lambda item: -item[1]):
+				if local not in mapping and global_label not in used:
+					mapping[local] = global_label
+					used.add(global_label)
+
+		kept = []
+		for seg in shifted:
+			local = _speaker(seg)
+			if local not in mapping:
+				n_speakers += 1
+				mapping[local] = f"SPK_{n_speakers}"
+			seg["speaker"] = mapping[local]
+			midpoint = (seg["start"] + seg["end"]) / 2
+			if chunk.own_start <= midpoint < chunk.own_end or (
+				chunk.index == len(chunks) - 1 and midpoint >= chunk.own_end
+			):
+				kept.append(seg)
+
+		stitched.extend(kept)
+		previous = shifted
+
+	stitched.sort(key=lambda seg: seg["start"])
+	return stitched
+
+
+def _speaker(seg: dict[str, Any]) -> str:
+	label = seg.get("speaker") or seg.get("speaker_label")
+	if isinstance(label, (int, float)):
+		return f"SPK_{int(label)}"
+	return label or "SPK_0"
+
+
+def _shift_segment(seg: dict[str, Any], offset: float) -> dict[str, Any]:
+	"""Copy a segment with start/end (and word timings) shifted by `offset` seconds."""
+	shifted = dict(seg)
+	shifted["speaker"] = _speaker(seg)
+	shifted["start"] = float(seg.get("start", 0)) + offset
+	shifted["end"] = float(seg.get("end", seg.get("start", 0))) + offset
+	words = seg.get("words")
+	if isinstance(words, list):
+		shifted["words"] = [
+			{
+				**word,
+				**{key: float(word[key]) + offset for key in ("start", "end") if isinstance(word.get(key), (int, float))},
+			}
+			if isinstance(word, dict)
+			else word
+			for word in words
+		]
+	return shifted
@@ -1,36 +1,225 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import io
+import logging
+import mimetypes
+import random
+import uuid
+import wave
+from typing import Any, AsyncIterator, BinaryIO, Iterator, TypedDict
 import base64
 import json
 import asyncio
 
 import httpx
 
+from agent_service.clients import runpod_webhooks
+from agent_service.clients.audio_encoding import encode_for_upload, transcode_for_upload
+from agent_service.clients.transcription_cache import TranscriptionCache, sha256_bytes, sha256_file
+from agent_service.clients.chunked_transcription import AudioChunk, plan_chunks, stitch_chunk_segments
 from agent_service.config import Settings, TranscriptionResult, get_settings
+from agent_service.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+# For large files, use URL instead of base64 to avoid request size limits
+# Estimate: base64 encoding increases size by ~33%, and JSON has overhead
+# So ~35MB raw file ≈ ~47MB base64, which is close to typical 50MB limits
+FILE_SIZE_THRESHOLD = 35 * 1024 * 1024  # 35MB
+
+# Process-wide pooled client, bound to the event loop it was created on
+_shared_client: httpx.AsyncClient | None = None
+_shared_client_loop: asyncio.AbstractEventLoop | None = None
 
 
 class IvritTranscriptionError(Exception):
 	pass
 
 
+def get_http_client(settings: Settings | None = None) -> httpx.AsyncClient:
+	"""
+	Return the shared, pooled httpx.AsyncClient for the running event loop.
+
+	Connections (and TLS sessions) are kept alive across requests instead of being
+	re-established per call. httpx clients cannot be used across event loops, so a
+	new client is created if the running loop changed (the previous one is closed
+	if its loop is still usable).
+
+	Args:
+		settings: Settings used for pool limits and timeouts (global settings if None)
+
+	Returns:
+		Shared httpx.AsyncClient
+	"""
+	global _shared_client, _shared_client_loop
+	loop = asyncio.get_running_loop()
+	if _shared_client is not None and not _shared_client.is_closed and _shared_client_loop is loop:
+		return _shared_client
+
+	if _shared_client is not None and not _shared_client.is_closed:
+		old_client, old_loop = _shared_client, _shared_client_loop
+		if old_loop is not None and not old_loop.is_closed() and old_loop.is_running():
+			asyncio.run_coroutine_threadsafe(old_client.aclose(), old_loop)
+
+	s = settings or get_settings()
+	http2 = s.ivrit_http2
+	if http2:
+		try:
+			import h2  # noqa: F401
+		except ImportError:
+			logger.warning("ivrit_http2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+			http2 = False
+
+	_shared_client = httpx.AsyncClient(
+		http2=http2,
+		limits=httpx.Limits(
+			max_connections=s.ivrit_http_max_connections,
+			max_keepalive_connections=s.ivrit_http_max_keepalive_connections,
+			keepalive_expiry=s.ivrit_http_keepalive_expiry_seconds,
+		),
+		timeout=httpx.Timeout(s.request_timeout_seconds, connect=s.ivrit_connect_timeout_seconds),
+	)
+	_shared_client_loop = loop
+	logger.info(
+		f"Created shared HTTP client (http2={http2}, max_connections={s.ivrit_http_max_connections})"
+	)
+	return _shared_client
+
+
+async def close_http_client() -> None:
+	"""Close the shared HTTP client (call on application/worker shutdown)."""
+	global _shared_client, _shared_client_loop
+	if _shared_client is not None and not _shared_client.is_closed:
+		await _shared_client.aclose()
+	_shared_client = None
+	_shared_client_loop = None
+
+
 class IvritClient:
-	def __init__(self, settings: Settings | None = None) -> None:
+	def __init__(
+		self,
+		settings: Settings | None = None,
+		http_client: httpx.AsyncClient | None = None,
+		cache: TranscriptionCache | None = None,
+	) -> None:
 		self.settings = settings or get_settings()
+		# Injected client (caller owns its lifecycle); otherwise the shared pooled client is used
+		self._http_client = http_client
+		self.cache = cache or TranscriptionCache(self.settings)
+
+	@property
+	def http_client(self) -> httpx.AsyncClient:
+		return self._http_client or get_http_client(self.settings)
 
-	async def transcribe_file(self, file_path: str, language: str | None = None) -> TranscriptionResult:
-		with open(file_path, "rb") as f:
-			data = f.read()
-			filename = file_path.split("/")[-1]
-		return await self.transcribe_bytes(data=data, filename=filename, language=language)
+	def _upload_timeout(self) -> httpx.Timeout:
+		s = self.settings
+		return httpx.Timeout(s.ivrit_upload_timeout_seconds, connect=s.ivrit_connect_timeout_seconds)
+
+	def _poll_timeout(self) -> httpx.Timeout:
+		s = self.settings
+		return httpx.Timeout(s.ivrit_poll_timeout_seconds, connect=s.ivrit_connect_timeout_seconds)
+
+	async def transcribe_file(
+		self, file_path: str, language: str | None = None, duration_seconds: float | None = None
+	) -> TranscriptionResult:
+		filename = file_path.split("/")[-1]
+
+		async def _transcribe() -> TranscriptionResult:
+			with open(file_path, "rb") as f:
+				return await self.transcribe_stream(
+					f, filename=filename, language=language, duration_seconds=duration_seconds, use_cache=False
+				)
+
+		if not self.cache.enabled and not self.settings.transcription_single_flight:
+			return await _transcribe()
+		cache_key = self.cache.make_key(await asyncio.to_thread(sha256_file, file_path), language)
+		return await self.cache.get_or_compute(cache_key, _transcribe)
+
+	async def transcribe_stream(
+		self,
+		stream: BinaryIO | AsyncIterator[bytes],
+		filename: str = "audio.wav",
+		language: str | None = None,
+		duration_seconds: float | None = None,
+		use_cache: bool = True,
+	) -> TranscriptionResult:
+		"""
+		Transcribe audio read incrementally from a file handle or async byte iterator.
+
+		For the direct Ivrit endpoint the audio is streamed as a chunked multipart
+		request body, so memory stays flat regardless of recording size. RunPod jobs
+		take the audio as a base64 blob inside a JSON body, so the stream is read
+		fully in that case.
+
+		Args:
+			stream: Binary file handle (read in a thread) or async iterator of byte chunks
+			filename: File name sent with the upload
+			language: Transcription language (defaults to settings.ivrit_language)
+			duration_seconds: Audio duration, if known (used to pace RunPod polling)
+			use_cache: Consult the transcription cache when the audio ends up in memory
+				(RunPod path); streamed direct uploads are not hashed
+
+		Returns:
+			TranscriptionResult
+		"""
+		chunks = stream if hasattr(stream, "__aiter__") else _iter_file(stream)
+		if self.settings.ivrit_runpod_endpoint_id:
+			data = b"".join([chunk async for chunk in chunks])
+			return await self.transcribe_bytes(
+				data=data,
+				filename=filename,
+				language=language,
+				duration_seconds=duration_seconds,
+				use_cache=use_cache,
+			)
+		return await self._transcribe_direct(chunks, filename=filename, language=language)
+
+	async def transcribe_bytes(
+		self,
+		data: bytes,
+		filename: str = "audio.wav",
+		language: str | None = None,
+		duration_seconds: float | None = None,
+		use_cache: bool = True,
+	) -> TranscriptionResult:
+		async def _transcribe() -> TranscriptionResult:
+			return await self._transcribe_bytes(
+				data=data, filename=filename, language=language, duration_seconds=duration_seconds
+			)
 
-	async def transcribe_bytes(self, data: bytes, filename: str = "audio.wav", language: str | None = None) -> TranscriptionResult:
+		if not use_cache or (not self.cache.enabled and not self.settings.transcription_single_flight):
+			return await _transcribe()
+		# Content-hash cache is checked before any network call; identical concurrent
+		# requests (double submit, task redelivery) share one in-flight transcription
+		cache_key = self.cache.make_key(await asyncio.to_thread(sha256_bytes, data), language)
+		return await self.cache.get_or_compute(cache_key, _transcribe)
+
+	async def _transcribe_bytes(
+		self,
+		data: bytes,
+		filename: str,
+		language: str | None,
+		duration_seconds: float | None,
+	) -> TranscriptionResult:
 		s = self.settings
 		# Prefer RunPod if configured
 		if s.ivrit_runpod_endpoint_id:
-			return await self._transcribe_via_runpod(data=data, filename=filename, language=language)
+			if s.ivrit_chunked_transcription:
+				if duration_seconds is None:
+					duration_seconds = _estimate_audio_seconds(data, filename)
+				if duration_seconds and duration_seconds > s.ivrit_chunk_max_seconds:
+					return await self.transcribe_chunked(data=data, filename=filename, language=language)
+			return await self._transcribe_via_runpod(
+				data=data, filename=filename, language=language, duration_seconds=duration_seconds
+			)
 
+		return await self._transcribe_direct(_iter_bytes(data), filename=filename, language=language)
+
+	async def _transcribe_direct(
+		self, chunks: AsyncIterator[bytes], filename: str, language: str | None
+	) -> TranscriptionResult:
+		s = self.settings
 		# Direct Ivrit endpoint
 		url = _join_url(s.ivrit_api_url, s.ivrit_transcribe_path)
 		headers: dict[str, str] = {}
@@ -45,44 +234,148 @@ class IvritClient:
 		if s.ivrit_additional_params:
 			params.update(s.ivrit_additional_params)
 
-		files = {s.ivrit_file_field: (filename, data)}
-		async with httpx.AsyncClient(timeout=s.request_timeout_seconds) as client:
-			resp = await client.post(url, headers=headers, params=params, files=files)
-			if resp.status_code >= 400:
-				raise IvritTranscriptionError(f"Ivrit API error {resp.status_code}: {resp.text}")
-			payload = resp.json()
-			text = _extract_text(payload)
-			segments = payload.get("segments") if isinstance(payload, dict) else None
-			speaker_labels, speaker_segments = _extract_speaker_info(segments)
-			return TranscriptionResult(
-				text=text,
-				raw=payload if isinstance(payload, dict) else None,
-				segments=segments,
-				speaker_labels=speaker_labels,
-				speaker_segments=speaker_segments,
-			)
+		# Multipart body is generated on the fly and sent with chunked transfer encoding
+		boundary = uuid.uuid4().hex
+		headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+		body = _multipart_body(boundary, s.ivrit_file_field, filename, chunks)
+		resp = await self.http_client.post(url, headers=headers, params=params, content=body, timeout=self._upload_timeout())
+		if resp.status_code >= 400:
+			raise IvritTranscriptionError(f"Ivrit API error {resp.status_code}: {resp.text}")
+		payload = fast_json.loads(resp.content)
+		return normalize_transcription_payload(payload, runpod=False)
+
+	async def transcribe_chunked(
+		self,
+		data: bytes,
+		filename: str = "audio.wav",
+		language: str | None = None,
+	) -> TranscriptionResult:
+		"""
+		Transcribe a long recording as parallel RunPod jobs and re-stitch the result.
+
+		The audio is cut at silences into chunks of ivrit_chunk_min_seconds to
+		ivrit_chunk_max_seconds (plus ivrit_chunk_overlap_seconds on each side), which
+		are submitted concurrently with /run (at most ivrit_chunk_max_concurrency at a
+		time) so several RunPod workers share the recording; if one chunk fails, the
+		remaining jobs are cancelled. Segment timestamps are
+		shifted back to the recording timeline, overlap duplicates are dropped and
+		speaker labels are made consistent across chunks.
+
+		Args:
+			data: Raw audio bytes (any format librosa can decode)
+			filename: Original file name
+			language: Transcription language (defaults to settings.ivrit_language)
+
+		Returns:
+			TranscriptionResult for the whole recording
+
+		Raises:
+			IvritTranscriptionError: If RunPod is not configured or any chunk fails
+		"""
+		s = self.settings
+		if not s.ivrit_runpod_endpoint_id:
+			raise IvritTranscriptionError("Chunked transcription requires a RunPod endpoint")
+
+		from agent_service.services.audio_processor import AudioProcessor
+
+		sample_rate = 16000
+		audio, _ = await asyncio.to_thread(
+			AudioProcessor(default_sample_rate=sample_rate).load_audio, audio_bytes=data
+		)
+		chunks = plan_chunks(
+			audio,
+			sample_rate,
+			min_chunk_seconds=s.ivrit_chunk_min_seconds,
+			max_chunk_seconds=s.ivrit_chunk_max_seconds,
+			overlap_seconds=s.ivrit_chunk_overlap_seconds,
+		)
+		stem = filename.rsplit(".", 1)[0]
+		semaphore = asyncio.Semaphore(max(1, s.ivrit_chunk_max_concurrency))
+
+		async def _transcribe_chunk(chunk: AudioChunk) -> TranscriptionResult:
+			async with semaphore:
+				# Encode lazily so at most max_concurrency encoded chunks are held at once
+				samples = audio[int(chunk.start * sample_rate):int(chunk.end * sample_rate)]
+				chunk_bytes, extension = await asyncio.to_thread(
+					encode_for_upload, samples, sample_rate, s.ivrit_upload_codec, FILE_SIZE_THRESHOLD
+				)
+				logger.info(f"Submitting chunk {chunk.index + 1}/{len(chunks)} ({chunk.start:.0f}-{chunk.end:.0f}s)")
+				return await self._transcribe_via_runpod(
+					data=chunk_bytes,
+					filename=f"{stem}_part{chunk.index:03d}{extension}",
+					language=language,
+					duration_seconds=chunk.end - chunk.start,
+					mode="run",
+					transcode=False,
+				)
+
+		# A failing chunk cancels its siblings, whose RunPod jobs are then cancelled
+		# by _wait_for_runpod_job, instead of leaving them running to completion
+		try:
+			async with asyncio.TaskGroup() as tg:
+				tasks = [tg.create_task(_transcribe_chunk(chunk)) for chunk in chunks]
+		except ExceptionGroup as eg:
+			# Surface the first chunk failure; the group (with any others) stays chained as its cause
+			raise eg.exceptions[0] from eg
+		results = [task.result() for task in tasks]
+
+		segments = stitch_chunk_segments(chunks, [result.segments or [] for result in results])
+		if segments:
+			text = " ".join(seg["text"].strip() for seg in segments if isinstance(seg.get("text"), str) and seg["text"].strip())
+		else:
+			text = " ".join(result.text.strip() for result in results if result.text)
+		speaker_labels, speaker_segments = _extract_speaker_info(segments)
+		return TranscriptionResult(
+			text=text,
+			raw={
+				"chunks": [
+					{
+						"start": chunk.start,
+						"end": chunk.end,
+						"id": (result.raw or {}).get("id"),
+						"status": (result.raw or {}).get("status"),
+					}
+					for chunk, result in zip(chunks, results)
+				]
+			},
+			segments=segments or None,
+			speaker_labels=speaker_labels,
+			speaker_segments=speaker_segments,
+		)
 
-	async def _transcribe_via_runpod(self, data: bytes, filename: str, language: str | None) -> TranscriptionResult:
+	async def _transcribe_via_runpod(
+		self,
+		data: bytes,
+		filename: str,
+		language: str | None,
+		duration_seconds: float | None = None,
+		mode: str | None = None,
+		transcode: bool = True,
+	) -> TranscriptionResult:
 		s = self.settings
 		endpoint = s.ivrit_runpod_endpoint_id
 		if not endpoint:
 			raise IvritTranscriptionError("RunPod endpoint ID not configured")
 		base = s.ivrit_runpod_base_url.rstrip("/")
-		mode = (s.ivrit_runpod_mode or "runsync").lower()
+		mode = (mode or s.ivrit_runpod_mode or "runsync").lower()
 		if mode not in ("runsync", "run"):
-			raise IvritTranscriptionError(f"Unsupported RunPod mode: {s.ivrit_runpod_mode}")
+			raise IvritTranscriptionError(f"Unsupported RunPod mode: {mode}")
 
 		url = f"{base}/{endpoint}/{mode}"
 		headers = {
 			"Authorization": f"Bearer {s.ivrit_api_key}" if s.ivrit_use_bearer and s.ivrit_api_key else (s.ivrit_api_key or ""),
 			"Content-Type": "application/json",
 		}
-		
-		# For large files (>50MB), use URL instead of base64 to avoid request size limits
-		# Estimate: base64 encoding increases size by ~33%, and JSON has overhead
-		# So ~35MB raw file ≈ ~47MB base64, which is close to typical 50MB limits
-		FILE_SIZE_THRESHOLD = 35 * 1024 * 1024  # 35MB
-		
+
+		# Re-encode as 16 kHz mono FLAC/Opus so most meetings fit in a base64 blob
+		# (avoids the temporary S3 round-trip below)
+		if transcode:
+			if duration_seconds is None:
+				duration_seconds = _estimate_audio_seconds(data, filename)
+			data, filename = await asyncio.to_thread(
+				transcode_for_upload, data, filename, s.ivrit_upload_codec, FILE_SIZE_THRESHOLD
+			)
+
 		input_payload: dict[str, Any] = {
 			s.ivrit_input_language_field: language or s.ivrit_language,
 			s.ivrit_input_filename_field: filename,
@@ -118,7 +411,7 @@ class IvritClient:
 							Bucket=global_settings.s3_bucket,
 							Key=temp_key,
 							Body=data,
-							ContentType="audio/mpeg" if filename.endswith(".mp3") else "audio/wav",
+							ContentType=mimetypes.guess_type(filename)[0] or "application/octet-stream",
 						)
 						# Generate presigned URL (valid for 1 hour)
 						file_url = s3_client.generate_presigned_url(
@@ -127,20 +420,14 @@ class IvritClient:
 							ExpiresIn=3600,  # 1 hour
 						)
 						args["url"] = file_url
-						import logging
-						logger = logging.getLogger(__name__)
 						logger.info(f"Large file uploaded to S3, using URL instead of base64 blob")
 					except (ClientError, Exception) as e:
 						# Fall back to base64 (will likely fail, but better than nothing)
-						import logging
-						logger = logging.getLogger(__name__)
 						logger.warning(f"S3 upload failed for large file, falling back to base64: {e}")
 						audio_b64 = base64.b64encode(data).decode("ascii")
 						args["blob"] = audio_b64
 				else:
 					# No S3 configured - can't use URL, must use base64 (will likely fail)
-					import logging
-					logger = logging.getLogger(__name__)
 					logger.error(
 						f"Large file ({len(data)/(1024*1024):.1f}MB) exceeds threshold but S3 not configured. "
 						f"Base64 encoding ({len(base64.b64encode(data).decode('ascii'))/(1024*1024):.1f}MB) may exceed RunPod limits."
@@ -170,93 +457,194 @@ class IvritClient:
 				else:
 					input_payload[k] = v
 
-		# Use longer timeout for RunPod (especially for large files)
-		# Initial request should be quick, but status polling might take a while
-		runpod_timeout = max(s.request_timeout_seconds, 900.0)  # At least 15 minutes for large files
-		import logging
-		logger = logging.getLogger(__name__)
-		logger.info(f"RunPod request: POST {url} (timeout: {runpod_timeout}s)")
-		async with httpx.AsyncClient(timeout=runpod_timeout) as client:
-			logger.debug(f"RunPod payload keys: {list(input_payload.keys())}")
-			resp = await client.post(url, headers=headers, json={"input": input_payload})
-			if resp.status_code >= 400:
-				error_msg = f"RunPod error {resp.status_code}: {resp.text}"
-				logger.error(error_msg)
-				logger.error(f"Request URL: {url}")
-				logger.error(f"Request headers: {dict(headers)}")
-				logger.error(f"Request payload structure: input keys = {list(input_payload.keys())}")
-				raise IvritTranscriptionError(error_msg)
-			payload = resp.json()
-
-			# For runsync: sometimes returns IN_PROGRESS with an id → poll until done
-			if mode == "runsync":
-				status_value = payload.get("status") if isinstance(payload, dict) else None
-				text = _extract_runpod_output_text(payload)
-				segments = _extract_runpod_segments(payload)
-				speaker_labels, speaker_segments = _extract_speaker_info(segments)
-				if status_value in ("COMPLETED", "COMPLETED_WITH_ERRORS") and text:
-					return TranscriptionResult(
-						text=text,
-						raw=payload if isinstance(payload, dict) else None,
-						segments=segments,
-						speaker_labels=speaker_labels,
-						speaker_segments=speaker_segments,
-					)
-				# otherwise poll using id
-				request_id = payload.get("id") if isinstance(payload, dict) else None
-				if not request_id:
-					raise IvritTranscriptionError(f"RunPod runsync did not complete and no id provided: {payload}")
-				status_url = f"{base}/{endpoint}/status/{request_id}"
-				while True:
-					status_resp = await client.get(status_url, headers=headers)
-					if status_resp.status_code >= 400:
-						raise IvritTranscriptionError(f"RunPod status error {status_resp.status_code}: {status_resp.text}")
-					status_payload = status_resp.json()
-					state = status_payload.get("status") if isinstance(status_payload, dict) else None
-					if state in ("COMPLETED", "COMPLETED_WITH_ERRORS"):
-						text2 = _extract_runpod_output_text(status_payload)
-						segments2 = _extract_runpod_segments(status_payload)
-						speaker_labels2, speaker_segments2 = _extract_speaker_info(segments2)
-						return TranscriptionResult(
-							text=text2,
-							raw=status_payload if isinstance(status_payload, dict) else None,
-							segments=segments2,
-							speaker_labels=speaker_labels2,
-							speaker_segments=speaker_segments2,
-						)
-					if state in ("FAILED", "CANCELLED"):
-						raise IvritTranscriptionError(f"RunPod job failed: {status_payload}")
-					await asyncio.sleep(s.ivrit_runpod_status_poll_interval_seconds)
-
-			# mode == "run" => poll /status until completed
-			request_id = payload.get("id") if isinstance(payload, dict) else None
-			if not request_id:
-				raise IvritTranscriptionError(f"RunPod 'run' response missing id: {payload}")
-			status_url = f"{base}/{endpoint}/status/{request_id}"
+		logger.info(f"RunPod request: POST {url} (timeout: {s.ivrit_upload_timeout_seconds}s)")
+		client = self.http_client
+		logger.debug(f"RunPod payload keys: {list(input_payload.keys())}")
+		request_body: dict[str, Any] = {"input": input_payload}
+		if _webhook_enabled(s):
+			request_body["webhook"] = _webhook_url(s)
+		resp = await client.post(url, headers=headers, json=request_body, timeout=self._upload_timeout())
+		if resp.status_code >= 400:
+			error_msg = f"RunPod error {resp.status_code}: {resp.text}"
+			logger.error(error_msg)
+			logger.error(f"Request URL: {url}")
+			logger.error(f"Request headers: {dict(headers)}")
+			logger.error(f"Request payload structure: input keys = {list(input_payload.keys())}")
+			raise IvritTranscriptionError(error_msg)
+		payload = fast_json.loads(resp.content)
+
+		# For runsync: sometimes returns IN_PROGRESS with an id → poll until done
+		if mode == "runsync":
+			status_value = payload.get("status") if isinstance(payload, dict) else None
+			if status_value in ("COMPLETED", "COMPLETED_WITH_ERRORS"):
+				result = normalize_transcription_payload(payload)
+				if result.text:
+					return result
+
+		# Otherwise wait for completion (webhook push and/or adaptive /status polling)
+		request_id = payload.get("id") if isinstance(payload, dict) else None
+		if not request_id:
+			raise IvritTranscriptionError(f"RunPod {mode} did not complete and no id provided: {payload}")
+		if duration_seconds is None:
+			duration_seconds = _estimate_audio_seconds(data, filename)
+		status_payload = await self._wait_for_runpod_job(
+			client, base, endpoint, request_id, headers, duration_seconds
+		)
+		return normalize_transcription_payload(status_payload)
+
+	async def _wait_for_runpod_job(
+		self,
+		client: httpx.AsyncClient,
+		base: str,
+		endpoint: str,
+		request_id: str,
+		headers: dict[str, str],
+		duration_seconds: float | None,
+	) -> dict[str, Any]:
+		"""
+		Wait for a RunPod job to finish.
+
+		With a webhook configured, completion is pushed to us and /status is only
+		polled as an infrequent safety net. Otherwise /status is polled with an
+		adaptive, jittered interval (see RunPodPollSchedule). Either way the wait is
+		bounded by ivrit_runpod_max_wait_seconds, after which the job is cancelled.
+		"""
+		s = self.settings
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + s.ivrit_runpod_max_wait_seconds
+		status_url = f"{base}/{endpoint}/status/{request_id}"
+		schedule = RunPodPollSchedule(s, duration_seconds)
+		use_webhook = _webhook_enabled(s)
+		delay = schedule.first_delay()
+
+		try:
 			while True:
-				status_resp = await client.get(status_url, headers=headers)
+				remaining = deadline - loop.time()
+				if remaining <= 0:
+					await self._cancel_runpod_job(client, base, endpoint, request_id, headers)
+					raise IvritTranscriptionError(
+						f"RunPod job {request_id} did not finish within {s.ivrit_runpod_max_wait_seconds}s"
+					)
+
+				if use_webhook:
+					pushed = await runpod_webhooks.wait_for_completion(
+						request_id,
+						timeout=min(s.ivrit_runpod_webhook_fallback_poll_seconds, remaining),
+						redis_poll_seconds=s.ivrit_runpod_status_poll_interval_seconds,
+					)
+					if pushed is not None and pushed.get("status") in ("COMPLETED", "COMPLETED_WITH_ERRORS"):
+						schedule.record_completion(pushed)
+						return pushed
+					if pushed is not None and pushed.get("status") in ("FAILED", "CANCELLED", "TIMED_OUT"):
+						raise IvritTranscriptionError(f"RunPod job failed: {pushed}")
+				else:
+					await asyncio.sleep(min(delay, remaining))
+
+				status_resp = await client.get(status_url, headers=headers, timeout=self._poll_timeout())
 				if status_resp.status_code >= 400:
 					raise IvritTranscriptionError(f"RunPod status error {status_resp.status_code}: {status_resp.text}")
-				status_payload = status_resp.json()
+				status_payload = fast_json.loads(status_resp.content)
 				state = status_payload.get("status") if isinstance(status_payload, dict) else None
 				if state in ("COMPLETED", "COMPLETED_WITH_ERRORS"):
-					text = _extract_runpod_output_text(status_payload)
-					segments = _extract_runpod_segments(status_payload)
-					speaker_labels, speaker_segments = _extract_speaker_info(segments)
-					return TranscriptionResult(
-						text=text,
-						raw=status_payload if isinstance(status_payload, dict) else None,
-						segments=segments,
-						speaker_labels=speaker_labels,
-						speaker_segments=speaker_segments,
-					)
-				if state in ("FAILED", "CANCELLED"):
+					schedule.record_completion(status_payload)
+					return status_payload
+				if state in ("FAILED", "CANCELLED", "TIMED_OUT"):
 					raise IvritTranscriptionError(f"RunPod job failed: {status_payload}")
-				# Log progress for long-running jobs
-				if state == "IN_PROGRESS" or state == "IN_QUEUE":
-					logger.info(f"RunPod job {request_id} status: {state}, continuing to poll...")
-				await asyncio.sleep(s.ivrit_runpod_status_poll_interval_seconds)
+				delay = schedule.next_delay(state, loop.time(), status_payload)
+				logger.info(f"RunPod job {request_id} status: {state}, next check in {delay:.1f}s")
+		except asyncio.CancelledError:
+			# The caller gave up on this job (e.g. a sibling chunk failed) - stop it on RunPod too
+			await asyncio.shield(self._cancel_runpod_job(client, base, endpoint, request_id, headers))
+			raise
+		finally:
+			runpod_webhooks.discard(request_id)
+
+	async def _cancel_runpod_job(
+		self,
+		client: httpx.AsyncClient,
+		base: str,
+		endpoint: str,
+		request_id: str,
+		headers: dict[str, str],
+	) -> None:
+		"""Best-effort cancellation of a RunPod job that timed out or was abandoned."""
+		try:
+			await client.post(f"{base}/{endpoint}/cancel/{request_id}", headers=headers, timeout=self._poll_timeout())
+		except httpx.HTTPError as e:
+			logger.warning(f"Failed to cancel RunPod job {request_id}: {e}")
+
+
+class RunPodPollSchedule:
+	"""
+	Adaptive delay between RunPod /status polls.
+
+	While a job is queued the delay grows exponentially (with jitter) from
+	ivrit_runpod_status_poll_interval_seconds up to ivrit_runpod_poll_max_interval_seconds.
+	Once it is running, the expected execution time (audio duration x
+	ivrit_runpod_expected_rtf) is used to sleep roughly half of the remaining time,
+	falling back to exponential backoff when the estimate is exceeded. The first
+	poll is delayed by the queue time recently observed in this process.
+	"""
 
+	# Exponential moving average of RunPod queue time (seconds) seen by this process
+	_queue_time_ema: float | None = None
+
+	def __init__(self, settings: Settings, duration_seconds: float | None) -> None:
+		self.min_interval = settings.ivrit_runpod_status_poll_interval_seconds
+		self.max_interval = max(settings.ivrit_runpod_poll_max_interval_seconds, self.min_interval)
+		self.backoff_factor = settings.ivrit_runpod_poll_backoff_factor
+		self.jitter = settings.ivrit_runpod_poll_jitter
+		self.expected_execution = (
+			duration_seconds * settings.ivrit_runpod_expected_rtf if duration_seconds else None
+		)
+		self._interval = self.min_interval
+		self._running_since: float | None = None
+
+	def first_delay(self) -> float:
+		queue_time = RunPodPollSchedule._queue_time_ema or 0.0
+		return self._jittered(self._clamp(max(queue_time, self.min_interval)))
+
+	def next_delay(self, state: str | None, now: float, payload: dict[str, Any]) -> float:
+		if state == "IN_PROGRESS":
+			if self._running_since is None:
+				self._running_since = now
+				self._record_queue_time(payload)
+				self._interval = self.min_interval
+			if self.expected_execution is not None:
+				remaining = self.expected_execution - (now - self._running_since)
+				if remaining > self.min_interval:
+					return self._jittered(self._clamp(remaining / 2))
+		self._interval = self._clamp(self._interval * self.backoff_factor)
+		return self._jittered(self._interval)
+
+	def record_completion(self, payload: dict[str, Any]) -> None:
+		self._record_queue_time(payload)
+
+	def _record_queue_time(self, payload: dict[str, Any]) -> None:
+		# RunPod reports queue time as delayTime (milliseconds)
+		delay_ms = payload.get("delayTime") if isinstance(payload, dict) else None
+		if not isinstance(delay_ms, (int, float)):
+			return
+		observed = delay_ms / 1000.0
+		previous = RunPodPollSchedule._queue_time_ema
+		RunPodPollSchedule._queue_time_ema = observed if previous is None else 0.7 * previous + 0.3 * observed
+
+	def _clamp(self, delay: float) -> float:
+		return min(self.max_interval, max(self.min_interval, delay))
+
+	def _jittered(self, delay: float) -> float:
+		return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def _estimate_audio_seconds(data: bytes, filename: str) -> float | None:
+	"""Estimate audio duration from the raw bytes (exact for WAV, ~128 kbps assumed otherwise)."""
+	if filename.lower().endswith(".wav"):
+		try:
+			with wave.open(io.BytesIO(data)) as wav:
+				return wav.getnframes() / float(wav.getframerate())
+		except (wave.Error, EOFError):
+			pass
+	return len(data) / 16000.0 if data else None
 
 def _extract_text(payload: Any) -> str:
 	if isinstance(payload, dict):
@@ -274,76 +662,91 @@ def _extract_text(payload: Any) -> str:
 	return str(payload)
 
 
-def _extract_runpod_output_text(payload: Any) -> str:
-	if isinstance(payload, dict):
-		output = payload.get("output")
-		# Common dict-shaped output
-		if isinstance(output, dict):
-			for key in ("text", "transcript", "transcription"):
-				val = output.get(key)
-				if isinstance(val, str):
-					return val
-				# Some templates use nested data
-				data = output.get("data") if isinstance(output.get("data"), dict) else None
-				if data:
-					for key in ("text", "transcript", "transcription"):
-						val = data.get(key)
-						if isinstance(val, str):
-							return val
-		# Some RunPod templates return a list with an object containing 'result' which
-		# is a list (sometimes list of lists) of segment dicts that each have 'text'
-		if isinstance(output, list):
-			for item in output:
-				if not isinstance(item, dict):
-					continue
-				result_obj = item.get("result")
-				if isinstance(result_obj, list):
-					flat: list[dict[str, Any]] = []
-					for sub in result_obj:
-						if isinstance(sub, list):
-							for seg in sub:
-								if isinstance(seg, dict):
-									flat.append(seg)
-						elif isinstance(sub, dict):
-							flat.append(sub)
-					if flat:
-						texts: list[str] = []
-						for seg in flat:
-							t = seg.get("text")
-							if isinstance(t, str) and t.strip():
-								texts.append(t.strip())
-						if texts:
-							return " ".join(texts)
-	return _extract_text(payload)
-
-
-def _extract_runpod_segments(payload: Any) -> list[dict[str, Any]] | None:
+class TranscriptSegment(TypedDict, total=False):
+	"""Segment shape produced by the ASR templates (extra keys are passed through)."""
+
+	start: float
+	end: float
+	text: str
+	speaker: str
+	words: list[dict[str, Any]]
+
+
+_TEXT_KEYS = ("text", "transcript", "transcription")
+
+
+def normalize_transcription_payload(payload: Any, runpod: bool = True) -> TranscriptionResult:
+	"""
+	Turn an ASR response into a TranscriptionResult in a single pass over its segments.
+
+	Handles the shapes returned by the direct Ivrit endpoint (top-level text/segments)
+	and by RunPod templates (`output` as a dict with text/segments, or as a list of
+	items whose `result` is a list - sometimes of lists - of segment dicts). Segments
+	are flattened, their text joined and grouped by speaker in the same loop.
+
+	Args:
+		payload: Decoded JSON response
+		runpod: Whether the payload is a RunPod job response (content under `output`)
+
+	Returns:
+		TranscriptionResult with text, flat segments and speaker grouping
+	"""
+	explicit_text: str | None = None
+	segment_source: Any = None
 	if isinstance(payload, dict):
-		output = payload.get("output")
-		if isinstance(output, dict):
-			segments = output.get("segments")
-			if isinstance(segments, list):
-				return [s for s in segments if isinstance(s, dict)]
-		# Handle list-shaped outputs with 'result' nested arrays
-		if isinstance(output, list):
-			for item in output:
-				if not isinstance(item, dict):
-					continue
-				result_obj = item.get("result")
-				if isinstance(result_obj, list):
-					flat: list[dict[str, Any]] = []
-					for sub in result_obj:
-						if isinstance(sub, list):
-							for seg in sub:
-								if isinstance(seg, dict):
-									flat.append(seg)
-						elif isinstance(sub, dict):
-							flat.append(sub)
-					if flat:
-						return flat
+		container = payload.get("output") if runpod else payload
+		if isinstance(container, dict):
+			explicit_text = _find_text(container)
+			if explicit_text is None and isinstance(container.get("data"), dict):
+				explicit_text = _find_text(container["data"])
+			segment_source = container.get("segments")
+		elif isinstance(container, list):
+			segment_source = [item.get("result") for item in container if isinstance(item, dict)]
+
+	segments: list[TranscriptSegment] = []
+	texts: list[str] = []
+	groups: dict[str, list[dict[str, Any]]] = {}
+	for seg in _iter_segment_dicts(segment_source):
+		segments.append(seg)  # type: ignore[arg-type]
+		seg_text = seg.get("text")
+		if isinstance(seg_text, str) and seg_text.strip():
+			texts.append(seg_text.strip())
+		groups.setdefault(_segment_speaker(seg), []).append(seg)
+
+	if explicit_text is not None:
+		text = explicit_text
+	elif texts:
+		text = " ".join(texts)
+	else:
+		text = _extract_text(payload)
+
+	speaker_labels, speaker_segments = _speaker_info_from_groups(groups)
+	return TranscriptionResult(
+		text=text,
+		raw=payload if isinstance(payload, dict) else None,
+		segments=segments or None,
+		speaker_labels=speaker_labels,
+		speaker_segments=speaker_segments,
+	)
+
+
+def _find_text(container: dict[str, Any]) -> str | None:
+	for key in _TEXT_KEYS:
+		val = container.get(key)
+		if isinstance(val, str):
+			return val
 	return None
 
 
+def _iter_segment_dicts(source: Any) -> Iterator[dict[str, Any]]:
+	"""Yield segment dicts from arbitrarily nested lists (output[].result[][] etc.)."""
+	if isinstance(source, dict):
+		yield source
+	elif isinstance(source, list):
+		for item in source:
+			yield from _iter_segment_dicts(item)
+
+
 def _extract_speaker_info(
 	segments: list[dict[str, Any]] | None,
 ) -> tuple[list[str] | None, list[dict[str, Any]] | None]:
@@ -355,60 +758,108 @@ def _extract_speaker_info(
 		- speaker_labels: List of unique speaker labels found (e.g., ['SPK_1', 'SPK_2'])
 		- speaker_segments: List of dicts with 'speaker' and 'segments' keys
 	"""
-	if not segments:
+	groups: dict[str, list[dict[str, Any]]] = {}
+	for seg in segments or []:
+		if isinstance(seg, dict):
+			groups.setdefault(_segment_speaker(seg), []).append(seg)
+	return _speaker_info_from_groups(groups)
+
+
+def _segment_speaker(seg: dict[str, Any]) -> str:
+	"""Speaker label of a segment (explicit field, first word's speaker, or SPK_0)."""
+	# Try multiple possible speaker label fields
+	for key in ("speaker", "speaker_label", "speaker_id", "speaker_0", "speaker_1"):
+		label = seg.get(key)
+		if label is not None:
+			if isinstance(label, str) and label:
+				return label
+			if isinstance(label, (int, float)):
+				# Convert numeric to string label
+				return f"SPK_{int(label)}"
+			break
+
+	# Some formats have speaker in words array
+	words = seg.get("words")
+	if isinstance(words, list) and words and isinstance(words[0], dict):
+		label = words[0].get("speaker") or words[0].get("speaker_label")
+		if label:
+			return label
+
+	# Default to SPK_0 if no speaker found
+	return "SPK_0"
+
+
+def _speaker_info_from_groups(
+	groups: dict[str, list[dict[str, Any]]],
+) -> tuple[list[str] | None, list[dict[str, Any]] | None]:
+	if not groups:
 		return None, None
+	# Sort speaker labels for consistent ordering
+	speaker_labels = sorted(groups)
+	speaker_segments = [{"speaker": label, "segments": groups[label]} for label in speaker_labels]
+	return speaker_labels, speaker_segments
 
-	speaker_label_set: set[str] = set()
-	speaker_segments_map: dict[str, list[dict[str, Any]]] = {}
-
-	for seg in segments:
-		if not isinstance(seg, dict):
-			continue
-
-		# Try multiple possible speaker label fields
-		speaker_label: str | None = None
-		for key in ("speaker", "speaker_label", "speaker_id", "speaker_0", "speaker_1"):
-			label = seg.get(key)
-			if label is not None:
-				if isinstance(label, str):
-					speaker_label = label
-				elif isinstance(label, (int, float)):
-					# Convert numeric to string label
-					speaker_label = f"SPK_{int(label)}"
-				break
-
-		# If no explicit speaker field, check for speaker in nested structure
-		if not speaker_label:
-			# Some formats have speaker in words array
-			words = seg.get("words")
-			if isinstance(words, list) and words:
-				first_word = words[0] if isinstance(words[0], dict) else None
-				if first_word:
-					speaker_label = first_word.get("speaker") or first_word.get("speaker_label")
-
-		# Default to SPK_0 if no speaker found
-		if not speaker_label:
-			speaker_label = "SPK_0"
-
-		speaker_label_set.add(speaker_label)
-		if speaker_label not in speaker_segments_map:
-			speaker_segments_map[speaker_label] = []
-		speaker_segments_map[speaker_label].append(seg)
 
-	# Sort speaker labels for consistent ordering
-	speaker_labels = sorted(list(speaker_label_set)) if speaker_label_set else None
-
-	# Build speaker_segments structure
-	speaker_segments: list[dict[str, Any]] = []
-	for label in sorted(speaker_segments_map.keys()):
-		speaker_segments.append(
-			{
-				"speaker": label,
-				"segments": speaker_segments_map[label],
-			}
-		)
+# Chunk size for streamed uploads
+_UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+async def _iter_file(f: BinaryIO, chunk_size: int = _UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+	while True:
+		chunk = await asyncio.to_thread(f.read, chunk_size)
+		if not chunk:
+			break
+		yield chunk
+
 
-	return speaker_labels, speaker_segments if speaker_segments else None
+async def _iter_bytes(data: bytes, chunk_size: int = _UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+	view = memoryview(data)
+	for offset in range(0, len(view), chunk_size):
+		yield bytes(view[offset:offset + chunk_size])
+
+
+async def _multipart_body(
+	boundary: str, field: str, filename: str, chunks: AsyncIterator[bytes]
+) -> AsyncIterator[bytes]:
+	"""Generate a single-file multipart/form-data body around streamed file chunks."""
+	content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+	safe_filename = filename.replace("\\", "\\\\").replace('"', '\\"')
+	yield (
+		f"--{boundary}\r\n"
+		f'Content-Disposition: form-data; name="{field}"; filename="{safe_filename}"\r\n'
+		f"Content-Type: {content_type}\r\n\r\n"
+	).encode("utf-8")
+	async for chunk in chunks:
+		yield chunk
+	yield f"\r\n--{boundary}--\r\n".encode("ascii")
+
+
+_webhook_secret_warned = False
+
+
+def _webhook_enabled(settings: Settings) -> bool:
+	"""
+	Whether to register the webhook with RunPod jobs.
+
+	A webhook URL without ivrit_runpod_webhook_secret is refused (jobs are polled
+	instead): the endpoint only accepts completions that carry the secret.
+	"""
+	global _webhook_secret_warned
+	if not settings.ivrit_runpod_webhook_url:
+		return False
+	if not settings.ivrit_runpod_webhook_secret:
+		if not _webhook_secret_warned:
+			logger.warning("ivrit_runpod_webhook_url is set without ivrit_runpod_webhook_secret; webhooks disabled")
+			_webhook_secret_warned = True
+		return False
+	return True
+
+
+def _webhook_url(settings: Settings) -> str:
+	"""Webhook URL for RunPod, carrying the shared secret as a query token."""
+	url = settings.ivrit_runpod_webhook_url or ""
+	separator = "&" if "?" in url else "?"
+	return f"{url}{separator}token={settings.ivrit_runpod_webhook_secret}"
 
 
 def _join_url(base: str, path: str) -> str:
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Iterable
+
+import httpx
+
+from agent_service.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+RUNPOD_API_URL = "https://api.runpod.io/v2"
+
+TERMINAL_SUCCESS = ("COMPLETED", "COMPLETED_WITH_ERRORS")
+TERMINAL_FAILURE = ("FAILED", "CANCELLED", "TIMED_OUT")
+
+
+class RunPodJobError(RuntimeError):
+	"""A RunPod API call failed or a job ended unsuccessfully."""
+
+
+class RunPodJobClient:
+	"""
+	Async client for RunPod Serverless jobs (submit, status, wait, cancel).
+
+	All requests share one pooled httpx.AsyncClient and go through a semaphore, so
+	submitting or waiting on many jobs at once never exceeds `max_concurrency`
+	in-flight API calls. Used by the API/worker enqueue path and scripts/runpod_utils.py.
+	"""
+
+	def __init__(
+		self,
+		endpoint_id: str,
+		api_key: str,
+		base_url: str = RUNPOD_API_URL,
+		max_concurrency: int = 16,
+		request_timeout: float = 30.0,
+		http_client: httpx.AsyncClient | None = None,
+	) -> None:
+		"""
+		Initialize the client.
+
+		Args:
+			endpoint_id: RunPod endpoint ID
+			api_key: RunPod API key
+			base_url: RunPod API base URL
+			max_concurrency: Maximum concurrent API requests made by this client
+			request_timeout: Timeout for each API request in seconds
+			http_client: Client to use (caller owns it); defaults to the process-wide pooled client
+		"""
+		if not endpoint_id or not api_key:
+			raise ValueError("RunPod endpoint ID and API key must be set")
+		self.endpoint_url = f"{base_url.rstrip('/')}/{endpoint_id}"
+		self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+		self.request_timeout = request_timeout
+		self._http_client = http_client
+		self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+	@property
+	def http_client(self) -> httpx.AsyncClient:
+		if self._http_client is not None:
+			return self._http_client
+		from agent_service.clients.ivrit_client import get_http_client
+
+		return get_http_client()
+
+	async def submit(self, job_input: dict[str, Any], webhook: str | None = None) -> str:
+		"""
+		Submit a job with /run.
+
+		Args:
+			job_input: Job input (sent as {"input": job_input})
+			webhook: Optional URL RunPod calls on completion
+
+		Returns:
+			RunPod job ID
+
+		Raises:
+			RunPodJobError: If the request fails or no job ID is returned
+		"""
+		body: dict[str, Any] = {"input": job_input}
+		if webhook:
+			body["webhook"] = webhook
+		result = await self._request("POST", "/run", json=body)
+		job_id = result.get("id") if isinstance(result, dict) else None
+		if not job_id:
+			raise RunPodJobError(f"RunPod API did not return job ID: {result}")
+		return job_id
+
+	async def status(self, job_id: str) -> dict[str, Any]:
+		"""Get the /status payload of a job."""
+		return await self._request("GET", f"/status/{job_id}")
+
+	async def cancel(self, job_id: str) -> dict[str, Any]:
+		"""Cancel a queued or running job."""
+		return await self._request("POST", f"/cancel/{job_id}")
+
+	async def wait(
+		self,
+		job_id: str,
+		timeout: float = 300.0,
+		poll_interval: float = 2.0,
+		max_poll_interval: float = 30.0,
+		cancel_on_timeout: bool = False,
+		on_status: Callable[[str, dict[str, Any]], Awaitable[None] | None] | None = None,
+	) -> dict[str, Any]:
+		"""
+		Wait for a job to finish, polling with jittered exponential backoff.
+
+		Args:
+			job_id: RunPod job ID
+			timeout: Maximum wait time in seconds
+			poll_interval: Initial delay between status checks
+			max_poll_interval: Upper bound for the delay
+			cancel_on_timeout: Cancel the job if it does not finish in time
+			on_status: Optional callback invoked with (job_id, status payload) after each poll
+
+		Returns:
+			Final status payload of a completed job
+
+		Raises:
+			TimeoutError: If the job does not finish within `timeout`
+			RunPodJobError: If the job fails or is cancelled
+		"""
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + timeout
+		delay = poll_interval
+		while True:
+			payload = await self.status(job_id)
+			state = payload.get("status")
+			if on_status is not None:
+				maybe_awaitable = on_status(job_id, payload)
+				if maybe_awaitable is not None:
+					await maybe_awaitable
+			if state in TERMINAL_SUCCESS:
+				return payload
+			if state in TERMINAL_FAILURE:
+				raise RunPodJobError(f"Job {job_id} {state.lower()}: {payload.get('error', payload)}")
+
+			remaining = deadline - loop.time()
+			if remaining <= 0:
+				if cancel_on_timeout:
+					try:
+						await self.cancel(job_id)
+					except RunPodJobError as e:
+						logger.warning(f"Failed to cancel RunPod job {job_id}: {e}")
+				raise TimeoutError(f"Job {job_id} did not complete within {timeout} seconds")
+			await asyncio.sleep(min(delay * random.uniform(0.8, 1.2), remaining))
+			delay = min(max_poll_interval, delay * 1.5)
+
+	async def run(self, job_input: dict[str, Any], timeout: float = 300.0, **wait_kwargs: Any) -> dict[str, Any]:
+		"""Submit a job and wait for its result."""
+		job_id = await self.submit(job_input)
+		return await self.wait(job_id, timeout=timeout, **wait_kwargs)
+
+	async def submit_many(self, job_inputs: Iterable[dict[str, Any]]) -> list[str | BaseException]:
+		"""
+		Submit many jobs concurrently (bounded by max_concurrency).
+
+		Returns:
+			Job ID or the raised exception for each input, in input order
+		"""
+		return await asyncio.gather(*(self.submit(job_input) for job_input in job_inputs), return_exceptions=True)
+
+	async def wait_many(self, job_ids: Iterable[str], **wait_kwargs: Any) -> list[dict[str, Any] | BaseException]:
+		"""
+		Wait for many jobs concurrently.
+
+		Returns:
+			Final status payload or the raised exception for each job, in input order
+		"""
+		return await asyncio.gather(*(self.wait(job_id, **wait_kwargs) for job_id in job_ids), return_exceptions=True)
+
+	async def _request(self, method: str, path: str, json: Any = None) -> dict[str, Any]:
+		async with self._semaphore:
+			try:
+				response = await self.http_client.request(
+					method, f"{self.endpoint_url}{path}", headers=self.headers, json=json, timeout=self.request_timeout
+				)
+			except httpx.HTTPError as e:
+				raise RunPodJobError(f"RunPod request {method} {path} failed: {e}") from e
+		if response.status_code >= 400:
+			logger.error(f"RunPod API error {response.status_code}: {response.text}")
+			raise RunPodJobError(f"RunPod API error {response.status_code}: {response.text}")
+		return fast_json.loads(response.content)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from agent_service.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# RunPod job completions pushed to the webhook endpoint.
+# In-process waiters are resolved directly; Redis carries completions to other
+# processes (e.g. Celery workers waiting on a job submitted from the worker).
+_REDIS_KEY_PREFIX = "runpod:webhook:"
+_REDIS_TTL_SECONDS = 3600
+_MAX_STASHED = 256
+
+_waiters: dict[str, asyncio.Future[dict[str, Any]]] = {}
+_stashed: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_redis_client: Any = None
+
+
+def _get_redis() -> Any:
+	"""Lazily create the Redis client used to share completions across processes."""
+	global _redis_client
+	if _redis_client is None:
+		redis_url = get_settings().redis_url
+		if not redis_url:
+			return None
+		try:
+			import redis
+		except ImportError:
+			logger.warning("redis package not installed; RunPod webhooks only reach this process")
+			return None
+		_redis_client = redis.from_url(redis_url, decode_responses=True)
+	return _redis_client
+
+
+async def deliver_completion(payload: dict[str, Any]) -> bool:
+	"""
+	Record a RunPod job completion received by the webhook endpoint.
+
+	Args:
+		payload: Webhook body (same shape as a RunPod /status response)
+
+	Returns:
+		True if a waiter in this process was resolved
+	"""
+	job_id = payload.get("id")
+	if not isinstance(job_id, str) or not job_id:
+		raise ValueError("RunPod webhook payload missing job id")
+
+	try:
+		client = _get_redis()
+		if client is not None:
+			await asyncio.to_thread(
+				client.setex, f"{_REDIS_KEY_PREFIX}{job_id}", _REDIS_TTL_SECONDS, json.dumps(payload)
+			)
+	except Exception as e:
+		logger.warning(f"Failed to publish RunPod completion for {job_id} to Redis: {e}")
+
+	waiter = _waiters.pop(job_id, None)
+	if waiter is not None and not waiter.done():
+		waiter.get_loop().call_soon_threadsafe(waiter.set_result, payload)
+		return True
+
+	# Completion may arrive before the submitter starts waiting
+	_stashed[job_id] = payload
+	while len(_stashed) > _MAX_STASHED:
+		_stashed.popitem(last=False)
+	return False
+
+
+async def wait_for_completion(job_id: str, timeout: float, redis_poll_seconds: float = 2.0) -> dict[str, Any] | None:
+	"""
+	Wait up to `timeout` seconds for a webhook completion of a RunPod job.
+
+	A webhook received by this process resolves the wait immediately. The webhook
+	usually lands in the API process while the job is awaited in a Celery worker, so
+	the shared Redis key is also checked every `redis_poll_seconds` (a cheap GET,
+	unlike a RunPod /status call).
+
+	Args:
+		job_id: RunPod job ID
+		timeout: Maximum time to wait in seconds
+		redis_poll_seconds: Interval between checks of the Redis completion key
+
+	Returns:
+		Completion payload, or None if none arrived in time
+	"""
+	payload = _stashed.pop(job_id, None) or await _fetch_from_redis(job_id)
+	if payload is not None:
+		return payload
+
+	loop = asyncio.get_running_loop()
+	waiter = _waiters.get(job_id)
+	if waiter is None or waiter.done():
+		waiter = loop.create_future()
+		_waiters[job_id] = waiter
+	# Without Redis only an in-process webhook can complete the wait
+	poll = redis_poll_seconds if _get_redis() is not None else timeout
+	deadline = loop.time() + timeout
+	while True:
+		remaining = deadline - loop.time()
+		if remaining <= 0:
+			return None
+		try:
+			return await asyncio.wait_for(asyncio.shield(waiter), timeout=min(poll, remaining))
+		except asyncio.TimeoutError:
+			# Another process may have received the webhook
+			payload = await _fetch_from_redis(job_id)
+			if payload is not None:
+				_waiters.pop(job_id, None)
+				return payload
+
+
+def discard(job_id: str) -> None:
+	"""Forget any waiter or stashed completion for a job."""
+	_waiters.pop(job_id, None)
+	_stashed.pop(job_id, None)
+
+
+async def _fetch_from_redis(job_id: str) -> dict[str, Any] | None:
+	client = _get_redis()
+	if client is None:
+		return None
+	try:
+		raw = await asyncio.to_thread(client.get, f"{_REDIS_KEY_PREFIX}{job_id}")
+	except Exception as e:
+		logger.warning(f"Failed to read RunPod completion for {job_id} from Redis: {e}")
+		return None
+	return json.loads(raw) if raw else None
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable
+
+from pydantic import ValidationError
+
+from agent_service.config import Settings, TranscriptionResult, get_settings
+from agent_service.utils.cache_store import CacheStore
+
+logger = logging.getLogger(__name__)
+
+_LOCK_KEY_PREFIX = "transcription:lock:"
+
+# Compare-and-delete / compare-and-extend so a worker never touches a lock it lost
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("del", KEYS[1])
+end
+return 0
+"""
+_EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Transcriptions in flight in this process, keyed by cache key
+_inflight: dict[str, asyncio.Future[TranscriptionResult]] = {}
+
+
+class TranscriptionCache:
+	"""
+	Content-addressed cache of transcription results.
+
+	Keys combine the SHA-256 of the audio with everything that changes the output
+	(endpoint, model, language, extra params), so re-uploads of the same recording,
+	Celery retries and CLI re-runs skip the ASR call. Results are kept in a CacheStore
+	(Redis, or a local directory bounded by total size with LRU eviction) for
+	transcription_cache_ttl_seconds.
+	"""
+
+	def __init__(self, settings: Settings | None = None) -> None:
+		"""
+		Initialize the cache.
+
+		Args:
+			settings: Settings providing transcription_cache_* options (global settings if None)
+		"""
+		self.settings = settings or get_settings()
+		self.store = CacheStore(
+			"transcription",
+			self.settings.transcription_cache_backend,
+			directory=self.settings.transcription_cache_dir,
+			max_bytes=self.settings.transcription_cache_max_bytes,
+			ttl_seconds=self.settings.transcription_cache_ttl_seconds,
+			redis_url=self.settings.redis_url,
+		)
+
+	@property
+	def enabled(self) -> bool:
+		return self.store.enabled
+
+	def make_key(self, audio_digest: str, language: str | None) -> str:
+		"""
+		Build the cache key for an audio digest and the current transcription settings.
+
+		Args:
+			audio_digest: Hex SHA-256 of the audio bytes
+			language: Requested language (None = settings default)
+
+		Returns:
+			Hex cache key
+		"""
+		s = self.settings
+		fingerprint = {
+			"audio": audio_digest,
+			"endpoint": s.ivrit_runpod_endpoint_id or f"{s.ivrit_api_url}{s.ivrit_transcribe_path}",
+			"model": s.ivrit_model,
+			"language": language or s.ivrit_language,
+			"segments": s.ivrit_return_segments,
+			"params": s.ivrit_additional_params,
+		}
+		if s.ivrit_runpod_endpoint_id:
+			# RunPod-only options that change the transcript: the audio the model actually
+			# hears (re-encoding) and whether/where long recordings are split and re-stitched
+			fingerprint["upload_codec"] = s.ivrit_upload_codec
+			fingerprint["chunked"] = (
+				[s.ivrit_chunk_min_seconds, s.ivrit_chunk_max_seconds, s.ivrit_chunk_overlap_seconds]
+				if s.ivrit_chunked_transcription
+				else False
+			)
+		return hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+	async def get(self, key: str) -> TranscriptionResult | None:
+		"""Return the cached result for `key`, or None on a miss (or cache error)."""
+		if not self.enabled:
+			return None
+		try:
+			raw = await asyncio.to_thread(self.store.read, key)
+		except Exception as e:
+			logger.warning(f"Transcription cache read failed: {e}")
+			return None
+		if raw is None:
+			return None
+		try:
+			result = TranscriptionResult.model_validate_json(raw)
+		except ValidationError as e:
+			# Truncated, corrupt or written by an older schema - drop it and transcribe again
+			logger.warning(f"Dropping unreadable transcription cache entry ({key[:12]}): {e}")
+			try:
+				await asyncio.to_thread(self.store.delete, key)
+			except Exception as delete_error:
+				logger.warning(f"Transcription cache delete failed: {delete_error}")
+			return None
+		logger.info(f"Transcription cache hit ({key[:12]})")
+		return result
+
+	async def set(self, key: str, result: TranscriptionResult) -> None:
+		"""Store a clean, successful result (errors are logged, never raised)."""
+		if not self.enabled:
+			return
+		if not is_cacheable(result):
+			logger.info(f"Not caching degraded transcription ({key[:12]})")
+			return
+		try:
+			await asyncio.to_thread(self.store.write, key, result.model_dump_json())
+		except Exception as e:
+			logger.warning(f"Transcription cache write failed: {e}")
+
+	async def get_or_compute(
+		self, key: str, compute: Callable[[], Awaitable[TranscriptionResult]]
+	) -> TranscriptionResult:
+		"""
+		Return the cached result for `key`, or compute it once for all concurrent callers.
+
+		Callers in this process join the same in-flight future. Across processes (Redis
+		cache backend only) a Redis lock (SET NX, renewed while held) elects a single worker to run
+		`compute`; the others poll the cache until its result appears, so a double
+		submit or a Celery redelivery does not pay for a second GPU job.
+
+		Args:
+			key: Cache key from make_key
+			compute: Coroutine factory that performs the transcription
+
+		Returns:
+			TranscriptionResult
+		"""
+		cached = await self.get(key)
+		if cached is not None:
+			return cached
+		if not self.settings.transcription_single_flight:
+			result = await compute()
+			await self.set(key, result)
+			return result
+
+		loop = asyncio.get_running_loop()
+		while True:
+			inflight = _inflight.get(key)
+			if inflight is None or inflight.get_loop() is not loop:
+				break
+			logger.info(f"Joining in-flight transcription ({key[:12]})")
+			try:
+				return await asyncio.shield(inflight)
+			except asyncio.CancelledError:
+				if not inflight.cancelled():
+					raise
+				# The owner was cancelled; take over the computation
+
+		future: asyncio.Future[TranscriptionResult] = loop.create_future()
+		_inflight[key] = future
+		try:
+			result = await self._compute_locked(key, compute)
+		except asyncio.CancelledError:
+			future.cancel()
+			raise
+		except BaseException as e:
+			future.set_exception(e)
+			# Mark retrieved: there may be no other waiters
+			future.exception()
+			raise
+		else:
+			future.set_result(result)
+			return result
+		finally:
+			if _inflight.get(key) is future:
+				del _inflight[key]
+
+	async def _compute_locked(
+		self, key: str, compute: Callable[[], Awaitable[TranscriptionResult]]
+	) -> TranscriptionResult:
+		"""Run `compute` under the cross-process lock for `key` (no lock unless the cache is in Redis)."""
+		client = self._get_lock_redis()
+		if client is None:
+			result = await compute()
+			await self.set(key, result)
+			return result
+
+		s = self.settings
+		lock_key = f"{_LOCK_KEY_PREFIX}{key}"
+		token = uuid.uuid4().hex
+		ttl_ms = int(s.transcription_lock_ttl_seconds * 1000)
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + s.transcription_lock_wait_seconds
+		while True:
+			try:
+				acquired = await asyncio.to_thread(client.set, lock_key, token, nx=True, px=ttl_ms)
+			except Exception as e:
+				logger.warning(f"Transcription lock unavailable, transcribing without it: {e}")
+				token = None
+				break
+			if acquired:
+				# Another worker may have finished between our cache miss and the lock
+				cached = await self.get(key)
+				if cached is not None:
+					await self._release_lock(client, lock_key, token)
+					return cached
+				break
+
+			cached = await self.get(key)
+			if cached is not None:
+				return cached
+			if loop.time() >= deadline:
+				logger.warning(f"Timed out waiting for in-flight transcription ({key[:12]}); transcribing anyway")
+				token = None
+				break
+			await asyncio.sleep(s.transcription_lock_poll_seconds)
+
+		renewal = None
+		if token is not None:
+			logger.debug(f"Acquired transcription lock ({key[:12]})")
+			renewal = asyncio.create_task(self._renew_lock(client, lock_key, token, ttl_ms))
+		try:
+			result = await compute()
+			await self.set(key, result)
+			return result
+		finally:
+			if renewal is not None:
+				renewal.cancel()
+				await self._release_lock(client, lock_key, token)
+
+	async def _renew_lock(self, client: Any, lock_key: str, token: str, ttl_ms: int) -> None:
+		"""Keep extending the lock TTL while the transcription runs."""
+		while True:
+			await asyncio.sleep(ttl_ms / 3000)
+			try:
+				extended = await asyncio.to_thread(client.eval, _EXTEND_LOCK_SCRIPT, 1, lock_key, token, ttl_ms)
+			except Exception as e:
+				logger.warning(f"Failed to renew transcription lock: {e}")
+				continue
+			if not extended:
+				logger.warning(f"Lost transcription lock {lock_key}")
+				return
+
+	async def _release_lock(self, client: Any, lock_key: str, token: str) -> None:
+		try:
+			await asyncio.to_thread(client.eval, _RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+		except Exception as e:
+			logger.warning(f"Failed to release transcription lock: {e}")
+
+	def _get_lock_redis(self) -> Any:
+		"""
+		Redis client for the cross-process lock, or None.
+
+		Only the Redis backend gets a lock: waiters read the owner's result from the
+		cache, and a disk cache is not shared across hosts, so waiters elsewhere would
+		never see it and would only transcribe again, one after another, once it is released.
+		"""
+		if self.store.backend != "redis":
+			return None
+		try:
+			return self.store.get_redis()
+		except ImportError:
+			logger.warning("redis package not installed; transcription coalescing is per-process only")
+			return None
+
+
+def is_cacheable(result: TranscriptionResult) -> bool:
+	"""
+	True if a result is clean enough to serve from cache.
+
+	Rejects empty transcripts, jobs (or chunks of a chunked job) that RunPod reported
+	as COMPLETED_WITH_ERRORS, and results whose text is the str(payload) fallback used
+	when no transcript could be found in the response, so a retry transcribes again.
+	"""
+	if not result.text or not result.text.strip():
+		return False
+	raw = result.raw or {}
+	statuses = [raw.get("status")] + [chunk.get("status") for chunk in raw.get("chunks") or [] if isinstance(chunk, dict)]
+	if "COMPLETED_WITH_ERRORS" in statuses:
+		return False
+	if result.raw is not None and result.text == str(result.raw):
+		return False
+	return True
+
+
+def sha256_bytes(data: bytes) -> str:
+	"""Hex SHA-256 of in-memory audio."""
+	return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+	"""Hex SHA-256 of a file, read in chunks."""
+	digest = hashlib.sha256()
+	with open(path, "rb") as f:
+		for chunk in iter(lambda: f.read(chunk_size), b""):
+			digest.update(chunk)
+	return digest.hexdigest()
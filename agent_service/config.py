@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal, get_args
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+DiarizationBackendName = Literal["pyannote", "lightweight", "guided"]
+DIARIZATION_BACKENDS: tuple[str, ...] = get_args(DiarizationBackendName)
+
 
 class Settings(BaseSettings):
 	# Ivrit.ai
@@ -22,7 +25,16 @@ class Settings(BaseSettings):
 	ivrit_runpod_base_url: str = Field(default="https://api.runpod.ai/v2")
 	ivrit_runpod_endpoint_id: str | None = None
 	ivrit_runpod_mode: str = Field(default="runsync")  # "runsync" or "run"
-	ivrit_runpod_status_poll_interval_seconds: float = Field(default=2.0)
+	ivrit_runpod_status_poll_interval_seconds: float = Field(default=2.0)  # Minimum delay between /status polls
+	ivrit_runpod_poll_max_interval_seconds: float = Field(default=30.0)
+	ivrit_runpod_poll_backoff_factor: float = Field(default=1.5)
+	ivrit_runpod_poll_jitter: float = Field(default=0.2)  # +/- fraction applied to each delay
+	ivrit_runpod_expected_rtf: float = Field(default=0.1)  # Expected processing seconds per audio second
+	ivrit_runpod_max_wait_seconds: float = Field(default=3600.0)  # Job is cancelled after this
+	# Optional: public URL of POST /webhooks/runpod so RunPod pushes completion instead of being polled
+	ivrit_runpod_webhook_url: str | None = None
+	ivrit_runpod_webhook_secret: str | None = None  # Required: the webhook is not registered without it
+	ivrit_runpod_webhook_fallback_poll_seconds: float = Field(default=60.0)  # Safety-net /status poll
 	ivrit_input_audio_field: str = Field(default="audio")
 	ivrit_input_language_field: str = Field(default="language")
 	ivrit_input_filename_field: str = Field(default="filename")
@@ -30,6 +42,40 @@ class Settings(BaseSettings):
 	ivrit_model: str | None = None
 	ivrit_return_segments: bool = Field(default=True)
 
+	# Pre-upload encoding for RunPod: "auto" (16 kHz mono FLAC, Opus if still over the blob limit),
+	# "flac", "opus" or "none" (send the original file)
+	ivrit_upload_codec: str = Field(default="auto")
+
+	# Chunked parallel transcription (RunPod only): long recordings are cut at silences and
+	# the chunks are transcribed as concurrent /run jobs, then re-stitched
+	ivrit_chunked_transcription: bool = Field(default=False)
+	ivrit_chunk_min_seconds: float = Field(default=300.0)
+	ivrit_chunk_max_seconds: float = Field(default=600.0)
+	ivrit_chunk_overlap_seconds: float = Field(default=5.0)
+	ivrit_chunk_max_concurrency: int = Field(default=8)
+
+	# Transcription result cache keyed by audio SHA-256 + model/language/params:
+	# "disk" (size-bounded LRU directory), "redis" (shared) or "none"; entries expire after the TTL
+	transcription_cache_backend: str = Field(default="disk")
+	transcription_cache_dir: str = Field(default="./.cache/transcriptions")
+	transcription_cache_max_bytes: int = Field(default=1024 * 1024 * 1024)  # 1GB
+	transcription_cache_ttl_seconds: int = Field(default=30 * 24 * 3600)
+	# Single-flight: concurrent requests for the same audio share one transcription
+	# (in-process futures; Redis lock across workers when transcription_cache_backend=redis)
+	transcription_single_flight: bool = Field(default=True)
+	transcription_lock_ttl_seconds: float = Field(default=300.0)  # Renewed while the holder is alive
+	transcription_lock_wait_seconds: float = Field(default=3600.0)  # Max wait for another worker's result
+	transcription_lock_poll_seconds: float = Field(default=2.0)
+
+	# Shared HTTP client for Ivrit/RunPod calls (one pooled client per process/event loop)
+	ivrit_http2: bool = Field(default=False)  # Requires the 'h2' package (httpx[http2])
+	ivrit_http_max_connections: int = Field(default=20)
+	ivrit_http_max_keepalive_connections: int = Field(default=10)
+	ivrit_http_keepalive_expiry_seconds: float = Field(default=30.0)
+	ivrit_connect_timeout_seconds: float = Field(default=10.0)
+	ivrit_upload_timeout_seconds: float = Field(default=900.0)  # Submit/upload, incl. runsync wait
+	ivrit_poll_timeout_seconds: float = Field(default=30.0)  # Each RunPod /status request
+
 	# RunPod (General)
 	runpod_api_key: str | None = Field(default=None, validation_alias="RUNPOD_API_KEY")
 
@@ -46,11 +92,36 @@ class Settings(BaseSettings):
 	# Primary: OpenRouter (Grok)
 	summarizer_provider: str = Field(default="openrouter")
 	
+	# Hierarchical (map-reduce) summarization for transcripts longer than the threshold:
+	# token-budgeted sections are summarized concurrently, then combined in a reduce pass
+	summary_map_reduce_threshold_tokens: int = Field(default=24000)
+	summary_chunk_max_tokens: int = Field(default=6000)
+	summary_chunk_gap_seconds: float = Field(default=20.0)  # Prefer section boundaries at pauses this long
+	summary_map_concurrency: int = Field(default=6)
+	summary_map_max_tokens: int = Field(default=1024)  # Output budget per section summary
+
+	# Transcript compaction before summarization (merge same-speaker turns, drop fillers,
+	# collapse ASR repetition loops) and an optional hard cap on input tokens
+	summary_compaction: bool = Field(default=True)
+	summary_max_turn_seconds: float = Field(default=90.0)
+	summary_dedupe_repeats: bool = Field(default=True)
+	summary_max_input_tokens: int | None = Field(default=None)
+
+	# Summary cache keyed by formatted transcript + system prompt + model/sampling params:
+	# "disk" (size-bounded LRU directory), "redis" (shared) or "none"
+	summary_cache_backend: str = Field(default="disk")
+	summary_cache_dir: str = Field(default="./.cache/summaries")
+	summary_cache_max_bytes: int = Field(default=256 * 1024 * 1024)  # 256MB
+	summary_cache_ttl_seconds: int = Field(default=7 * 24 * 3600)
+
 	# OpenRouter (Primary)
 	openrouter_api_key: str | None = Field(default=None, validation_alias="OPENROUTER_API_KEY")
 	openrouter_api_key0: str | None = Field(default=None, validation_alias="OPENROUTER_API_KEY0")
 	openrouter_base_url: str = Field(default="https://openrouter.ai/api/v1")
 	openrouter_model: str = Field(default="x-ai/grok-4-fast")
+	# LLMClient key pool: requests go to the key with the fewest in-flight calls
+	openrouter_max_concurrency_per_key: int = Field(default=8)
+	openrouter_default_retry_after_seconds: float = Field(default=5.0)  # Cooldown when a 429 has no Retry-After
 
 	# Gemini API settings (For Embeddings ONLY)
 	gemini_api_key: str | None = Field(default=None, validation_alias="GEMINI_API_KEY")
@@ -75,6 +146,10 @@ class Settings(BaseSettings):
 	pyannote_model: str = Field(default="pyannote/speaker-diarization-3.1")
 	pyannote_auth_token: str | None = None
 
+	# Local diarization backend: "pyannote" (default), "lightweight" (VAD + ECAPA + clustering, CPU-friendly)
+	# or "guided" (lightweight seeded with the organization's stored speaker voiceprints)
+	diarization_backend: DiarizationBackendName = Field(default="pyannote")
+
 	# CORS
 	cors_origins: str | None = Field(
 		default=None,
@@ -90,6 +165,12 @@ class Settings(BaseSettings):
 		description="JWT signing key. Override in production via JWT_SECRET_KEY env var.",
 	)
 
+	@field_validator("diarization_backend", mode="before")
+	@classmethod
+	def _normalize_diarization_backend(cls, value: Any) -> Any:
+		# Unknown names fail here, at startup, rather than in every processing job
+		return value.strip().lower() if isinstance(value, str) else value
+
 	@model_validator(mode="after")
 	def _normalize_urls(self) -> "Settings":
 		if self.redis_url is not None:
@@ -117,6 +198,12 @@ class Settings(BaseSettings):
 	xgboost_learning_rate: float = Field(default=0.1, description="XGBoost learning rate")
 	xgboost_max_depth: int = Field(default=3, description="XGBoost max depth")
 	xgboost_random_state: int = Field(default=42, description="XGBoost random state")
+	email_analysis_concurrency: int = Field(default=8, description="Max concurrent LLM scoring calls per email analysis node")
+	email_analysis_timeout_seconds: float = Field(default=60.0, description="Timeout per email LLM scoring call (falls back to a neutral score)")
+	communication_health_mode: str = Field(
+		default="combined",
+		description='Communication health scoring: "combined" (all 6 dimensions in one LLM call per email/meeting) or "per_dimension" (one call per dimension)',
+	)
 
 	# LangSmith (optional - for LangGraph Studio tracing)
 	langsmith_api_key: str | None = Field(default=None, description="LangSmith API key for tracing and debugging")
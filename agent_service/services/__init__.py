@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from agent_service.services.audio_processor import AudioProcessor
-from agent_service.services.diarization_merger import DiarizationMerger
+from agent_service.services.diarization_base import DiarizationBackend
+from agent_service.services.diarization_merger import DiarizationMerger, IncrementalDiarizationMerger
 # Lazy import for DiarizationService to avoid torchaudio compatibility issues
 def _get_diarization_service():
 	"""Lazy import to avoid startup errors if pyannote.audio has compatibility issues."""
@@ -15,6 +16,7 @@ def _get_diarization_service():
 
 DiarizationService = _get_diarization_service()
 from agent_service.services.hebrew_nlp import HebrewNLP
+from agent_service.services.lightweight_diarization import LightweightDiarizationService
 from agent_service.services.name_extractor import NameExtractor
 from agent_service.services.name_suggestion_service import NameSuggestionService
 from agent_service.services.orchestrator import ProcessingOrchestrator
@@ -40,9 +42,12 @@ VoiceprintService = _get_voiceprint_service()
 
 __all__ = [
 	"AudioProcessor",
+	"DiarizationBackend",
 	"DiarizationMerger",
 	"DiarizationService",
 	"HebrewNLP",
+	"IncrementalDiarizationMerger",
+	"LightweightDiarizationService",
 	"NameExtractor",
 	"NameSuggestionService",
 	"ProcessingOrchestrator",
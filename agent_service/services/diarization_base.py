@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class DiarizationBackend(ABC):
+	"""
+	Interface for local speaker diarization backends.
+
+	Backends return a list of segment dicts with 'start', 'end' (seconds),
+	'speaker' (e.g. 'SPK_00') and 'confidence' keys, so the orchestrator and
+	DiarizationMerger can treat them interchangeably.
+	"""
+
+	name: str = "base"
+
+	@abstractmethod
+	def diarize(
+		self,
+		audio_path: str | None = None,
+		audio_bytes: bytes | None = None,
+		num_speakers: int | None = None,
+		min_speakers: int | None = None,
+		max_speakers: int | None = None,
+	) -> list[dict[str, Any]]:  # pragma: no cover - interface
+		...
+
+	def get_speaker_count(self, audio_path: str, audio_bytes: bytes | None = None) -> int:
+		"""
+		Estimate the number of speakers in the audio.
+
+		Args:
+			audio_path: Path to audio file
+			audio_bytes: Optional raw audio bytes
+
+		Returns:
+			Estimated number of speakers
+		"""
+		segments = self.diarize(audio_path=audio_path, audio_bytes=audio_bytes)
+		return len(set(seg["speaker"] for seg in segments))
@@ -3,9 +3,93 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
+class SpeakerTimeline:
+	"""
+	Prefix-sum index over a diarization timeline.
+
+	The segment boundaries split the timeline into elementary intervals with a
+	fixed set of active speakers. Cumulative per-speaker, covered and overlapped
+	durations over those intervals answer "how long was each speaker active in
+	[start, end)" for any number of queries with two binary searches each.
+	"""
+
+	def __init__(self, segments: list[dict[str, Any]]) -> None:
+		"""
+		Build the timeline index.
+
+		Args:
+			segments: Diarization segments with 'start', 'end' and 'speaker'/'speaker_label' keys
+		"""
+		self.speakers: list[str] = sorted(
+			{seg.get("speaker") or seg.get("speaker_label") or "SPK_0" for seg in segments}
+		)
+		speaker_index = {speaker: i for i, speaker in enumerate(self.speakers)}
+
+		starts = np.array([float(seg.get("start", 0)) for seg in segments], dtype=np.float64)
+		ends = np.array([float(seg.get("end", 0)) for seg in segments], dtype=np.float64)
+		labels = np.array(
+			[speaker_index[seg.get("speaker") or seg.get("speaker_label") or "SPK_0"] for seg in segments],
+			dtype=np.int64,
+		)
+
+		self.boundaries = np.unique(np.concatenate((starts, ends))) if len(segments) else np.zeros(1)
+		n_intervals = max(len(self.boundaries) - 1, 0)
+
+		# Sweep: +1 at each segment start, -1 at its end, per speaker
+		deltas = np.zeros((len(self.speakers), n_intervals + 1), dtype=np.int64)
+		valid = ends > starts
+		np.add.at(deltas, (labels[valid], np.searchsorted(self.boundaries, starts[valid])), 1)
+		np.add.at(deltas, (labels[valid], np.searchsorted(self.boundaries, ends[valid])), -1)
+		activity = np.cumsum(deltas, axis=1)[:, :n_intervals] > 0
+
+		durations = np.diff(self.boundaries)
+		n_active = activity.sum(axis=0)
+		#: (n_speakers, n_intervals) activity, plus covered (>=1 speaker) and overlapped (>=2 speakers) rows
+		self._activity = np.vstack((activity, n_active >= 1, n_active >= 2)).astype(np.float64)
+		self._prefix = np.concatenate(
+			(np.zeros((len(self._activity), 1)), np.cumsum(self._activity * durations, axis=1)), axis=1
+		)
+
+	def durations(self, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+		"""
+		Active durations inside each [start, end) query window.
+
+		Args:
+			starts: Query window starts (seconds)
+			ends: Query window ends (seconds)
+
+		Returns:
+			Tuple of (per-speaker durations of shape (n_speakers, n_queries),
+			covered durations, overlapped-speech durations)
+		"""
+		totals = self._cumulative(ends) - self._cumulative(starts)
+		n_speakers = len(self.speakers)
+		return totals[:n_speakers], totals[n_speakers], totals[n_speakers + 1]
+
+	def active_at(self, times: np.ndarray) -> np.ndarray:
+		"""Speaker activity (n_speakers, n_queries) at single instants (for zero-length queries)."""
+		idx = self._interval_index(times)
+		inside = (times >= self.boundaries[0]) & (times < self.boundaries[-1])
+		return self._activity[: len(self.speakers)][:, idx] * inside
+
+	def _interval_index(self, times: np.ndarray) -> np.ndarray:
+		n_intervals = self._activity.shape[1]
+		return np.clip(np.searchsorted(self.boundaries, times, side="right") - 1, 0, max(n_intervals - 1, 0))
+
+	def _cumulative(self, times: np.ndarray) -> np.ndarray:
+		"""Cumulative active duration from the timeline start up to each time."""
+		if self._activity.shape[1] == 0:
+			return np.zeros((len(self._activity), len(times)))
+		clipped = np.clip(times, self.boundaries[0], self.boundaries[-1])
+		idx = self._interval_index(clipped)
+		return self._prefix[:, idx] + self._activity[:, idx] * (clipped - self.boundaries[idx])
+
+
 class DiarizationMerger:
 	"""
 	Service for merging diarization results from multiple sources.
@@ -15,21 +99,30 @@ class DiarizationMerger:
 	analysis and confidence scoring to resolve discrepancies.
 	"""
 
-	def __init__(self, overlap_threshold: float = 0.5, confidence_penalty: float = 0.1) -> None:
+	def __init__(
+		self,
+		overlap_threshold: float = 0.5,
+		confidence_penalty: float = 0.1,
+		overlapped_speech_threshold: float = 0.1,
+	) -> None:
 		"""
 		Initialize the diarization merger.
 
 		Args:
 			overlap_threshold: Minimum temporal overlap (0.0-1.0) required to consider segments matching
 			confidence_penalty: Penalty applied to segments with low confidence or mismatches
+			overlapped_speech_threshold: Fraction of a segment with 2+ simultaneous PyAnnote
+				speakers above which it is flagged as overlapped speech
 		"""
 		self.overlap_threshold = overlap_threshold
 		self.confidence_penalty = confidence_penalty
+		self.overlapped_speech_threshold = overlapped_speech_threshold
 
 	def merge(
 		self,
 		ivrit_segments: list[dict[str, Any]],
 		pyannote_segments: list[dict[str, Any]] | None = None,
+		speaker_mapping: dict[str, str] | None = None,
 	) -> list[dict[str, Any]]:
 		"""
 		Merge diarization results from Ivrit.ai and PyAnnote.
@@ -37,6 +130,9 @@ class DiarizationMerger:
 		Args:
 			ivrit_segments: Segments from Ivrit.ai (primary source, includes transcription)
 			pyannote_segments: Segments from PyAnnote (validation source, optional)
+			speaker_mapping: Precomputed PyAnnote -> Ivrit speaker mapping. Built from the
+				given segments if None (the incremental merger passes one built from the
+				whole recording seen so far)
 
 		Returns:
 			Merged list of segment dictionaries with:
@@ -45,6 +141,8 @@ class DiarizationMerger:
 			- 'text': transcription text (from Ivrit)
 			- 'confidence': merged confidence score
 			- 'validation_status': 'validated', 'discrepancy', or 'unvalidated'
+			- 'overlapped_speech': True if PyAnnote heard 2+ speakers in the segment
+			  (only when PyAnnote segments are provided)
 		"""
 		if not ivrit_segments:
 			logger.warning("No Ivrit segments provided, returning empty result")
@@ -66,30 +164,32 @@ class DiarizationMerger:
 			f"Merging {len(ivrit_segments)} Ivrit segments with {len(pyannote_segments)} PyAnnote segments"
 		)
 
-		# Build speaker mapping between Ivrit and PyAnnote
-		speaker_mapping = self._build_speaker_mapping(ivrit_segments, pyannote_segments)
+		# Duration-weighted PyAnnote speaker votes, coverage and overlapped speech for
+		# every Ivrit segment at once
+		timeline = SpeakerTimeline(pyannote_segments)
+		starts, ends, ivrit_speakers = self._segment_bounds(ivrit_segments)
+		votes, covered, overlapped = timeline.durations(starts, ends)
+		segment_durations = ends - starts
+		instant = segment_durations <= 0
+		if instant.any():
+			votes[:, instant] = timeline.active_at(starts[instant])
+		safe_durations = np.where(segment_durations > 0, segment_durations, 1.0)
+		coverage_ratios = np.where(segment_durations > 0, covered / safe_durations, 0.0)
+		overlap_ratios = np.where(segment_durations > 0, overlapped / safe_durations, 0.0)
+
+		# Build speaker mapping between Ivrit and PyAnnote from the same votes
+		if speaker_mapping is None:
+			speaker_mapping = self._mapping_from_votes(ivrit_speakers, timeline.speakers, votes)
+			logger.info(f"Built speaker mapping: {speaker_mapping}")
 
 		# Merge segments
 		merged_segments: list[dict[str, Any]] = []
 
-		for ivrit_seg in ivrit_segments:
-			ivrit_start = float(ivrit_seg.get("start", 0))
-			ivrit_end = float(ivrit_seg.get("end", ivrit_start))
-			ivrit_speaker = ivrit_seg.get("speaker") or ivrit_seg.get("speaker_label") or "SPK_0"
-
-			# Find overlapping PyAnnote segments
-			overlapping_pyannote = [
-				pseg
-				for pseg in pyannote_segments
-				if self._segments_overlap(
-					ivrit_start,
-					ivrit_end,
-					float(pseg.get("start", 0)),
-					float(pseg.get("end", 0)),
-				)
-			]
+		for i, ivrit_seg in enumerate(ivrit_segments):
+			ivrit_speaker = ivrit_speakers[i]
+			is_overlapped = bool(overlap_ratios[i] >= self.overlapped_speech_threshold and overlapped[i] > 0)
 
-			if not overlapping_pyannote:
+			if not votes[:, i].any():
 				# No overlap - use Ivrit segment as-is with lower confidence
 				merged_segments.append(
 					{
@@ -97,39 +197,32 @@ class DiarizationMerger:
 						"speaker": ivrit_speaker,
 						"validation_status": "unvalidated",
 						"confidence": (ivrit_seg.get("confidence") or 0.8) - self.confidence_penalty,
+						"overlapped_speech": False,
 					}
 				)
 				continue
 
 			# Check if speakers agree
-			pyannote_speakers = [
-				pseg.get("speaker") or pseg.get("speaker_label")
-				for pseg in overlapping_pyannote
-			]
-			most_common_pyannote = self._most_common_speaker(pyannote_speakers)
+			most_common_pyannote = timeline.speakers[int(votes[:, i].argmax())]
 
 			# Map PyAnnote speaker to Ivrit speaker namespace
 			mapped_pyannote_speaker = speaker_mapping.get(most_common_pyannote, ivrit_speaker)
 
 			if mapped_pyannote_speaker == ivrit_speaker:
 				# Agreement - validated segment with high confidence
-				overlap_ratio = self._calculate_overlap_ratio(
-					ivrit_start,
-					ivrit_end,
-					overlapping_pyannote,
-				)
 				merged_segments.append(
 					{
 						**ivrit_seg,
 						"speaker": ivrit_speaker,
 						"validation_status": "validated",
-						"confidence": min(0.95, (ivrit_seg.get("confidence") or 0.8) + 0.1 * overlap_ratio),
+						"confidence": min(0.95, (ivrit_seg.get("confidence") or 0.8) + 0.1 * float(coverage_ratios[i])),
+						"overlapped_speech": is_overlapped,
 					}
 				)
 			else:
 				# Discrepancy - flag for review, use Ivrit speaker but lower confidence
 				logger.warning(
-					f"Speaker discrepancy at {ivrit_start:.2f}-{ivrit_end:.2f}: "
+					f"Speaker discrepancy at {starts[i]:.2f}-{ends[i]:.2f}: "
 					f"Ivrit={ivrit_speaker}, PyAnnote={most_common_pyannote} (mapped={mapped_pyannote_speaker})"
 				)
 				merged_segments.append(
@@ -139,13 +232,17 @@ class DiarizationMerger:
 						"validation_status": "discrepancy",
 						"confidence": (ivrit_seg.get("confidence") or 0.8) - self.confidence_penalty,
 						"alternative_speaker": mapped_pyannote_speaker,
+						"overlapped_speech": is_overlapped,
 					}
 				)
 
-		logger.info(f"Merged diarization completed: {len(merged_segments)} segments")
+		logger.info(
+			f"Merged diarization completed: {len(merged_segments)} segments, "
+			f"{sum(1 for seg in merged_segments if seg['overlapped_speech'])} with overlapped speech"
+		)
 		return merged_segments
 
-	def _build_speaker_mapping(
+	def build_speaker_mapping(
 		self,
 		ivrit_segments: list[dict[str, Any]],
 		pyannote_segments: list[dict[str, Any]],
@@ -162,91 +259,245 @@ class DiarizationMerger:
 		Returns:
 			Dictionary mapping PyAnnote speaker labels to Ivrit speaker labels
 		"""
-		mapping: dict[str, str] = {}
+		if not ivrit_segments or not pyannote_segments:
+			return {}
 
-		# Get unique speakers from each source
-		ivrit_speakers = set()
-		for seg in ivrit_segments:
-			speaker = seg.get("speaker") or seg.get("speaker_label")
-			if speaker:
-				ivrit_speakers.add(speaker)
-
-		pyannote_speakers = set()
-		for seg in pyannote_segments:
-			speaker = seg.get("speaker") or seg.get("speaker_label")
-			if speaker:
-				pyannote_speakers.add(speaker)
-
-		# For each PyAnnote speaker, find the Ivrit speaker with most temporal overlap
-		for pyannote_speaker in pyannote_speakers:
-			pyannote_segs_for_speaker = [
-				s for s in pyannote_segments
-				if (s.get("speaker") or s.get("speaker_label")) == pyannote_speaker
-			]
+		timeline = SpeakerTimeline(pyannote_segments)
+		starts, ends, ivrit_speakers = self._segment_bounds(ivrit_segments)
+		votes, _, _ = timeline.durations(starts, ends)
+		mapping = self._mapping_from_votes(ivrit_speakers, timeline.speakers, votes)
+		logger.info(f"Built speaker mapping: {mapping}")
+		return mapping
 
-			best_ivrit_speaker: str | None = None
-			max_overlap_time = 0.0
+	def speaker_cooccurrence(
+		self,
+		ivrit_segments: list[dict[str, Any]],
+		pyannote_segments: list[dict[str, Any]],
+	) -> dict[str, dict[str, float]]:
+		"""
+		Total overlap time between each PyAnnote speaker and each Ivrit speaker.
 
-			for ivrit_speaker in ivrit_speakers:
-				ivrit_segs_for_speaker = [
-					s for s in ivrit_segments
-					if (s.get("speaker") or s.get("speaker_label")) == ivrit_speaker
-				]
+		Overlap is additive over segments, so totals for disjoint batches can be
+		summed (see IncrementalDiarizationMerger).
 
-				total_overlap = 0.0
-				for ivrit_seg in ivrit_segs_for_speaker:
-					ivrit_start = float(ivrit_seg.get("start", 0))
-					ivrit_end = float(ivrit_seg.get("end", ivrit_start))
+		Args:
+			ivrit_segments: Ivrit segments
+			pyannote_segments: PyAnnote segments
 
-					for pyannote_seg in pyannote_segs_for_speaker:
-						pyannote_start = float(pyannote_seg.get("start", 0))
-						pyannote_end = float(pyannote_seg.get("end", pyannote_start))
+		Returns:
+			{pyannote_label: {ivrit_label: seconds}}, with only positive totals
+		"""
+		if not ivrit_segments or not pyannote_segments:
+			return {}
+
+		timeline = SpeakerTimeline(pyannote_segments)
+		starts, ends, ivrit_speakers = self._segment_bounds(ivrit_segments)
+		votes, _, _ = timeline.durations(starts, ends)
+		ivrit_labels, cooccurrence = self._cooccurrence(ivrit_speakers, len(timeline.speakers), votes)
+		totals: dict[str, dict[str, float]] = {}
+		for p_idx, i_idx in zip(*np.nonzero(cooccurrence > 0)):
+			totals.setdefault(timeline.speakers[p_idx], {})[ivrit_labels[i_idx]] = float(cooccurrence[p_idx, i_idx])
+		return totals
+
+	def _segment_bounds(self, segments: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+		"""Extract start/end arrays and speaker labels from Ivrit segments."""
+		starts = np.array([float(seg.get("start", 0)) for seg in segments], dtype=np.float64)
+		ends = np.array(
+			[float(seg.get("end", seg.get("start", 0))) for seg in segments], dtype=np.float64
+		)
+		speakers = [seg.get("speaker") or seg.get("speaker_label") or "SPK_0" for seg in segments]
+		return starts, ends, speakers
 
-						overlap = self._calculate_overlap(ivrit_start, ivrit_end, pyannote_start, pyannote_end)
-						total_overlap += overlap
+	def _mapping_from_votes(
+		self,
+		ivrit_speakers: list[str],
+		pyannote_speakers: list[str],
+		votes: np.ndarray,
+	) -> dict[str, str]:
+		"""
+		Map each PyAnnote speaker to the Ivrit speaker it co-occurs with the longest.
 
-				if total_overlap > max_overlap_time:
-					max_overlap_time = total_overlap
-					best_ivrit_speaker = ivrit_speaker
+		Args:
+			ivrit_speakers: Ivrit speaker label per segment
+			pyannote_speakers: PyAnnote speaker labels (rows of `votes`)
+			votes: Per-speaker overlap durations of shape (n_pyannote_speakers, n_segments)
 
-			if best_ivrit_speaker:
-				mapping[pyannote_speaker] = best_ivrit_speaker
+		Returns:
+			Dictionary mapping PyAnnote speaker labels to Ivrit speaker labels
+		"""
+		ivrit_labels, cooccurrence = self._cooccurrence(ivrit_speakers, len(pyannote_speakers), votes)
 
-		logger.info(f"Built speaker mapping: {mapping}")
+		mapping: dict[str, str] = {}
+		for p_idx, pyannote_speaker in enumerate(pyannote_speakers):
+			best = int(cooccurrence[p_idx].argmax())
+			if cooccurrence[p_idx, best] > 0:
+				mapping[pyannote_speaker] = ivrit_labels[best]
 		return mapping
 
-	def _segments_overlap(self, start1: float, end1: float, start2: float, end2: float) -> bool:
-		"""Check if two time segments overlap."""
-		return not (end1 <= start2 or end2 <= start1)
+	def _cooccurrence(
+		self,
+		ivrit_speakers: list[str],
+		n_pyannote_speakers: int,
+		votes: np.ndarray,
+	) -> tuple[list[str], np.ndarray]:
+		"""Sum per-segment votes into (n_pyannote_speakers, n_ivrit_labels) overlap totals."""
+		ivrit_labels = sorted(set(ivrit_speakers))
+		label_index = {label: i for i, label in enumerate(ivrit_labels)}
+		segment_labels = np.array([label_index[label] for label in ivrit_speakers], dtype=np.int64)
+
+		# Total overlap time between each (PyAnnote speaker, Ivrit speaker) pair
+		cooccurrence = np.zeros((n_pyannote_speakers, len(ivrit_labels)))
+		np.add.at(cooccurrence.T, segment_labels, votes.T)
+		return ivrit_labels, cooccurrence
+
+
+class IncrementalDiarizationMerger:
+	"""
+	Incremental front-end for DiarizationMerger.
+
+	Accepts Ivrit and PyAnnote segment batches as they arrive (e.g. from chunked
+	transcription or chunked diarization) and emits merged segments as soon as the
+	region they cover can no longer change. With every batch the source reports its
+	watermark - the time up to which it has delivered all of its segments - and an
+	Ivrit segment is final once it ends at or before both watermarks. Batches may
+	arrive in any order as long as the watermarks they report are accurate.
+
+	The PyAnnote -> Ivrit speaker mapping follows running co-occurrence totals: each
+	new batch only adds its overlap with the other source's segments in the same time
+	window. Segments that were already emitted keep the mapping they were merged with.
+	"""
 
-	def _calculate_overlap(self, start1: float, end1: float, start2: float, end2: float) -> float:
-		"""Calculate overlap duration between two segments."""
-		if not self._segments_overlap(start1, end1, start2, end2):
-			return 0.0
-		overlap_start = max(start1, start2)
-		overlap_end = min(end1, end2)
-		return overlap_end - overlap_start
+	def __init__(self, merger: DiarizationMerger | None = None, use_pyannote: bool = True) -> None:
+		"""
+		Initialize the incremental merger.
 
-	def _calculate_overlap_ratio(
+		Args:
+			merger: Merger used for scoring (a default DiarizationMerger if None)
+			use_pyannote: Whether PyAnnote batches are expected. If False, only the
+				Ivrit watermark gates finalization
+		"""
+		self.merger = merger or DiarizationMerger()
+		self.use_pyannote = use_pyannote
+		self._ivrit_segments: list[dict[str, Any]] = []
+		self._pyannote_segments: list[dict[str, Any]] = []
+		self._pending: list[dict[str, Any]] = []
+		# PyAnnote label -> Ivrit label -> overlap seconds, over everything received so far
+		self._cooccurrence: dict[str, dict[str, float]] = {}
+		self._ivrit_watermark = 0.0
+		self._pyannote_watermark = 0.0
+		self._emitted = 0
+
+	@property
+	def watermark(self) -> float:
+		"""Time (seconds) up to which merged output is final."""
+		if not self.use_pyannote:
+			return self._ivrit_watermark
+		return min(self._ivrit_watermark, self._pyannote_watermark)
+
+	@property
+	def emitted_count(self) -> int:
+		"""Number of merged segments emitted so far."""
+		return self._emitted
+
+	def add_ivrit_segments(
 		self,
-		start: float,
-		end: float,
-		overlapping_segments: list[dict[str, Any]],
-	) -> float:
-		"""Calculate what portion of the segment is covered by overlapping segments."""
-		total_overlap = sum(
-			self._calculate_overlap(start, end, float(s.get("start", 0)), float(s.get("end", 0)))
-			for s in overlapping_segments
-		)
-		segment_duration = end - start
-		return total_overlap / segment_duration if segment_duration > 0 else 0.0
+		segments: list[dict[str, Any]],
+		complete_until: float,
+	) -> list[dict[str, Any]]:
+		"""
+		Add a batch of Ivrit segments.
+
+		Args:
+			segments: New Ivrit segments (any order, must not repeat earlier ones)
+			complete_until: Time up to which Ivrit has now delivered all segments
+				(not just the end of this batch when batches can arrive out of order)
+
+		Returns:
+			Newly finalized merged segments, ordered by start time
+		"""
+		self._add_cooccurrence(segments, self._overlapping(self._pyannote_segments, segments))
+		self._ivrit_segments.extend(segments)
+		self._pending.extend(segments)
+		self._ivrit_watermark = max(self._ivrit_watermark, complete_until)
+		return self._flush(self.watermark)
 
-	def _most_common_speaker(self, speakers: list[str]) -> str:
-		"""Find the most common speaker in a list."""
-		if not speakers:
-			return "SPK_0"
-		from collections import Counter
+	def add_pyannote_segments(
+		self,
+		segments: list[dict[str, Any]],
+		complete_until: float,
+	) -> list[dict[str, Any]]:
+		"""
+		Add a batch of PyAnnote segments.
+
+		Args:
+			segments: New PyAnnote segments
+			complete_until: Time up to which PyAnnote has now delivered all segments
+				(not just the end of this batch when batches can arrive out of order)
 
-		counter = Counter(speakers)
-		return counter.most_common(1)[0][0]
+		Returns:
+			Newly finalized merged segments, ordered by start time
+		"""
+		self._add_cooccurrence(self._overlapping(self._ivrit_segments, segments), segments)
+		self._pyannote_segments.extend(segments)
+		self._pyannote_watermark = max(self._pyannote_watermark, complete_until)
+		return self._flush(self.watermark)
+
+	def finalize(self) -> list[dict[str, Any]]:
+		"""
+		Flush all remaining segments once both sources have finished.
+
+		Returns:
+			Remaining merged segments, ordered by start time
+		"""
+		return self._flush(float("inf"))
+
+	@property
+	def speaker_mapping(self) -> dict[str, str]:
+		"""PyAnnote -> Ivrit speaker mapping from the co-occurrence totals so far."""
+		return {
+			pyannote_speaker: max(sorted(totals), key=totals.__getitem__)
+			for pyannote_speaker, totals in self._cooccurrence.items()
+		}
+
+	def _add_cooccurrence(self, ivrit_segments: list[dict[str, Any]], pyannote_segments: list[dict[str, Any]]) -> None:
+		"""Add the overlap between a new batch and the other source's segments to the totals."""
+		for pyannote_speaker, totals in self.merger.speaker_cooccurrence(ivrit_segments, pyannote_segments).items():
+			running = self._cooccurrence.setdefault(pyannote_speaker, {})
+			for ivrit_speaker, seconds in totals.items():
+				running[ivrit_speaker] = running.get(ivrit_speaker, 0.0) + seconds
+
+	@staticmethod
+	def _overlapping(segments: list[dict[str, Any]], batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+		"""Segments that overlap the time window spanned by a batch."""
+		if not batch:
+			return []
+		window_start = min(float(seg.get("start", 0)) for seg in batch)
+		window_end = max(float(seg.get("end", seg.get("start", 0))) for seg in batch)
+		return [
+			seg for seg in segments
+			if float(seg.get("end", 0)) > window_start and float(seg.get("start", 0)) < window_end
+		]
+
+	def _flush(self, watermark: float) -> list[dict[str, Any]]:
+		"""Merge and emit pending Ivrit segments that end at or before the watermark."""
+		ready = [seg for seg in self._pending if float(seg.get("end", seg.get("start", 0))) <= watermark]
+		if not ready:
+			return []
+		self._pending = [seg for seg in self._pending if float(seg.get("end", seg.get("start", 0))) > watermark]
+		ready.sort(key=lambda seg: float(seg.get("start", 0)))
+
+		if not self.use_pyannote or not self._pyannote_segments:
+			merged = self.merger.merge(ready)
+		else:
+			# Only PyAnnote segments touching the ready window can affect the votes
+			window_start = float(ready[0].get("start", 0))
+			window_end = max(float(seg.get("end", seg.get("start", 0))) for seg in ready)
+			relevant = [
+				seg for seg in self._pyannote_segments
+				if float(seg.get("end", 0)) >= window_start and float(seg.get("start", 0)) <= window_end
+			]
+			merged = self.merger.merge(ready, relevant or None, speaker_mapping=self.speaker_mapping)
 
+		self._emitted += len(merged)
+		logger.debug(f"Incremental merge emitted {len(merged)} segments up to {watermark:.2f}s")
+		return merged
@@ -9,6 +9,7 @@ from typing import Any
 import torchaudio
 from pyannote.audio import Pipeline
 
+from agent_service.services.diarization_base import DiarizationBackend
 from agent_service.services.s3_model_storage import configure_huggingface_cache_for_s3
 
 # Configure HuggingFace to use minimal local cache
@@ -17,7 +18,7 @@ configure_huggingface_cache_for_s3()
 logger = logging.getLogger(__name__)
 
 
-class DiarizationService:
+class DiarizationService(DiarizationBackend):
 	"""
 	Service for speaker diarization using PyAnnote.audio.
 
@@ -30,6 +31,8 @@ class DiarizationService:
 	pyannote/speaker-diarization models.
 	"""
 
+	name = "pyannote"
+
 	def __init__(
 		self,
 		model_name: str = "pyannote/speaker-diarization-3.1",
@@ -68,6 +71,7 @@ class DiarizationService:
 					use_auth_token=self.use_auth_token,
 				)
 				if self.device == "cuda" and hasattr(self.pipeline, "to"):
+					import torch
 					self.pipeline = self.pipeline.to(torch.device(self.device))
 				logger.info("PyAnnote pipeline loaded successfully")
 			except Exception as e:
@@ -163,19 +167,3 @@ class DiarizationService:
 					temp_file.unlink()
 				except Exception as e:
 					logger.warning(f"Failed to delete temp file {temp_file}: {e}")
-
-	def get_speaker_count(self, audio_path: str, audio_bytes: bytes | None = None) -> int:
-		"""
-		Estimate the number of speakers in the audio.
-
-		Args:
-			audio_path: Path to audio file
-			audio_bytes: Optional raw audio bytes
-
-		Returns:
-			Estimated number of speakers
-		"""
-		segments = self.diarize(audio_path=audio_path, audio_bytes=audio_bytes)
-		unique_speakers = set(seg["speaker"] for seg in segments)
-		return len(unique_speakers)
-
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, TYPE_CHECKING
+
+import numpy as np
+
+from agent_service.services.audio_processor import AudioProcessor
+from agent_service.services.diarization_base import DiarizationBackend
+from agent_service.utils.frame_energy import frame_energy
+
+if TYPE_CHECKING:
+	from agent_service.services.voiceprint_service import VoiceprintService
+
+logger = logging.getLogger(__name__)
+
+
+class LightweightDiarizationService(DiarizationBackend):
+	"""
+	CPU-friendly speaker diarization built from components we already ship.
+
+	Pipeline:
+	1. Energy-based voice activity detection (NumPy) to find speech regions
+	2. Sliding-window ECAPA embeddings from VoiceprintService
+	3. Agglomerative clustering (scikit-learn, cosine/average linkage)
+	4. Window labels merged back into contiguous speaker segments
+
+	Much cheaper than PyAnnote 3.1 (no segmentation model, no overlap detection),
+	at the cost of not modelling overlapped speech.
+
+	When `known_speakers` voiceprints are passed to diarize(), windows close to a
+	known centroid are labeled with that speaker directly and only the remaining
+	windows are clustered (known-speaker-guided mode).
+	"""
+
+	name = "lightweight"
+
+	def __init__(
+		self,
+		voiceprint_service: "VoiceprintService | None" = None,
+		sample_rate: int = 16000,
+		window_seconds: float = 1.5,
+		hop_seconds: float = 0.75,
+		vad_margin_db: float = 15.0,
+		min_speech_seconds: float = 0.3,
+		min_gap_seconds: float = 0.3,
+		distance_threshold: float = 0.6,
+		known_speaker_threshold: float = 0.7,
+	) -> None:
+		"""
+		Initialize the lightweight diarization backend.
+
+		Args:
+			voiceprint_service: VoiceprintService used for window embeddings (lazy-created if None)
+			sample_rate: Sample rate audio is decoded at (ECAPA expects 16kHz)
+			window_seconds: Embedding window length in seconds
+			hop_seconds: Hop between consecutive embedding windows in seconds
+			vad_margin_db: Frames louder than the noise floor by this margin count as speech
+			min_speech_seconds: Speech regions shorter than this are dropped
+			min_gap_seconds: Silences shorter than this are bridged
+			distance_threshold: Cosine distance threshold used when the speaker count is unknown
+			known_speaker_threshold: Minimum cosine similarity for a window to be assigned to a known speaker
+		"""
+		self._voiceprint_service = voiceprint_service
+		self.audio_processor = AudioProcessor(default_sample_rate=sample_rate)
+		self.sample_rate = sample_rate
+		self.window_seconds = window_seconds
+		self.hop_seconds = hop_seconds
+		self.vad_margin_db = vad_margin_db
+		self.min_speech_seconds = min_speech_seconds
+		self.min_gap_seconds = min_gap_seconds
+		self.distance_threshold = distance_threshold
+		self.known_speaker_threshold = known_speaker_threshold
+
+	@property
+	def voiceprint_service(self) -> "VoiceprintService":
+		"""Lazily create the VoiceprintService (avoids torch import until needed)."""
+		if self._voiceprint_service is None:
+			from agent_service.services.voiceprint_service import VoiceprintService
+
+			self._voiceprint_service = VoiceprintService()
+		return self._voiceprint_service
+
+	def diarize(
+		self,
+		audio_path: str | None = None,
+		audio_bytes: bytes | None = None,
+		num_speakers: int | None = None,
+		min_speakers: int | None = None,
+		max_speakers: int | None = None,
+		known_speakers: dict[str, list[float]] | None = None,
+	) -> list[dict[str, Any]]:
+		"""
+		Perform speaker diarization on audio.
+
+		Args:
+			audio_path: Path to audio file (WAV, MP3, etc.)
+			audio_bytes: Raw audio bytes (used if audio_path not provided)
+			num_speakers: Exact number of speakers (if known)
+			min_speakers: Minimum number of speakers
+			max_speakers: Maximum number of speakers
+			known_speakers: Optional mapping of speaker ID -> stored voiceprint embedding
+				(e.g. Speaker.voiceprint_embedding, zero-padded to 256 dims). Enables guided mode.
+
+		Returns:
+			List of segment dictionaries with 'start', 'end', 'speaker' and 'confidence' keys,
+			in the same format as DiarizationService (PyAnnote). In guided mode, segments of
+			known speakers are labeled 'SPK_<speaker_id>' and carry 'speaker_id' and a
+			'confidence' equal to the mean voiceprint similarity.
+
+		Raises:
+			ValueError: If neither audio_path nor audio_bytes is provided
+			RuntimeError: If decoding, embedding or clustering fails
+		"""
+		if audio_path is None and audio_bytes is None:
+			raise ValueError("Either audio_path or audio_bytes must be provided")
+
+		try:
+			audio, sr = self.audio_processor.load_audio(audio_path, audio_bytes, sample_rate=self.sample_rate)
+
+			regions = self.detect_speech_regions(audio, sr)
+			if not regions:
+				logger.warning("Lightweight diarization found no speech regions")
+				return []
+
+			windows = self._build_windows(regions)
+			embeddings = self.voiceprint_service.generate_window_embeddings(audio, sr, windows)
+			speakers, similarities = self._assign_known_speakers(embeddings, known_speakers or {})
+			unknown_idx = [i for i, speaker in enumerate(speakers) if speaker is None]
+			n_known = len({speaker for speaker in speakers if speaker is not None})
+			if unknown_idx:
+				labels = self.cluster_embeddings(
+					embeddings[unknown_idx],
+					num_speakers=max(num_speakers - n_known, 1) if num_speakers is not None else None,
+					min_speakers=max(min_speakers - n_known, 1) if min_speakers is not None else None,
+					max_speakers=max(max_speakers - n_known, 1) if max_speakers is not None else None,
+				)
+				for i, label in zip(unknown_idx, labels.tolist()):
+					speakers[i] = f"SPK_{label:02d}"
+
+			segments = self._labels_to_segments(regions, windows, speakers)
+			if n_known:
+				self._annotate_known_speakers(segments, windows, speakers, similarities, set(known_speakers or {}))
+				logger.info(f"Guided diarization labeled {n_known} known speakers directly")
+
+			logger.info(
+				f"Lightweight diarization completed: {len(segments)} segments, "
+				f"{len(set(s['speaker'] for s in segments))} speakers"
+			)
+			return segments
+
+		except Exception as e:
+			logger.error(f"Error during lightweight diarization: {e}")
+			raise RuntimeError(f"Lightweight diarization failed: {e}") from e
+
+	def detect_speech_regions(self, audio: np.ndarray, sample_rate: int) -> list[tuple[float, float]]:
+		"""
+		Energy-based voice activity detection.
+
+		Args:
+			audio: Mono audio samples
+			sample_rate: Sample rate of `audio`
+
+		Returns:
+			Sorted list of (start, end) speech regions in seconds
+		"""
+		frame_len = int(0.03 * sample_rate)
+		hop_len = int(0.01 * sample_rate)
+		if len(audio) < frame_len:
+			return []
+
+		energy_db = 10.0 * np.log10(frame_energy(audio, frame_len, hop_len) + 1e-10)
+		threshold = np.percentile(energy_db, 10) + self.vad_margin_db
+		is_speech = energy_db > threshold
+
+		# Run boundaries of the boolean speech mask
+		padded = np.concatenate(([False], is_speech, [False]))
+		changes = np.flatnonzero(padded[1:] != padded[:-1])
+		starts, ends = changes[::2], changes[1::2]
+
+		frame_seconds = hop_len / sample_rate
+		total_seconds = len(audio) / sample_rate
+		regions: list[tuple[float, float]] = []
+		for start_idx, end_idx in zip(starts, ends):
+			start = start_idx * frame_seconds
+			end = min(total_seconds, end_idx * frame_seconds + frame_len / sample_rate)
+			if regions and start - regions[-1][1] < self.min_gap_seconds:
+				regions[-1] = (regions[-1][0], end)
+			else:
+				regions.append((start, end))
+
+		return [(start, end) for start, end in regions if end - start >= self.min_speech_seconds]
+
+	def cluster_embeddings(
+		self,
+		embeddings: np.ndarray,
+		num_speakers: int | None = None,
+		min_speakers: int | None = None,
+		max_speakers: int | None = None,
+	) -> np.ndarray:
+		"""
+		Cluster window embeddings into speakers.
+
+		Args:
+			embeddings: L2-normalized embeddings of shape (n_windows, dim)
+			num_speakers: Exact number of speakers (if known)
+			min_speakers: Minimum number of speakers
+			max_speakers: Maximum number of speakers
+
+		Returns:
+			Integer cluster label per window, renumbered by first appearance
+		"""
+		n_windows = len(embeddings)
+		if n_windows < 2 or num_speakers == 1:
+			return np.zeros(n_windows, dtype=int)
+
+		from sklearn.cluster import AgglomerativeClustering
+
+		if num_speakers is not None:
+			clustering = AgglomerativeClustering(
+				n_clusters=min(num_speakers, n_windows), metric="cosine", linkage="average"
+			)
+			labels = clustering.fit_predict(embeddings)
+		else:
+			clustering = AgglomerativeClustering(
+				n_clusters=None,
+				metric="cosine",
+				linkage="average",
+				distance_threshold=self.distance_threshold,
+			)
+			labels = clustering.fit_predict(embeddings)
+			n_found = len(set(labels.tolist()))
+			clamped = max(min_speakers or 1, min(n_found, max_speakers or n_found))
+			clamped = min(clamped, n_windows)
+			if clamped != n_found:
+				if clamped == 1:
+					labels = np.zeros(n_windows, dtype=int)
+				else:
+					labels = AgglomerativeClustering(
+						n_clusters=clamped, metric="cosine", linkage="average"
+					).fit_predict(embeddings)
+
+		# Renumber so the first speaker heard is SPK_00, the second SPK_01, ...
+		order: dict[int, int] = {}
+		for label in labels.tolist():
+			order.setdefault(label, len(order))
+		return np.array([order[label] for label in labels.tolist()], dtype=int)
+
+	def _assign_known_speakers(
+		self,
+		embeddings: np.ndarray,
+		known_speakers: dict[str, list[float]],
+	) -> tuple[list[str | None], np.ndarray]:
+		"""
+		Assign windows to known speakers by cosine similarity to their voiceprints.
+
+		Returns:
+			Tuple of (speaker label or None per window, best similarity per window)
+		"""
+		n_windows = len(embeddings)
+		if not known_speakers or n_windows == 0:
+			return [None] * n_windows, np.zeros(n_windows)
+
+		dim = embeddings.shape[1]
+		speaker_ids = list(known_speakers.keys())
+		# Stored voiceprints are zero-padded to 256 dims; compare on the model dimension
+		centroids = np.array([np.asarray(known_speakers[sid], dtype=np.float32)[:dim] for sid in speaker_ids])
+		centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-8
+
+		similarity = embeddings @ centroids.T
+		best = similarity.argmax(axis=1)
+		best_similarity = similarity[np.arange(n_windows), best]
+		speakers: list[str | None] = [
+			f"SPK_{speaker_ids[idx]}" if sim >= self.known_speaker_threshold else None
+			for idx, sim in zip(best.tolist(), best_similarity.tolist())
+		]
+		return speakers, best_similarity
+
+	def _annotate_known_speakers(
+		self,
+		segments: list[dict[str, Any]],
+		windows: list[tuple[float, float]],
+		speakers: list[str | None],
+		similarities: np.ndarray,
+		known_ids: set[str],
+	) -> None:
+		"""Attach speaker_id and mean voiceprint similarity to known-speaker segments."""
+		centers = np.array([(start + end) / 2 for start, end in windows])
+		for seg in segments:
+			speaker = seg["speaker"]
+			if speaker[4:] in known_ids:
+				in_segment = [
+					i for i in np.flatnonzero((centers >= seg["start"]) & (centers <= seg["end"])).tolist()
+					if speakers[i] == speaker
+				]
+				seg["speaker_id"] = speaker[4:]
+				seg["confidence"] = float(np.mean(similarities[in_segment])) if in_segment else None
+
+	def _build_windows(self, regions: list[tuple[float, float]]) -> list[tuple[float, float]]:
+		"""Split speech regions into overlapping embedding windows."""
+		windows: list[tuple[float, float]] = []
+		for start, end in regions:
+			if end - start <= self.window_seconds:
+				windows.append((start, end))
+				continue
+			window_start = start
+			while window_start + self.window_seconds < end:
+				windows.append((window_start, window_start + self.window_seconds))
+				window_start += self.hop_seconds
+			windows.append((max(start, end - self.window_seconds), end))
+		return windows
+
+	def _labels_to_segments(
+		self,
+		regions: list[tuple[float, float]],
+		windows: list[tuple[float, float]],
+		speakers: list[str],
+	) -> list[dict[str, Any]]:
+		"""
+		Turn per-window speaker labels into contiguous speaker segments.
+
+		Each window owns the span around its center up to the midpoint with its
+		neighbours; adjacent spans with the same label are merged.
+		"""
+		segments: list[dict[str, Any]] = []
+		window_idx = 0
+		for region_start, region_end in regions:
+			region_windows: list[tuple[float, str]] = []
+			while window_idx < len(windows) and windows[window_idx][0] < region_end:
+				w_start, w_end = windows[window_idx]
+				region_windows.append(((w_start + w_end) / 2, speakers[window_idx]))
+				window_idx += 1
+			if not region_windows:
+				continue
+
+			for i, (center, speaker) in enumerate(region_windows):
+				span_start = region_start if i == 0 else (region_windows[i - 1][0] + center) / 2
+				span_end = region_end if i == len(region_windows) - 1 else (center + region_windows[i + 1][0]) / 2
+				if segments and segments[-1]["speaker"] == speaker and segments[-1]["end"] >= span_start - 1e-6:
+					segments[-1]["end"] = span_end
+				else:
+					segments.append(
+						{
+							"start": span_start,
+							"end": span_end,
+							"speaker": speaker,
+							"confidence": None,
+						}
+					)
+		return segments
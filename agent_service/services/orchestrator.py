@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import os
 import uuid
@@ -9,11 +11,13 @@ import boto3
 from botocore.exceptions import ClientError
 from sqlalchemy.orm import Session
 
-from agent_service.clients import IvritClient
+from agent_service.clients import IvritClient, get_http_client
 from agent_service.config import get_settings
 from agent_service.database.models import Meeting, MeetingSummary, TranscriptionSegment
 from agent_service.services.audio_processor import AudioProcessor
+from agent_service.services.diarization_base import DiarizationBackend
 from agent_service.services.diarization_merger import DiarizationMerger
+from agent_service.services.lightweight_diarization import LightweightDiarizationService
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +54,7 @@ class ProcessingOrchestrator:
 
 	Coordinates:
 	1. Audio transcription (Ivrit.ai)
-	2. Speaker diarization (Ivrit.ai + PyAnnote)
+	2. Speaker diarization (Ivrit.ai + PyAnnote or lightweight local backend)
 	3. Audio snippet extraction (15-second samples)
 	4. Voiceprint generation and matching
 	5. Hebrew name extraction and suggestions
@@ -90,6 +94,9 @@ class ProcessingOrchestrator:
 				self.diarization_service = None
 		else:
 			self.diarization_service = None
+		# Default local diarization backend; can be overridden per job in process_meeting
+		self.diarization_backend = getattr(settings, "diarization_backend", "pyannote")
+		self._lightweight_diarization: LightweightDiarizationService | None = None
 		self.diarization_merger = DiarizationMerger()
 		self.audio_processor = AudioProcessor()
 		self.snippet_extractor = SnippetExtractor(s3_bucket=self.s3_bucket, s3_region=self.s3_region)
@@ -106,6 +113,7 @@ class ProcessingOrchestrator:
 		audio_s3_key: str | None = None,
 		audio_bytes: bytes | None = None,
 		audio_path: str | None = None,
+		diarization_backend: str | None = None,
 	) -> dict[str, Any]:
 		"""
 		Process a complete meeting: transcription, diarization, speaker recognition, summarization.
@@ -116,6 +124,9 @@ class ProcessingOrchestrator:
 			audio_s3_key: S3 key for audio file (if already uploaded)
 			audio_bytes: Raw audio bytes (alternative to S3)
 			audio_path: Local file path (alternative to S3/bytes)
+			diarization_backend: Local diarization backend for this job ("pyannote", "lightweight"
+				or "guided" - lightweight seeded with the organization's stored voiceprints);
+				defaults to settings.diarization_backend
 
 		Returns:
 			Dictionary with processing results and status
@@ -140,50 +151,44 @@ class ProcessingOrchestrator:
 			if not audio_data:
 				raise ValueError("No audio data provided")
 
-			# Step 2: Transcription via Ivrit.ai (includes basic diarization)
+			# Step 2 + 3: Transcription via Ivrit.ai and local diarization run concurrently.
+			# Diarization is blocking (CPU/GPU bound), so it runs in the default executor while
+			# the remote transcription request is awaited; the critical path is max(ASR, diarization).
 			logger.info("Step 1/7: Transcription via Ivrit.ai")
-			transcription_result = await self.ivrit_client.transcribe_bytes(
-				data=audio_data["bytes"],
-				filename=audio_data.get("filename", "audio.wav"),
+			logger.info("Step 2/7: Local diarization validation (concurrent with transcription)")
+			backend_name = (diarization_backend or self.diarization_backend or "pyannote").lower()
+			backend = self._get_diarization_backend(backend_name)
+			known_speakers: dict[str, list[float]] | None = None
+			if backend_name == "guided":
+				# Query on this thread: the DB session must not be used from the executor
+				known_speakers = self.speaker_service.get_voiceprint_centroids(organization_id)
+				logger.info(f"Guided diarization seeded with {len(known_speakers)} known voiceprints")
+			loop = asyncio.get_running_loop()
+			diarization_future = loop.run_in_executor(
+				None,
+				functools.partial(
+					self._run_diarization, backend, audio_path, audio_data["bytes"], known_speakers
+				),
 			)
+			try:
+				transcription_result = await self.ivrit_client.transcribe_bytes(
+					data=audio_data["bytes"],
+					filename=audio_data.get("filename", "audio.wav"),
+					duration_seconds=meeting.duration_seconds,
+				)
+			except Exception:
+				# Drop the pending diarization result if transcription fails
+				diarization_future.cancel()
+				raise
 
 			ivrit_segments = transcription_result.segments or []
-
-			# Step 3: PyAnnote diarization (validation and improvement)
-			logger.info("Step 2/7: PyAnnote diarization validation")
-			pyannote_segments = None
-			if self.diarization_service is None:
-				logger.warning("PyAnnote diarization service not available, skipping PyAnnote diarization")
-			else:
-				try:
-					# PyAnnote can handle the audio file directly or via bytes
-					# It will auto-detect format and convert as needed
-					audio_path_for_pyannote = audio_path
-					if not audio_path_for_pyannote:
-						# Use bytes - PyAnnote will create temp file internally
-						logger.info("Running PyAnnote diarization on audio bytes")
-						pyannote_segments = self.diarization_service.diarize(
-							audio_path=None,
-							audio_bytes=audio_data["bytes"],
-						)
-					else:
-						logger.info(f"Running PyAnnote diarization on audio file: {audio_path_for_pyannote}")
-						pyannote_segments = self.diarization_service.diarize(
-							audio_path=audio_path_for_pyannote,
-							audio_bytes=None,
-						)
-					
-					if pyannote_segments:
-						unique_speakers = set(s.get("speaker") for s in pyannote_segments if s.get("speaker"))
-						logger.info(f"PyAnnote detected {len(unique_speakers)} speakers: {sorted(unique_speakers)}")
-					else:
-						logger.warning("PyAnnote returned no segments")
-				except Exception as e:
-					logger.warning(f"PyAnnote diarization failed, continuing with Ivrit only: {e}", exc_info=True)
+			pyannote_segments = await diarization_future
 
 			# Step 4: Merge diarization results
 			logger.info("Step 3/7: Merging diarization results")
 			merged_segments = self.diarization_merger.merge(ivrit_segments, pyannote_segments)
+			# Ivrit label -> Speaker ID for participants recognized during (guided) diarization
+			identified_speakers = self._map_known_speakers(ivrit_segments, pyannote_segments)
 			
 			# Extract unique speakers from merged segments
 			merged_speaker_labels: set[str] = set()
@@ -212,7 +217,6 @@ class ProcessingOrchestrator:
 
 			# Step 5: Extract speaker snippets and generate voiceprints
 			logger.info("Step 4/7: Extracting speaker snippets and generating voiceprints")
-			unidentified_speakers = final_speaker_labels
 			speaker_snippets = self.snippet_extractor.extract_speaker_snippets(
 				speaker_segments=final_speaker_segments,
 				meeting_id=meeting_id,
@@ -227,6 +231,11 @@ class ProcessingOrchestrator:
 				snippet_url = snippet_info.get("snippet_url")
 				snippet_path = snippet_info.get("file_path")
 
+				if speaker_label in identified_speakers:
+					# Already labeled during guided diarization - no voiceprint/pgvector pass needed
+					logger.info(f"Skipping voiceprint matching for {speaker_label} (identified during diarization)")
+					continue
+
 				try:
 					# Generate voiceprint from snippet
 					if snippet_path:
@@ -234,12 +243,10 @@ class ProcessingOrchestrator:
 					elif snippet_url and snippet_url.startswith("http"):
 						# Download from S3/URL if needed
 						import tempfile
-						import httpx
 						import os
-						async with httpx.AsyncClient(timeout=30.0) as client:
-							resp = await client.get(snippet_url)
-							resp.raise_for_status()
-							content = resp.content
+						resp = await get_http_client(settings).get(snippet_url, timeout=30.0)
+						resp.raise_for_status()
+						content = resp.content
 						tmp_path = None
 						try:
 							with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
@@ -269,11 +276,14 @@ class ProcessingOrchestrator:
 								f"Matched {speaker_label} to existing speaker '{matched_speaker.name}' "
 								f"(similarity: {similarity:.3f})"
 							)
+							identified_speakers[speaker_label] = matched_speaker.id
 
 				except Exception as e:
 					logger.error(f"Failed to generate voiceprint for {speaker_label}: {e}")
 					speaker_voiceprints[speaker_label] = None
 
+			unidentified_speakers = [label for label in final_speaker_labels if label not in identified_speakers]
+
 			# Step 6: Extract names from transcript and create suggestions
 			logger.info("Step 5/7: Extracting Hebrew names and creating suggestions")
 			name_suggestions = self.name_extractor.create_name_suggestions_for_meeting(
@@ -285,7 +295,7 @@ class ProcessingOrchestrator:
 
 			# Step 7: Store transcription segments in database
 			logger.info("Step 6/7: Storing transcription segments")
-			self._store_transcription_segments(meeting_id, merged_segments, organization_id)
+			self._store_transcription_segments(meeting_id, merged_segments, organization_id, identified_speakers)
 
 			# Step 8: Generate speaker-aware summary using merged speaker segments
 			logger.info("Step 7/7: Generating speaker-aware summary")
@@ -318,7 +328,8 @@ class ProcessingOrchestrator:
 				"meeting_id": str(meeting_id),
 				"status": "completed",
 				"transcription_segments": len(merged_segments),
-				"speakers_detected": len(unidentified_speakers),
+				"speakers_detected": len(final_speaker_labels),
+				"speakers_identified": len(identified_speakers),
 				"name_suggestions": len(name_suggestions),
 				"summary_available": True,
 			}
@@ -332,6 +343,123 @@ class ProcessingOrchestrator:
 			self.db.commit()
 			raise RuntimeError(f"Meeting processing failed: {e}") from e
 
+	def _get_diarization_backend(self, name: str | None = None) -> DiarizationBackend | None:
+		"""
+		Resolve a local diarization backend by name.
+
+		Args:
+			name: "pyannote", "lightweight" or "guided" (defaults to settings.diarization_backend)
+
+		Returns:
+			Backend instance, or None if the requested backend is unavailable
+
+		Raises:
+			ValueError: If the backend name is unknown
+		"""
+		backend_name = (name or self.diarization_backend or "pyannote").lower()
+		if backend_name == "pyannote":
+			return self.diarization_service
+		if backend_name in ("lightweight", "guided"):
+			if self._lightweight_diarization is None:
+				self._lightweight_diarization = LightweightDiarizationService(
+					voiceprint_service=self.voiceprint_service,
+				)
+			return self._lightweight_diarization
+		raise ValueError(f"Unsupported diarization backend: {backend_name}")
+
+	def _run_diarization(
+		self,
+		backend: DiarizationBackend | None,
+		audio_path: str | None,
+		audio_bytes: bytes,
+		known_speakers: dict[str, list[float]] | None = None,
+	) -> list[dict[str, Any]] | None:
+		"""
+		Run local diarization synchronously (intended for an executor thread).
+
+		Failures are logged and swallowed so processing continues with Ivrit segments only.
+
+		Args:
+			backend: Diarization backend to run (None if unavailable)
+			audio_path: Local file path (preferred, avoids a temp file)
+			audio_bytes: Raw audio bytes used when no path is available
+			known_speakers: Speaker ID -> voiceprint map for guided diarization
+
+		Returns:
+			Diarization segments, or None if diarization is unavailable or failed
+		"""
+		if backend is None:
+			logger.warning("Diarization backend not available, skipping local diarization")
+			return None
+
+		diarize_kwargs: dict[str, Any] = {}
+		if known_speakers:
+			diarize_kwargs["known_speakers"] = known_speakers
+
+		try:
+			# Backends can handle the audio file directly or via bytes
+			# They will auto-detect format and convert as needed
+			if not audio_path:
+				# Use bytes - the backend will create a temp file internally
+				logger.info(f"Running {backend.name} diarization on audio bytes")
+				diarization_segments = backend.diarize(
+					audio_path=None,
+					audio_bytes=audio_bytes,
+					**diarize_kwargs,
+				)
+			else:
+				logger.info(f"Running {backend.name} diarization on audio file: {audio_path}")
+				diarization_segments = backend.diarize(
+					audio_path=audio_path,
+					audio_bytes=None,
+					**diarize_kwargs,
+				)
+
+			if diarization_segments:
+				unique_speakers = set(s.get("speaker") for s in diarization_segments if s.get("speaker"))
+				logger.info(f"{backend.name} detected {len(unique_speakers)} speakers: {sorted(unique_speakers)}")
+			else:
+				logger.warning(f"{backend.name} diarization returned no segments")
+			return diarization_segments
+		except Exception as e:
+			logger.warning(f"{backend.name} diarization failed, continuing with Ivrit only: {e}", exc_info=True)
+			return None
+
+	def _map_known_speakers(
+		self,
+		ivrit_segments: list[dict[str, Any]],
+		diarization_segments: list[dict[str, Any]] | None,
+	) -> dict[str, uuid.UUID]:
+		"""
+		Map Ivrit speaker labels to known Speaker IDs found by guided diarization.
+
+		Args:
+			ivrit_segments: Ivrit segments (label namespace used downstream)
+			diarization_segments: Local diarization segments, some carrying 'speaker_id'
+
+		Returns:
+			Dictionary mapping Ivrit speaker label -> Speaker UUID
+		"""
+		if not ivrit_segments or not diarization_segments:
+			return {}
+
+		known_labels = {
+			seg["speaker"]: seg["speaker_id"]
+			for seg in diarization_segments
+			if seg.get("speaker_id")
+		}
+		if not known_labels:
+			return {}
+
+		mapping = self.diarization_merger.build_speaker_mapping(ivrit_segments, diarization_segments)
+		identified: dict[str, uuid.UUID] = {}
+		for diarization_label, ivrit_label in mapping.items():
+			if diarization_label in known_labels:
+				identified[ivrit_label] = uuid.UUID(known_labels[diarization_label])
+		if identified:
+			logger.info(f"Identified known speakers during diarization: {identified}")
+		return identified
+
 	def _get_audio_data(
 		self,
 		s3_key: str | None,
@@ -402,15 +530,14 @@ class ProcessingOrchestrator:
 		meeting_id: uuid.UUID,
 		segments: list[dict[str, Any]],
 		organization_id: uuid.UUID,
+		identified_speakers: dict[str, uuid.UUID] | None = None,
 	) -> None:
 		"""Store transcription segments in database."""
+		identified_speakers = identified_speakers or {}
 		for seg in segments:
-			# Try to find matching speaker if voiceprint matched
-			speaker_id = None
 			unidentified_label = seg.get("speaker") or seg.get("speaker_label") or "SPK_0"
-
-			# TODO: Match to speaker_id if voiceprint was matched
-			# This would require storing the mapping during processing
+			# Link to a known speaker if guided diarization or voiceprint matching identified it
+			speaker_id = identified_speakers.get(unidentified_label)
 
 			transcription_seg = TranscriptionSegment(
 				meeting_id=meeting_id,
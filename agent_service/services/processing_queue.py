@@ -7,11 +7,13 @@ from typing import Any
 from urllib.parse import urlparse
 
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from sqlalchemy.orm import Session
 
 import asyncio
 import ssl
 
+from agent_service.clients import close_http_client
 from agent_service.config import get_settings
 from agent_service.database.connection import get_db_session
 from agent_service.services.orchestrator import ProcessingOrchestrator
@@ -100,12 +102,37 @@ except Exception as e:
 	raise
 
 
+# Persistent event loop per worker process. Reusing it across tasks (instead of
+# asyncio.run per task) keeps the shared HTTP client's pooled connections alive.
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _run_async(coro: Any) -> Any:
+	"""Run a coroutine on this worker process's persistent event loop."""
+	global _worker_loop
+	if _worker_loop is None or _worker_loop.is_closed():
+		_worker_loop = asyncio.new_event_loop()
+		asyncio.set_event_loop(_worker_loop)
+	return _worker_loop.run_until_complete(coro)
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs: Any) -> None:
+	"""Close the shared HTTP client and event loop when a worker process exits."""
+	global _worker_loop
+	if _worker_loop is not None and not _worker_loop.is_closed():
+		_worker_loop.run_until_complete(close_http_client())
+		_worker_loop.close()
+	_worker_loop = None
+
+
 @celery_app.task(bind=True, max_retries=3)
 def process_meeting_task(
 	self,
 	meeting_id: str,
 	organization_id: str,
 	audio_s3_key: str | None = None,
+	diarization_backend: str | None = None,
 ) -> dict[str, Any]:
 	"""
 	Celery task for processing a meeting asynchronously.
@@ -114,6 +141,7 @@ def process_meeting_task(
 		meeting_id: Meeting UUID as string
 		organization_id: Organization UUID as string
 		audio_s3_key: S3 key for audio file
+		diarization_backend: Optional local diarization backend ("pyannote", "lightweight" or "guided")
 
 	Returns:
 		Processing results dictionary
@@ -125,11 +153,12 @@ def process_meeting_task(
 		with get_db_session() as db:
 			orchestrator = ProcessingOrchestrator(db)
 			# Run async process_meeting in sync context (Celery task)
-			result = asyncio.run(
+			result = _run_async(
 				orchestrator.process_meeting(
 					meeting_id=meeting_uuid,
 					organization_id=org_uuid,
 					audio_s3_key=audio_s3_key,
+					diarization_backend=diarization_backend,
 				)
 			)
 
@@ -146,6 +175,7 @@ def enqueue_meeting_processing(
 	meeting_id: uuid.UUID,
 	organization_id: uuid.UUID,
 	audio_s3_key: str | None = None,
+	diarization_backend: str | None = None,
 ) -> str:
 	"""
 	Enqueue a meeting for async processing.
@@ -154,6 +184,7 @@ def enqueue_meeting_processing(
 		meeting_id: Meeting UUID
 		organization_id: Organization UUID
 		audio_s3_key: S3 key for audio file
+		diarization_backend: Optional local diarization backend ("pyannote", "lightweight" or "guided")
 
 	Returns:
 		Task ID for tracking processing status
@@ -162,11 +193,28 @@ def enqueue_meeting_processing(
 		str(meeting_id),
 		str(organization_id),
 		audio_s3_key=audio_s3_key,
+		diarization_backend=diarization_backend,
 	)
 	logger.info(f"Enqueued meeting {meeting_id} for processing (task: {task.id})")
 	return task.id
 
 
+async def enqueue_meeting_processing_async(
+	meeting_id: uuid.UUID,
+	organization_id: uuid.UUID,
+	audio_s3_key: str | None = None,
+	diarization_backend: str | None = None,
+) -> str:
+	"""Async variant of enqueue_meeting_processing (broker publish runs in a thread)."""
+	return await asyncio.to_thread(
+		enqueue_meeting_processing,
+		meeting_id,
+		organization_id,
+		audio_s3_key=audio_s3_key,
+		diarization_backend=diarization_backend,
+	)
+
+
 def get_processing_status(task_id: str) -> dict[str, Any]:
 	"""
 	Get the status of a processing task.
@@ -185,3 +233,7 @@ def get_processing_status(task_id: str) -> dict[str, Any]:
 		"error": str(task.info) if task.failed() else None,
 	}
 
+
+async def get_processing_status_async(task_id: str) -> dict[str, Any]:
+	"""Async variant of get_processing_status (result backend lookup runs in a thread)."""
+	return await asyncio.to_thread(get_processing_status, task_id)
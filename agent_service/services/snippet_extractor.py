@@ -93,8 +93,10 @@ class SnippetExtractor:
 		snippets: list[dict[str, Any]] = []
 
 		for speaker_label, segments in speaker_groups.items():
-			# Find the longest segment for this speaker (most representative)
-			longest_segment = max(segments, key=lambda s: float(s.get("end", 0)) - float(s.get("start", 0)))
+			# Find the longest segment for this speaker (most representative),
+			# skipping segments where other speakers talk over them when possible
+			clean_segments = [s for s in segments if not s.get("overlapped_speech")] or segments
+			longest_segment = max(clean_segments, key=lambda s: float(s.get("end", 0)) - float(s.get("start", 0)))
 
 			segment_start = float(longest_segment.get("start", 0))
 			segment_end = float(longest_segment.get("end", segment_start))
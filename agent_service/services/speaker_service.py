@@ -246,6 +246,27 @@ class SpeakerService:
 				return existing, False
 			raise
 
+	def get_voiceprint_centroids(self, organization_id: uuid.UUID) -> dict[str, list[float]]:
+		"""
+		Get stored voiceprints for all known speakers of an organization.
+
+		Used to seed known-speaker-guided diarization so recurring participants
+		are labeled during diarization instead of via per-speaker pgvector lookups.
+
+		Args:
+			organization_id: Organization UUID
+
+		Returns:
+			Dictionary mapping speaker ID (as string) to its 256-dimensional voiceprint
+		"""
+		speakers = self.db.scalars(
+			select(Speaker).where(
+				Speaker.organization_id == organization_id,
+				Speaker.voiceprint_embedding.is_not(None),
+			)
+		).all()
+		return {str(speaker.id): [float(x) for x in speaker.voiceprint_embedding] for speaker in speakers}
+
 	def get_organization_speakers(self, organization_id: uuid.UUID) -> list[Speaker]:
 		"""
 		Get all known speakers for an organization.
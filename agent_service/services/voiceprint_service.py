@@ -179,6 +179,67 @@ class VoiceprintService:
 			logger.error(f"Error generating voiceprint embedding: {e}")
 			raise RuntimeError(f"Failed to generate voiceprint: {e}") from e
 
+	def generate_window_embeddings(
+		self,
+		audio: np.ndarray,
+		sample_rate: int,
+		windows: list[tuple[float, float]],
+		batch_size: int = 32,
+	) -> np.ndarray:
+		"""
+		Generate ECAPA embeddings for many time windows of an already-decoded signal.
+
+		Used by the lightweight diarization backend, which needs one embedding per
+		short window instead of one per snippet file. Windows are encoded in batches
+		with relative lengths so shorter windows at region edges are not padded into noise.
+
+		Args:
+			audio: Mono audio samples (1-D float array)
+			sample_rate: Sample rate of `audio` (model expects 16kHz)
+			windows: List of (start, end) times in seconds
+			batch_size: Number of windows encoded per forward pass
+
+		Returns:
+			Array of shape (len(windows), embedding_dim) with L2-normalized rows
+			(native model dimension, not padded to 256)
+		"""
+		if not windows:
+			return np.zeros((0, 0), dtype=np.float32)
+
+		self._load_model()
+
+		signal = torch.from_numpy(np.asarray(audio, dtype=np.float32))
+		if sample_rate != 16000:
+			signal = torchaudio.transforms.Resample(sample_rate, 16000)(signal)
+			sample_rate = 16000
+
+		embeddings: list[np.ndarray] = []
+		try:
+			for batch_start in range(0, len(windows), batch_size):
+				batch_windows = windows[batch_start:batch_start + batch_size]
+				chunks = [
+					signal[int(start * sample_rate):max(int(end * sample_rate), int(start * sample_rate) + 1)]
+					for start, end in batch_windows
+				]
+				max_len = max(len(chunk) for chunk in chunks)
+				batch = torch.zeros(len(chunks), max_len)
+				for i, chunk in enumerate(chunks):
+					batch[i, :len(chunk)] = chunk / (torch.max(torch.abs(chunk)) + 1e-8)
+				wav_lens = torch.tensor([len(chunk) / max_len for chunk in chunks])
+
+				with torch.no_grad():
+					batch_embeddings = self.model.encode_batch(batch, wav_lens)
+				if isinstance(batch_embeddings, tuple):
+					batch_embeddings = batch_embeddings[0]
+				embeddings.append(batch_embeddings.reshape(len(chunks), -1).cpu().numpy())
+		except Exception as e:
+			logger.error(f"Error generating window embeddings: {e}")
+			raise RuntimeError(f"Failed to generate window embeddings: {e}") from e
+
+		embedding_matrix = np.concatenate(embeddings, axis=0).astype(np.float32)
+		norms = np.linalg.norm(embedding_matrix, axis=1, keepdims=True) + 1e-8
+		return embedding_matrix / norms
+
 	def compute_similarity(self, embedding1: list[float], embedding2: list[float]) -> float:
 		"""
 		Compute cosine similarity between two embeddings.
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, AsyncIterator
 
 
 @dataclass
@@ -14,9 +14,19 @@ class SummaryResult:
 class Summarizer(ABC):
 	@abstractmethod
 	async def summarize(
-		self, transcript: str, speaker_segments: list[dict[str, Any]] | None = None
+		self,
+		transcript: str,
+		speaker_segments: list[dict[str, Any]] | None = None,
+		use_cache: bool = True,
 	) -> SummaryResult:  # pragma: no cover - interface
 		...
 
-
-
+	async def summarize_stream(
+		self,
+		transcript: str,
+		speaker_segments: list[dict[str, Any]] | None = None,
+		use_cache: bool = True,
+	) -> AsyncIterator[str]:
+		"""Yield the summary text incrementally (default: the whole summary as one fragment)."""
+		result = await self.summarize(transcript, speaker_segments=speaker_segments, use_cache=use_cache)
+		yield result.text
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+try:
+	import tiktoken
+except ImportError:
+	tiktoken = None
+
+# Rough chars-per-token for mixed Hebrew/English text (Hebrew tokenizes densely)
+_CHARS_PER_TOKEN = 3.0
+_encoding: Any = None
+
+# Hesitations that carry no content when they make up a whole segment
+FILLER_WORDS = frozenset(
+	{
+		"um", "umm", "uh", "uhh", "uhm", "hmm", "mm", "mmm", "er", "erm", "ah", "eh", "oh",
+		"אה", "אהה", "אההה", "אמ", "אממ", "אום", "הממ", "מממ", "אהם", "נו", "כאילו",
+	}
+)
+_WORD = re.compile(r"[\w֐-׿']+")
+# A phrase of 1-8 words repeated 3+ times in a row (typical ASR decoding loop)
+_REPEATED_PHRASE = re.compile(r"\b((?:[\w֐-׿']+[\s,.!?]+){1,8}?)(?:\1){2,}", re.UNICODE)
+
+
+def count_tokens(text: str) -> int:
+	"""
+	Count tokens in `text`.
+
+	Uses tiktoken's cl100k_base encoding when installed (a close proxy for the
+	summarization models), otherwise a character-based estimate.
+	"""
+	global _encoding
+	if tiktoken is not None:
+		if _encoding is None:
+			_encoding = tiktoken.get_encoding("cl100k_base")
+		return len(_encoding.encode(text, disallowed_special=()))
+	return int(len(text) / _CHARS_PER_TOKEN) + 1
+
+
+def is_filler(text: str) -> bool:
+	"""True if the text is empty or consists only of filler words."""
+	words = _WORD.findall(text.lower())
+	return all(word in FILLER_WORDS for word in words)
+
+
+def collapse_repeats(text: str) -> str:
+	"""Collapse a phrase repeated three or more times in a row into a single occurrence."""
+	return _REPEATED_PHRASE.sub(r"\1", f"{text} ").strip()
+
+
+def compact_segments(
+	segments: list[dict[str, Any]],
+	max_turn_seconds: float = 90.0,
+	drop_fillers: bool = True,
+	dedupe_repeats: bool = True,
+) -> list[dict[str, Any]]:
+	"""
+	Compact chronologically sorted speaker segments before summarization.
+
+	- Drops empty and filler-only segments
+	- Optionally collapses ASR repetition loops within a segment and drops a segment
+	  that repeats the previous one from the same speaker verbatim
+	- Coalesces adjacent segments of the same speaker into one turn (up to
+	  `max_turn_seconds`, so turns keep a useful timestamp)
+
+	Args:
+		segments: Dicts with 'speaker', 'start', 'end' and 'text', sorted by start
+		max_turn_seconds: Maximum duration of a coalesced turn
+		drop_fillers: Drop filler-only segments
+		dedupe_repeats: Collapse repeated phrases / consecutive duplicate segments
+
+	Returns:
+		New list of compacted segment dicts
+	"""
+	compacted: list[dict[str, Any]] = []
+	last_text_by_speaker: dict[Any, str] = {}
+
+	for seg in segments:
+		text = (seg.get("text") or "").strip()
+		if dedupe_repeats and text:
+			text = collapse_repeats(text)
+		if not text or (drop_fillers and is_filler(text)):
+			continue
+
+		speaker = seg.get("speaker")
+		if dedupe_repeats:
+			normalized = " ".join(_WORD.findall(text.lower()))
+			if normalized and last_text_by_speaker.get(speaker) == normalized:
+				continue
+			last_text_by_speaker[speaker] = normalized
+
+		start = float(seg.get("start") or 0.0)
+		end = float(seg.get("end") or start)
+		prev = compacted[-1] if compacted else None
+		if prev is not None and prev["speaker"] == speaker and end - prev["start"] <= max_turn_seconds:
+			prev["text"] = f"{prev['text']} {text}"
+			prev["end"] = max(prev["end"], end)
+			continue
+		compacted.append({"speaker": speaker, "start": start, "end": end, "text": text})
+
+	if len(compacted) < len(segments):
+		logger.debug(f"Compacted transcript from {len(segments)} to {len(compacted)} segments")
+	return compacted
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+
+from agent_service.summarizers.compaction import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Conservative chars-per-token used to size split points in unlabeled text
+_CHARS_PER_TOKEN = 3.0
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class TranscriptLine:
+	"""One formatted transcript line (e.g. "[01:23] Speaker 1: ...") with its timing, if known."""
+
+	text: str
+	start: float | None = None
+	end: float | None = None
+
+
+@dataclass
+class TranscriptChunk:
+	"""A contiguous, token-budgeted slice of the transcript summarized on its own (map step)."""
+
+	index: int
+	text: str
+	tokens: int
+	start: float | None = None
+	end: float | None = None
+
+
+def lines_from_text(transcript: str, max_tokens: int) -> list[TranscriptLine]:
+	"""
+	Split an unlabeled transcript into lines no longer than `max_tokens`.
+
+	Newlines are kept as boundaries; overlong lines are split at sentence ends, and
+	as a last resort at a fixed character width.
+	"""
+	max_chars = int(max_tokens * _CHARS_PER_TOKEN)
+	lines: list[TranscriptLine] = []
+	for raw in transcript.splitlines():
+		raw = raw.strip()
+		if not raw:
+			continue
+		if len(raw) <= max_chars:
+			lines.append(TranscriptLine(text=raw))
+			continue
+		piece = ""
+		for sentence in _SENTENCE_END.split(raw):
+			while len(sentence) > max_chars:
+				if piece:
+					lines.append(TranscriptLine(text=piece))
+					piece = ""
+				lines.append(TranscriptLine(text=sentence[:max_chars]))
+				sentence = sentence[max_chars:]
+			if piece and len(piece) + len(sentence) + 1 > max_chars:
+				lines.append(TranscriptLine(text=piece))
+				piece = ""
+			piece = f"{piece} {sentence}" if piece else sentence
+		if piece:
+			lines.append(TranscriptLine(text=piece))
+	return lines
+
+
+def chunk_transcript(
+	lines: list[TranscriptLine],
+	max_tokens: int,
+	gap_seconds: float = 20.0,
+	min_fill: float = 0.5,
+) -> list[TranscriptChunk]:
+	"""
+	Group transcript lines into chunks of at most `max_tokens`.
+
+	A chunk is closed when the next line would overflow the budget, or earlier at a
+	pause of at least `gap_seconds` once the chunk is `min_fill` full, so boundaries
+	tend to fall between topics rather than mid-discussion.
+
+	Args:
+		lines: Lines in chronological order
+		max_tokens: Token budget per chunk
+		gap_seconds: Silence treated as a likely topic boundary
+		min_fill: Fraction of the budget a chunk must reach before breaking at a pause
+
+	Returns:
+		Chunks in chronological order
+	"""
+	chunks: list[TranscriptChunk] = []
+	current: list[TranscriptLine] = []
+	current_tokens = 0
+	prev_end: float | None = None
+
+	def _flush() -> None:
+		chunks.append(
+			TranscriptChunk(
+				index=len(chunks),
+				text="\n".join(line.text for line in current),
+				tokens=current_tokens,
+				start=current[0].start,
+				end=max((line.end for line in current if line.end is not None), default=None),
+			)
+		)
+
+	for line in lines:
+		tokens = count_tokens(line.text)
+		gap = line.start - prev_end if line.start is not None and prev_end is not None else 0.0
+		at_pause = current_tokens >= max_tokens * min_fill and gap >= gap_seconds
+		if current and (current_tokens + tokens > max_tokens or at_pause):
+			_flush()
+			current = []
+			current_tokens = 0
+		current.append(line)
+		current_tokens += tokens
+		if line.end is not None:
+			prev_end = line.end
+
+	if current:
+		_flush()
+	logger.debug(f"Split transcript into {len(chunks)} chunks (budget {max_tokens} tokens)")
+	return chunks
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 from openai import AsyncOpenAI
 
 from agent_service.config import Settings, get_settings
 from agent_service.summarizers.base import SummaryResult, Summarizer
+from agent_service.summarizers.compaction import collapse_repeats, compact_segments, count_tokens
+from agent_service.summarizers.map_reduce import (
+	TranscriptChunk,
+	TranscriptLine,
+	chunk_transcript,
+	lines_from_text,
+)
+from agent_service.summarizers.summary_cache import SummaryCache
 
 logger = logging.getLogger(__name__)
 
+# System prompt files (primary required, secondary optional), next to the agent_service package
+_PROMPT_DIR = Path(__file__).parent.parent
+_PROMPT_PATHS = (_PROMPT_DIR / "ivreetmeet-enhanced-prompt.md", _PROMPT_DIR / "ivreetmeet-enhanced-prompt1.md")
+
+_FALLBACK_SYSTEM_PROMPT = (
+	"You are an expert meeting analyst specializing in comprehensive, speaker-aware summaries. "
+	"Create detailed, useful, and concise summaries that clearly identify who said what."
+)
+
+_system_prompt: str | None = None
+_system_prompt_mtimes: tuple[float | None, ...] | None = None
+
 
 def _load_system_prompt() -> str:
 	"""
@@ -28,12 +50,7 @@ def _load_system_prompt() -> str:
 		FileNotFoundError: If the primary prompt file is missing
 		ValueError: If the loaded prompt is empty or invalid
 	"""
-	# Get the directory of this file
-	current_dir = Path(__file__).parent.parent
-	
-	# Paths to prompt files
-	prompt1_path = current_dir / "ivreetmeet-enhanced-prompt.md"
-	prompt2_path = current_dir / "ivreetmeet-enhanced-prompt1.md"
+	prompt1_path, prompt2_path = _PROMPT_PATHS
 	
 	# Load first prompt file (required)
 	if not prompt1_path.exists():
@@ -87,98 +104,435 @@ def _load_system_prompt() -> str:
 	return merged_prompt
 
 
-# Load the system prompt at module import time
-# This ensures the prompt is loaded once and cached for all requests
-try:
-	SYSTEM_PROMPT = _load_system_prompt()
-except Exception as e:
-	logger.critical(f"Failed to load system prompt: {e}. Service may not function correctly.")
-	# Fallback to a minimal prompt to prevent complete service failure
-	SYSTEM_PROMPT = (
-		"You are an expert meeting analyst specializing in comprehensive, speaker-aware summaries. "
-		"Create detailed, useful, and concise summaries that clearly identify who said what."
-	)
-	logger.warning("Using fallback system prompt. Please check prompt files.")
+def _prompt_mtime(path: Path) -> float | None:
+	try:
+		return path.stat().st_mtime
+	except FileNotFoundError:
+		return None
+
+
+def get_system_prompt() -> str:
+	"""
+	Return the merged system prompt, reloading it only when a prompt file changes.
+
+	Each call costs two stat() calls; the files are read and merged on first use and
+	again only after one of them is edited, created or removed.
+
+	Returns:
+		System prompt text (a minimal built-in prompt if the files cannot be loaded)
+	"""
+	global _system_prompt, _system_prompt_mtimes
+	mtimes = tuple(_prompt_mtime(path) for path in _PROMPT_PATHS)
+	if _system_prompt is not None and mtimes == _system_prompt_mtimes:
+		return _system_prompt
+
+	try:
+		prompt = _load_system_prompt()
+	except Exception as e:
+		if _system_prompt is not None and _system_prompt is not _FALLBACK_SYSTEM_PROMPT:
+			logger.error(f"Failed to reload system prompt: {e}. Keeping the previously loaded prompt.")
+			prompt = _system_prompt
+		else:
+			logger.critical(f"Failed to load system prompt: {e}. Service may not function correctly.")
+			logger.warning("Using fallback system prompt. Please check prompt files.")
+			prompt = _FALLBACK_SYSTEM_PROMPT
+	_system_prompt = prompt
+	_system_prompt_mtimes = mtimes
+	return prompt
+
+
+# Keyword groups for meeting type detection, in priority order (first group with a hit wins)
+_MEETING_TYPE_KEYWORDS = (
+	("government_council", ("council", "mayor", "councillor", "bylaw", "municipality", "resolution")),
+	("sales_call", ("product", "price", "deal", "client", "sales", "contract", "quote")),
+	("medical_sales", ("patient", "doctor", "prescription", "treatment", "medical")),
+	("business_meeting", ("meeting", "agenda", "discussion", "decision", "action")),
+)
+_MEETING_TYPE_PRIORITY = {name: rank for rank, (name, _) in enumerate(_MEETING_TYPE_KEYWORDS)}
+# One alternation with a named group per meeting type, so all keywords are matched in a single scan
+_MEETING_TYPE_PATTERN = re.compile(
+	"|".join(
+		f"(?P<{name}>{'|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))})"
+		for name, words in _MEETING_TYPE_KEYWORDS
+	),
+	re.IGNORECASE,
+)
+# Simple heuristic: Hebrew has Unicode range U+0590-U+05FF
+_HEBREW_CHAR = re.compile("[\u0590-\u05ff]")
+_LATIN_CHAR = re.compile("[A-Za-z]")
+
+# Static parts of the user prompt
+_BASE_PROMPTS = {
+	"government_council": (
+		"Summarize the following council/government meeting transcript. "
+		"Structure the summary as:\n"
+		"1. Meeting Overview (date, participants, agenda)\n"
+		"2. Key Discussion Points (organized by topic with speaker attribution)\n"
+		"3. Decisions Made (with votes/motions if mentioned)\n"
+		"4. Action Items (who is responsible for what, with deadlines if mentioned)\n"
+		"5. Next Steps\n\n"
+	),
+	"sales_call": (
+		"Summarize the following sales call transcript. "
+		"Structure the summary as:\n"
+		"1. Call Overview (participants, date, purpose)\n"
+		"2. Products/Services Discussed (with speaker attribution)\n"
+		"3. Objections and Responses (who raised what, how addressed)\n"
+		"4. Commitments and Next Steps (specific actions, dates, responsible parties)\n"
+		"5. Key Quotes (important statements in original language with speaker attribution)\n\n"
+	),
+	"business_meeting": (
+		"Summarize the following business meeting transcript. "
+		"Structure the summary with clear sections for:\n"
+		"- Agenda Items Discussed\n"
+		"- Key Decisions (with speaker attribution)\n"
+		"- Action Items (who does what by when)\n"
+		"- Important Discussion Points\n\n"
+	),
+	"general": (
+		"Summarize the following meeting transcript comprehensively. "
+		"Organize by topics discussed, maintain speaker identity throughout, "
+		"and include action items, decisions, and key points.\n\n"
+	),
+}
+_BASE_PROMPTS["medical_sales"] = _BASE_PROMPTS["sales_call"]
+
+_SPEAKER_INSTRUCTION = (
+	"CRITICAL: This transcript contains multiple speakers. "
+	"You MUST maintain speaker identity throughout the summary. "
+	"For each point, clearly state which speaker made it (e.g., 'Speaker 1 stated...', "
+	"'Speaker 2 responded...', 'According to Speaker 3...'). "
+	"Do NOT merge statements from different speakers. "
+	"Speaker attribution is essential for understanding the meeting dynamics.\n\n"
+)
+_NO_SPEAKER_INSTRUCTION = (
+	"Note: This transcript may contain multiple speakers, but speaker labels are not clearly identified. "
+	"Summarize the content while noting any apparent speaker changes when detectable.\n\n"
+)
+_STYLE_INSTRUCTION = (
+	"Keep quotes in original language when relevant. Use clear English for the summary structure. "
+	"Be comprehensive, detailed, useful, and concise. Ensure every key point includes speaker attribution when available.\n\n"
+)
+
+
+# Bump when the user prompt templates below change so cached summaries are not reused
+PROMPT_VERSION = "2"
 
 
 class NvidiaDeepSeekSummarizer(Summarizer):
-	def __init__(self, settings: Settings | None = None) -> None:
+	def __init__(self, settings: Settings | None = None, cache: SummaryCache | None = None) -> None:
 		self.settings = settings or get_settings()
 		if not self.settings.nvidia_api_key:
 			raise RuntimeError("NVIDIA API key not configured. Set NVIDIA_API_KEY.")
 		self.client = AsyncOpenAI(base_url=self.settings.nvidia_api_url, api_key=self.settings.nvidia_api_key)
+		self.cache = cache or SummaryCache(self.settings)
 
 	async def summarize(
-		self, transcript: str, speaker_segments: list[dict[str, Any]] | None = None
+		self,
+		transcript: str,
+		speaker_segments: list[dict[str, Any]] | None = None,
+		use_cache: bool = True,
+		on_partial_summary: Callable[[TranscriptChunk, str], Awaitable[None] | None] | None = None,
 	) -> SummaryResult:
 		"""
 		Summarize transcript with optional speaker awareness.
 
+		Transcripts over settings.summary_map_reduce_threshold_tokens are summarized
+		hierarchically: token-budgeted chunks are summarized concurrently, then the
+		section summaries are combined in a reduce pass.
+
 		Args:
 			transcript: Full transcript text
 			speaker_segments: Optional list of segments grouped by speaker with format:
 				[{'speaker': 'SPK_1', 'segments': [{'start': 0.0, 'end': 2.5, 'text': '...'}, ...]}, ...]
+			use_cache: Reuse/store the result in the summary cache
+			on_partial_summary: Optional callback invoked with (chunk, summary) as each
+				section summary completes (hierarchical mode only; not called on cache hits)
 
 		Returns:
 			SummaryResult with speaker-aware summary
 		"""
+		formatted_transcript, lines, input_tokens, truncated = self._prepare_transcript(transcript, speaker_segments)
+		system_prompt = get_system_prompt()
+		cache_key = None
+		if use_cache and self.cache.enabled:
+			cache_key = self.cache.make_key(formatted_transcript, system_prompt, self._cache_params())
+			cached = await self.cache.get(cache_key)
+			if cached is not None:
+				return cached
+
+		messages, raw = await self._final_request(
+			formatted_transcript, input_tokens, lines, speaker_segments, system_prompt, on_partial_summary
+		)
+		result = SummaryResult(
+			text=await self._complete(messages),
+			raw={**(raw or {}), "input_tokens": input_tokens, "truncated": truncated},
+		)
+		if cache_key is not None:
+			await self.cache.set(cache_key, result)
+		return result
+
+	async def summarize_stream(
+		self,
+		transcript: str,
+		speaker_segments: list[dict[str, Any]] | None = None,
+		use_cache: bool = True,
+		on_partial_summary: Callable[[TranscriptChunk, str], Awaitable[None] | None] | None = None,
+	) -> AsyncIterator[str]:
+		"""
+		Summarize like summarize(), yielding summary text deltas as the model produces them.
+
+		The final completion is always streamed from the endpoint (regardless of
+		settings.nvidia_stream). For long transcripts the map step runs first and only
+		the reduce pass is streamed. A cache hit yields the whole cached summary at once;
+		a completed stream is stored in the cache.
+
+		Args:
+			transcript: Full transcript text
+			speaker_segments: Optional segments grouped by speaker (see summarize)
+			use_cache: Reuse/store the result in the summary cache
+			on_partial_summary: Optional callback for each finished section summary
+
+		Yields:
+			Summary text fragments, in order
+		"""
+		formatted_transcript, lines, input_tokens, truncated = self._prepare_transcript(transcript, speaker_segments)
+		system_prompt = get_system_prompt()
+		cache_key = None
+		if use_cache and self.cache.enabled:
+			cache_key = self.cache.make_key(formatted_transcript, system_prompt, self._cache_params())
+			cached = await self.cache.get(cache_key)
+			if cached is not None:
+				yield cached.text
+				return
+
+		messages, raw = await self._final_request(
+			formatted_transcript, input_tokens, lines, speaker_segments, system_prompt, on_partial_summary
+		)
+		parts: list[str] = []
+		async for delta in self._stream_completion(messages):
+			parts.append(delta)
+			yield delta
+
+		# Only reached once the stream is exhausted: if the client disconnects, the generator
+		# is closed at a `yield` above, so a partial summary never reaches the cache. Keep
+		# the cache write after the loop.
+		if cache_key is not None:
+			result = SummaryResult(
+				text="".join(parts),
+				raw={**(raw or {}), "input_tokens": input_tokens, "truncated": truncated},
+			)
+			await self.cache.set(cache_key, result)
+
+	def _prepare_transcript(
+		self, transcript: str, speaker_segments: list[dict[str, Any]] | None
+	) -> tuple[str, list[TranscriptLine] | None, int, bool]:
+		"""
+		Format, compact and (optionally) cap the transcript sent to the model.
+
+		Returns:
+			Tuple of (formatted transcript, lines or None, input token count, truncated)
+		"""
 		s = self.settings
 
 		# Format transcript with speaker labels if provided
+		lines: list[TranscriptLine] | None = None
 		formatted_transcript = transcript
 		if speaker_segments:
-			formatted_transcript = self._format_speaker_labeled_transcript(speaker_segments)
+			lines = self._speaker_labeled_lines(speaker_segments)
+			formatted_transcript = "\n".join(line.text for line in lines)
+		elif s.summary_compaction and s.summary_dedupe_repeats:
+			formatted_transcript = collapse_repeats(transcript)
+
+		input_tokens = count_tokens(formatted_transcript)
+		truncated = False
+		if s.summary_max_input_tokens and input_tokens > s.summary_max_input_tokens:
+			if lines is None:
+				lines = lines_from_text(formatted_transcript, s.summary_chunk_max_tokens)
+			lines, input_tokens = self._truncate_lines(lines, s.summary_max_input_tokens)
+			formatted_transcript = "\n".join(line.text for line in lines)
+			truncated = True
+		logger.info(
+			f"Summarizing {input_tokens} input tokens"
+			f" ({len(transcript)} chars raw{', truncated to cap' if truncated else ''})"
+		)
+		return formatted_transcript, lines, input_tokens, truncated
+
+	async def _final_request(
+		self,
+		formatted_transcript: str,
+		input_tokens: int,
+		lines: list[TranscriptLine] | None,
+		speaker_segments: list[dict[str, Any]] | None,
+		system_prompt: str,
+		on_partial_summary: Callable[[TranscriptChunk, str], Awaitable[None] | None] | None,
+	) -> tuple[list[dict[str, str]], dict[str, Any] | None]:
+		"""
+		Build the messages of the completion that produces the summary.
+
+		Long transcripts run the map step first, and the returned messages are the
+		reduce pass over the section summaries.
+
+		Returns:
+			Tuple of (messages, raw payload extras such as section summaries)
+		"""
+		s = self.settings
 
 		# Build context-aware prompt based on transcript content
 		detected_languages = self._detect_languages(formatted_transcript)
 		meeting_type = self._detect_meeting_type(formatted_transcript)
-		
+		has_speakers = bool(speaker_segments and len(speaker_segments) > 1)
+
+		if input_tokens > s.summary_map_reduce_threshold_tokens:
+			if lines is None:
+				lines = lines_from_text(formatted_transcript, s.summary_chunk_max_tokens)
+			chunks = chunk_transcript(lines, s.summary_chunk_max_tokens, gap_seconds=s.summary_chunk_gap_seconds)
+			if len(chunks) > 1:
+				return await self._reduce_request(
+					chunks,
+					system_prompt=system_prompt,
+					has_speakers=has_speakers,
+					meeting_type=meeting_type,
+					detected_languages=detected_languages,
+					on_partial_summary=on_partial_summary,
+				)
+
 		user_prompt = self._build_user_prompt(
 			formatted_transcript, 
-			has_speakers=bool(speaker_segments and len(speaker_segments) > 1),
+			has_speakers=has_speakers,
 			meeting_type=meeting_type,
 			detected_languages=detected_languages
 		)
 
 		messages: list[dict[str, str]] = [
-			{"role": "system", "content": SYSTEM_PROMPT},
+			{"role": "system", "content": system_prompt},
 			{"role": "user", "content": user_prompt},
 		]
+		return messages, None
+
+	def _truncate_lines(self, lines: list[TranscriptLine], max_tokens: int) -> tuple[list[TranscriptLine], int]:
+		"""Keep leading lines within the input token cap; returns (lines, token count)."""
+		kept: list[TranscriptLine] = []
+		total = 0
+		for line in lines:
+			tokens = count_tokens(line.text) + 1  # newline
+			if total + tokens > max_tokens:
+				break
+			kept.append(line)
+			total += tokens
+		logger.warning(f"Transcript exceeds summary_max_input_tokens={max_tokens}; kept {len(kept)}/{len(lines)} lines")
+		return kept, total
+
+	def _cache_params(self) -> dict[str, Any]:
+		"""Everything besides the transcript and system prompt that changes the summary."""
+		s = self.settings
+		return {
+			"prompt_version": PROMPT_VERSION,
+			"model": s.nvidia_model,
+			"temperature": s.nvidia_temperature,
+			"top_p": s.nvidia_top_p,
+			"max_tokens": s.nvidia_max_tokens,
+			"thinking": s.nvidia_enable_thinking,
+			"map_reduce": [
+				s.summary_map_reduce_threshold_tokens,
+				s.summary_chunk_max_tokens,
+				s.summary_chunk_gap_seconds,
+				s.summary_map_max_tokens,
+			],
+		}
+
+	async def _reduce_request(
+		self,
+		chunks: list[TranscriptChunk],
+		system_prompt: str,
+		has_speakers: bool,
+		meeting_type: str,
+		detected_languages: list[str],
+		on_partial_summary: Callable[[TranscriptChunk, str], Awaitable[None] | None] | None = None,
+	) -> tuple[list[dict[str, str]], dict[str, Any]]:
+		"""
+		Map step of hierarchical summarization for transcripts too long for a single prompt.
+
+		Sections are summarized concurrently; the returned messages ask the model to
+		combine the section summaries (reduce pass).
+
+		Args:
+			chunks: Token-budgeted transcript sections in chronological order
+			system_prompt: System prompt for every call
+			has_speakers: Whether speaker labels are present
+			meeting_type: Detected meeting type
+			detected_languages: Detected languages
+			on_partial_summary: Optional callback for each finished section summary
+
+		Returns:
+			Tuple of (reduce messages, raw payload holding the section summaries)
+		"""
+		s = self.settings
+		logger.info(f"Hierarchical summarization: {len(chunks)} sections, up to {s.summary_map_concurrency} concurrent")
+
+		semaphore = asyncio.Semaphore(max(1, s.summary_map_concurrency))
+
+		async def _summarize_chunk(chunk: TranscriptChunk) -> str:
+			messages = [
+				{"role": "system", "content": system_prompt},
+				{"role": "user", "content": self._build_section_prompt(chunk, len(chunks), has_speakers)},
+			]
+			async with semaphore:
+				summary = await self._complete(messages, max_tokens=s.summary_map_max_tokens)
+			if on_partial_summary is not None:
+				maybe_awaitable = on_partial_summary(chunk, summary)
+				if maybe_awaitable is not None:
+					await maybe_awaitable
+			return summary
+
+		section_summaries = await asyncio.gather(*(_summarize_chunk(chunk) for chunk in chunks))
+
+		combined = "\n\n".join(
+			f"SECTION {chunk.index + 1}/{len(chunks)}{self._format_range(chunk)}:\n{summary.strip()}"
+			for chunk, summary in zip(chunks, section_summaries)
+		)
+		user_prompt = self._build_user_prompt(
+			combined,
+			has_speakers=has_speakers,
+			meeting_type=meeting_type,
+			detected_languages=detected_languages,
+			sections=len(chunks),
+		)
+		messages = [
+			{"role": "system", "content": system_prompt},
+			{"role": "user", "content": user_prompt},
+		]
+		return messages, {"sections": section_summaries}
+
+	def _build_section_prompt(self, chunk: TranscriptChunk, total: int, has_speakers: bool) -> str:
+		"""Prompt for summarizing one section of a long transcript (map step)."""
+		speaker_note = (
+			"Attribute every point to its speaker (e.g. 'Speaker 2 proposed...'). "
+			if has_speakers
+			else ""
+		)
+		return (
+			f"This is section {chunk.index + 1} of {total} of a long meeting transcript{self._format_range(chunk)}. "
+			"Write concise notes for this section only: topics discussed, decisions, action items "
+			"(who, what, when), open questions and notable quotes in the original language. "
+			f"{speaker_note}"
+			"Do not add an introduction or conclusion; these notes will be merged with the other sections.\n\n"
+			f"TRANSCRIPT SECTION:\n{chunk.text}"
+		)
+
+	def _format_range(self, chunk: TranscriptChunk) -> str:
+		if chunk.start is None or chunk.end is None:
+			return ""
+		return f" ({self._format_time(chunk.start)}-{self._format_time(chunk.end)})"
+
+	async def _complete(self, messages: list[dict[str, str]], max_tokens: int | None = None) -> str:
+		"""Run one chat completion and return its text content."""
+		s = self.settings
+		max_tokens = max_tokens or s.nvidia_max_tokens
 
 		if s.nvidia_stream:
-			# Stream and accumulate content with reasoning support
-			summary_text_parts: list[str] = []
-			reasoning_parts: list[str] = []
-			resp = await self.client.chat.completions.create(
-				model=s.nvidia_model,
-				messages=messages,
-				temperature=s.nvidia_temperature,
-				top_p=s.nvidia_top_p,
-				max_tokens=s.nvidia_max_tokens,
-				extra_body={"chat_template_kwargs": {"thinking": s.nvidia_enable_thinking}},
-				stream=True,
-			)
-			async for chunk in resp:  # type: ignore[attr-defined]
-				if not chunk.choices or len(chunk.choices) == 0:
-					continue
-				delta = getattr(chunk.choices[0], "delta", None)
-				if delta is None:
-					continue
-				# Extract reasoning content if available
-				reasoning = getattr(delta, "reasoning_content", None)
-				if reasoning:
-					reasoning_parts.append(reasoning)
-				# Extract regular content
-				content = getattr(delta, "content", None)
-				if content:
-					summary_text_parts.append(content)
-			# Combine reasoning and content if reasoning was captured
-			full_text = "".join(summary_text_parts)
-			if reasoning_parts and s.nvidia_enable_thinking:
-				# Optionally prepend reasoning if enabled
-				reasoning_text = "".join(reasoning_parts)
-				# For now, just return content (reasoning can be logged separately)
-			return SummaryResult(text=full_text, raw=None)
+			# Stream and accumulate content
+			return "".join([delta async for delta in self._stream_completion(messages, max_tokens=max_tokens)])
 
 		# Non-streaming simple path
 		resp = await self.client.chat.completions.create(
@@ -186,15 +540,46 @@ class NvidiaDeepSeekSummarizer(Summarizer):
 			messages=messages,
 			temperature=s.nvidia_temperature,
 			top_p=s.nvidia_top_p,
-			max_tokens=s.nvidia_max_tokens,
+			max_tokens=max_tokens,
 			extra_body={"chat_template_kwargs": {"thinking": s.nvidia_enable_thinking}},
 		)
 		data: Any = resp
 		choice0 = resp.choices[0]
 		message = getattr(choice0, "message", None)
 		content = getattr(message, "content", None) if message is not None else None
-		text = content if isinstance(content, str) else str(data)
-		return SummaryResult(text=text, raw=None)
+		return content if isinstance(content, str) else str(data)
+
+	async def _stream_completion(
+		self, messages: list[dict[str, str]], max_tokens: int | None = None
+	) -> AsyncIterator[str]:
+		"""Run one streamed chat completion, yielding content deltas (reasoning is not yielded)."""
+		s = self.settings
+		reasoning_chars = 0
+		resp = await self.client.chat.completions.create(
+			model=s.nvidia_model,
+			messages=messages,
+			temperature=s.nvidia_temperature,
+			top_p=s.nvidia_top_p,
+			max_tokens=max_tokens or s.nvidia_max_tokens,
+			extra_body={"chat_template_kwargs": {"thinking": s.nvidia_enable_thinking}},
+			stream=True,
+		)
+		async for chunk in resp:  # type: ignore[attr-defined]
+			if not chunk.choices or len(chunk.choices) == 0:
+				continue
+			delta = getattr(chunk.choices[0], "delta", None)
+			if delta is None:
+				continue
+			# Reasoning content is only counted (it can be logged separately)
+			reasoning = getattr(delta, "reasoning_content", None)
+			if reasoning:
+				reasoning_chars += len(reasoning)
+			# Extract regular content
+			content = getattr(delta, "content", None)
+			if content:
+				yield content
+		if reasoning_chars:
+			logger.debug(f"Model reasoning: {reasoning_chars} chars (not included in summary)")
 
 	def _format_speaker_labeled_transcript(self, speaker_segments: list[dict[str, Any]]) -> str:
 		"""
@@ -207,8 +592,20 @@ class NvidiaDeepSeekSummarizer(Summarizer):
 		Returns:
 			Formatted transcript string with speaker labels in chronological order
 		"""
+		return "\n".join(line.text for line in self._speaker_labeled_lines(speaker_segments))
+
+	def _speaker_labeled_lines(self, speaker_segments: list[dict[str, Any]]) -> list[TranscriptLine]:
+		"""
+		Build chronological "[time] Speaker N: text" lines, keeping segment timing for chunking.
+
+		Args:
+			speaker_segments: List of dicts with 'speaker' and 'segments' keys
+
+		Returns:
+			Transcript lines in chronological order
+		"""
 		if not speaker_segments:
-			return ""
+			return []
 
 		# Flatten all segments with their speakers and sort by start time
 		all_segments: list[dict[str, Any]] = []
@@ -228,9 +625,18 @@ class NvidiaDeepSeekSummarizer(Summarizer):
 		
 		# Sort by start time
 		all_segments.sort(key=lambda x: float(x.get("start", 0)))
+
+		# Merge same-speaker turns, drop fillers and ASR repetition loops
+		s = self.settings
+		if s.summary_compaction:
+			all_segments = compact_segments(
+				all_segments,
+				max_turn_seconds=s.summary_max_turn_seconds,
+				dedupe_repeats=s.summary_dedupe_repeats,
+			)
 		
 		# Format in chronological order with speaker labels
-		formatted_lines: list[str] = []
+		formatted_lines: list[TranscriptLine] = []
 		for seg in all_segments:
 			speaker_label = seg.get("speaker", "Unknown")
 			text = seg.get("text", "").strip()
@@ -245,9 +651,15 @@ class NvidiaDeepSeekSummarizer(Summarizer):
 			
 			# Format with time for context
 			time_str = self._format_time(float(start_time))
-			formatted_lines.append(f"[{time_str}] {formatted_speaker}: {text}")
+			formatted_lines.append(
+				TranscriptLine(
+					text=f"[{time_str}] {formatted_speaker}: {text}",
+					start=float(start_time),
+					end=float(seg.get("end") or start_time),
+				)
+			)
 
-		return "\n".join(formatted_lines) if formatted_lines else ""
+		return formatted_lines
 	
 	def _format_time(self, seconds: float) -> str:
 		"""Format seconds to MM:SS or HH:MM:SS format."""
@@ -261,103 +673,58 @@ class NvidiaDeepSeekSummarizer(Summarizer):
 	def _detect_languages(self, text: str) -> list[str]:
 		"""Detect languages in the transcript."""
 		languages = []
-		# Simple heuristic: Hebrew has Unicode range U+0590-U+05FF
-		if any('\u0590' <= char <= '\u05ff' for char in text):
+		if _HEBREW_CHAR.search(text):
 			languages.append("Hebrew")
-		if any(char.isascii() and char.isalpha() for char in text):
+		if _LATIN_CHAR.search(text):
 			languages.append("English")
 		return languages or ["Unknown"]
 	
 	def _detect_meeting_type(self, text: str) -> str:
-		"""Detect meeting type from transcript content."""
-		text_lower = text.lower()
-		
-		# Council/Government meetings
-		if any(word in text_lower for word in ["council", "mayor", "councillor", "bylaw", "municipality", "resolution"]):
-			return "government_council"
-		
-		# Sales calls
-		if any(word in text_lower for word in ["product", "price", "deal", "client", "sales", "contract", "quote"]):
-			return "sales_call"
-		
-		# Medical/Sales
-		if any(word in text_lower for word in ["patient", "doctor", "prescription", "treatment", "medical"]):
-			return "medical_sales"
-		
-		# General business
-		if any(word in text_lower for word in ["meeting", "agenda", "discussion", "decision", "action"]):
-			return "business_meeting"
-		
-		return "general"
+		"""Detect meeting type from transcript content (single scan over all keyword groups)."""
+		best: str | None = None
+		for match in _MEETING_TYPE_PATTERN.finditer(text):
+			name = match.lastgroup
+			if best is None or _MEETING_TYPE_PRIORITY[name] < _MEETING_TYPE_PRIORITY[best]:
+				best = name
+				if _MEETING_TYPE_PRIORITY[best] == 0:
+					break
+		return best or "general"
 	
 	def _build_user_prompt(
 		self, 
 		transcript: str, 
 		has_speakers: bool, 
 		meeting_type: str,
-		detected_languages: list[str]
+		detected_languages: list[str],
+		sections: int | None = None,
 	) -> str:
-		"""Build context-aware user prompt for summarization."""
+		"""
+		Build context-aware user prompt for summarization.
+
+		With `sections`, `transcript` holds per-section notes from the map step and the
+		prompt asks for them to be combined into the final summary.
+		"""
 		language_note = f"The transcript contains {', '.join(detected_languages)}." if detected_languages else ""
+		base_prompt = _BASE_PROMPTS.get(meeting_type, _BASE_PROMPTS["general"])
+		speaker_instruction = _SPEAKER_INSTRUCTION if has_speakers else _NO_SPEAKER_INSTRUCTION
 		
-		if meeting_type == "government_council":
-			base_prompt = (
-				"Summarize the following council/government meeting transcript. "
-				"Structure the summary as:\n"
-				"1. Meeting Overview (date, participants, agenda)\n"
-				"2. Key Discussion Points (organized by topic with speaker attribution)\n"
-				"3. Decisions Made (with votes/motions if mentioned)\n"
-				"4. Action Items (who is responsible for what, with deadlines if mentioned)\n"
-				"5. Next Steps\n\n"
-			)
-		elif meeting_type == "sales_call" or meeting_type == "medical_sales":
-			base_prompt = (
-				"Summarize the following sales call transcript. "
-				"Structure the summary as:\n"
-				"1. Call Overview (participants, date, purpose)\n"
-				"2. Products/Services Discussed (with speaker attribution)\n"
-				"3. Objections and Responses (who raised what, how addressed)\n"
-				"4. Commitments and Next Steps (specific actions, dates, responsible parties)\n"
-				"5. Key Quotes (important statements in original language with speaker attribution)\n\n"
-			)
-		elif meeting_type == "business_meeting":
-			base_prompt = (
-				"Summarize the following business meeting transcript. "
-				"Structure the summary with clear sections for:\n"
-				"- Agenda Items Discussed\n"
-				"- Key Decisions (with speaker attribution)\n"
-				"- Action Items (who does what by when)\n"
-				"- Important Discussion Points\n\n"
-			)
-		else:
-			base_prompt = (
-				"Summarize the following meeting transcript comprehensively. "
-				"Organize by topics discussed, maintain speaker identity throughout, "
-				"and include action items, decisions, and key points.\n\n"
-			)
-		
-		speaker_instruction = ""
-		if has_speakers:
-			speaker_instruction = (
-				"CRITICAL: This transcript contains multiple speakers. "
-				"You MUST maintain speaker identity throughout the summary. "
-				"For each point, clearly state which speaker made it (e.g., 'Speaker 1 stated...', "
-				"'Speaker 2 responded...', 'According to Speaker 3...'). "
-				"Do NOT merge statements from different speakers. "
-				"Speaker attribution is essential for understanding the meeting dynamics.\n\n"
+		language_line = f"{language_note}\n" if language_note else ""
+		source_label = "TRANSCRIPT"
+		sections_note = ""
+		if sections:
+			source_label = "SECTION NOTES"
+			sections_note = (
+				f"The meeting was too long to read at once, so it was split into {sections} consecutive sections "
+				"and each was summarized separately. Combine the section notes below into a single summary of "
+				"the whole meeting: merge topics that span sections and remove duplicates.\n\n"
 			)
-		else:
-			speaker_instruction = (
-				"Note: This transcript may contain multiple speakers, but speaker labels are not clearly identified. "
-				"Summarize the content while noting any apparent speaker changes when detectable.\n\n"
-			)
-		
+
 		return (
 			f"{base_prompt}"
+			f"{sections_note}"
 			f"{speaker_instruction}"
-			f"{language_note}\n" if language_note else ""
-			f"Keep quotes in original language when relevant. Use clear English for the summary structure. "
-			f"Be comprehensive, detailed, useful, and concise. Ensure every key point includes speaker attribution when available.\n\n"
-			f"TRANSCRIPT:\n{transcript}"
+			f"{language_line}"
+			f"{_STYLE_INSTRUCTION}"
+			f"{source_label}:\n{transcript}"
 		)
 
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any
+
+from agent_service.config import Settings, get_settings
+from agent_service.summarizers.base import SummaryResult
+from agent_service.utils.cache_store import CacheStore
+
+logger = logging.getLogger(__name__)
+
+# Start of str(response) - what NvidiaSummarizer._complete returns when a response has no text content
+_RESPONSE_REPR_PREFIX = "ChatCompletion("
+
+# Process-wide hit/miss counters (summarizers are created per service/request)
+_stats: dict[str, int] = {"hits": 0, "misses": 0, "errors": 0}
+
+
+class SummaryCache:
+	"""
+	Cache of summarizer outputs keyed by everything that determines the result.
+
+	The key hashes the formatted transcript, system prompt, prompt template version,
+	model and sampling parameters, so /analyze re-runs, CLI --from-transcript,
+	comparison experiments and orchestrator retries reuse an identical summary instead
+	of paying for another LLM call. Results are kept in a CacheStore (Redis, or a local
+	directory bounded by total size with LRU eviction) for summary_cache_ttl_seconds.
+	"""
+
+	def __init__(self, settings: Settings | None = None) -> None:
+		"""
+		Initialize the cache.
+
+		Args:
+			settings: Settings providing summary_cache_* options (global settings if None)
+		"""
+		self.settings = settings or get_settings()
+		self.store = CacheStore(
+			"summary",
+			self.settings.summary_cache_backend,
+			directory=self.settings.summary_cache_dir,
+			max_bytes=self.settings.summary_cache_max_bytes,
+			ttl_seconds=self.settings.summary_cache_ttl_seconds,
+			redis_url=self.settings.redis_url,
+		)
+
+	@property
+	def enabled(self) -> bool:
+		return self.store.enabled
+
+	@staticmethod
+	def make_key(transcript: str, system_prompt: str, params: dict[str, Any]) -> str:
+		"""
+		Build the cache key for a summarization request.
+
+		Args:
+			transcript: Formatted transcript exactly as it is sent to the model
+			system_prompt: System prompt text
+			params: Model, sampling and prompt-version parameters
+
+		Returns:
+			Hex cache key
+		"""
+		digest = hashlib.sha256()
+		digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+		digest.update(b"\0")
+		digest.update(system_prompt.encode("utf-8"))
+		digest.update(b"\0")
+		digest.update(transcript.encode("utf-8"))
+		return digest.hexdigest()
+
+	async def get(self, key: str) -> SummaryResult | None:
+		"""Return the cached summary for `key`, or None on a miss (or cache error)."""
+		if not self.enabled:
+			return None
+		try:
+			raw = await asyncio.to_thread(self.store.read, key)
+		except Exception as e:
+			_stats["errors"] += 1
+			logger.warning(f"Summary cache read failed: {e}")
+			return None
+		if raw is None:
+			_stats["misses"] += 1
+			logger.info(f"Summary cache miss ({key[:12]}) {_format_stats()}")
+			return None
+		try:
+			data = json.loads(raw)
+			result = SummaryResult(text=data["text"], raw=data.get("raw"))
+		except (ValueError, KeyError, TypeError) as e:
+			_stats["errors"] += 1
+			logger.warning(f"Dropping unreadable summary cache entry ({key[:12]}): {e}")
+			await self._delete(key)
+			return None
+		_stats["hits"] += 1
+		logger.info(f"Summary cache hit ({key[:12]}) {_format_stats()}")
+		return result
+
+	async def set(self, key: str, result: SummaryResult) -> None:
+		"""Store a usable summary (errors are logged, never raised)."""
+		if not self.enabled:
+			return
+		if not is_cacheable(result):
+			logger.info(f"Not caching empty or degenerate summary ({key[:12]})")
+			return
+		try:
+			value = json.dumps({"text": result.text, "raw": result.raw}, ensure_ascii=False, default=str)
+			await asyncio.to_thread(self.store.write, key, value)
+		except Exception as e:
+			_stats["errors"] += 1
+			logger.warning(f"Summary cache write failed: {e}")
+
+	async def _delete(self, key: str) -> None:
+		try:
+			await asyncio.to_thread(self.store.delete, key)
+		except Exception as e:
+			logger.warning(f"Summary cache delete failed: {e}")
+
+
+def is_cacheable(result: SummaryResult) -> bool:
+	"""
+	True if a summary is worth serving from cache.
+
+	Rejects empty summaries (e.g. a stream that produced no content) and the
+	str(response) fallback used when a completion has no text content, so a retry
+	asks the model again instead of reusing a bad result for the whole TTL.
+	"""
+	text = (result.text or "").strip()
+	return bool(text) and not text.startswith(_RESPONSE_REPR_PREFIX)
+
+
+def summary_cache_stats() -> dict[str, Any]:
+	"""Hit/miss counters for the summary cache in this process."""
+	lookups = _stats["hits"] + _stats["misses"]
+	return {**_stats, "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None}
+
+
+def _format_stats() -> str:
+	stats = summary_cache_stats()
+	return f"(hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']})"
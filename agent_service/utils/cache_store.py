@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStore:
+    """
+    String key/value store behind the transcription and summary caches.
+
+    Values live in Redis (expiring after ttl_seconds) or as one JSON file per key in a
+    local directory. On disk a file's mtime is its write time, which the TTL is checked
+    against on every read, and its atime is its last hit, which orders LRU eviction once
+    the directory grows past max_bytes.
+
+    All methods block; async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: str | None,
+        directory: str,
+        max_bytes: int,
+        ttl_seconds: int,
+        redis_url: str | None = None,
+    ) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            name: Cache name, used for the Redis key prefix and in log messages
+            backend: "redis", "disk" or "none" (anything else disables the cache)
+            directory: Directory for the disk backend
+            max_bytes: Size bound for the disk backend
+            ttl_seconds: Entry lifetime, measured from when it was written
+            redis_url: Redis URL for the redis backend (falls back to disk if unset)
+        """
+        self.name = name
+        self.backend = (backend or "none").lower()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self.key_prefix = f"{name}:"
+        self._redis: Any = None
+
+        if self.backend == "redis" and not redis_url:
+            logger.warning(f"{name}_cache_backend=redis but REDIS_URL is not set; using disk cache")
+            self.backend = "disk"
+        if self.backend not in ("redis", "disk", "none"):
+            logger.warning(f"Unknown {name} cache backend {self.backend!r}; caching disabled")
+            self.backend = "none"
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend != "none"
+
+    def read(self, key: str) -> str | None:
+        """Return the stored value, or None if it is missing or expired."""
+        if self.backend == "redis":
+            return self.get_redis().get(f"{self.key_prefix}{key}")
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                written_at = os.fstat(f.fileno()).st_mtime
+                if time.time() - written_at > self.ttl_seconds:
+                    expired = True
+                else:
+                    expired = False
+                    raw = f.read()
+                    # Record the hit in atime for LRU ordering; mtime keeps the write time for the TTL
+                    os.utime(f.fileno() if os.utime in os.supports_fd else path, (time.time(), written_at))
+        except FileNotFoundError:
+            return None
+        if expired:
+            self._unlink(path)
+            return None
+        return raw
+
+    def write(self, key: str, value: str) -> None:
+        """Store a value, replacing any previous one."""
+        if self.backend == "redis":
+            self.get_redis().setex(f"{self.key_prefix}{key}", self.ttl_seconds, value)
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Write atomically so concurrent readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry (no error if it does not exist)."""
+        if self.backend == "redis":
+            self.get_redis().delete(f"{self.key_prefix}{key}")
+            return
+        self._unlink(self._path(key))
+
+    def get_redis(self) -> Any:
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    def _evict(self) -> None:
+        """Delete expired entries, then least recently used ones until the directory fits in max_bytes."""
+        expire_before = time.time() - self.ttl_seconds
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not (entry.is_file() and entry.name.endswith(".json")):
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime < expire_before:
+                    self._unlink(entry.path)
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._unlink(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
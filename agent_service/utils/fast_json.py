@@ -0,0 +1,85 @@
+"""
+Fast JSON encode/decode with optional msgspec/orjson backends.
+
+Multi-megabyte ASR responses (word timestamps for long meetings) and large
+transcript responses dominate JSON time. msgspec is preferred, then orjson,
+falling back to the stdlib when neither is installed.
+"""
+
+import json
+import logging
+from typing import Any, Optional, Union
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+
+    class TranscriptSegment(msgspec.Struct):
+        """Speaker-labeled transcript segment served by the API."""
+
+        start: float
+        end: float
+        text: Optional[str] = None
+        speaker: Optional[str] = None
+        speaker_id: Optional[str] = None
+
+elif orjson is not None:
+    BACKEND = "orjson"
+else:
+    BACKEND = "json"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON into builtin Python objects."""
+    if msgspec is not None:
+        return _decoder.decode(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to UTF-8 JSON bytes (non-ASCII text such as Hebrew is not escaped)."""
+    if msgspec is not None:
+        return _encoder.encode(obj)
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_segment(
+    start: float,
+    end: float,
+    text: Optional[str] = None,
+    speaker: Optional[str] = None,
+    speaker_id: Optional[str] = None,
+) -> Any:
+    """Build a transcript segment: a typed TranscriptSegment struct with msgspec, else a dict."""
+    if msgspec is not None:
+        return TranscriptSegment(start=start, end=end, text=text, speaker=speaker, speaker_id=speaker_id)
+    return {"start": start, "end": end, "text": text, "speaker": speaker, "speaker_id": speaker_id}
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fastest available encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+logger.debug(f"JSON backend: {BACKEND}")
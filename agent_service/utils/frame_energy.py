@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def frame_energy(audio: np.ndarray, frame_len: int, hop_len: int) -> np.ndarray:
+    """
+    Mean squared amplitude of each frame (frames of `frame_len` every `hop_len` samples).
+
+    Works on hop-sized blocks so memory stays proportional to the number of frames,
+    not to the recording length: per-block sums of squares (einsum over a reshaped
+    view, no squared or float64 copy of the audio) are combined with a prefix sum,
+    plus the tail of each frame that does not fill a whole block.
+
+    Args:
+        audio: Mono audio samples
+        frame_len: Frame length in samples
+        hop_len: Hop between frame starts in samples
+
+    Returns:
+        float64 array with one energy value per frame
+    """
+    audio = np.ascontiguousarray(audio)
+    n_frames = (len(audio) - frame_len) // hop_len + 1
+    full_blocks, remainder = divmod(frame_len, hop_len)
+
+    n_blocks = len(audio) // hop_len
+    blocks = audio[: n_blocks * hop_len].reshape(n_blocks, hop_len)
+    block_energy = np.einsum("ij,ij->i", blocks, blocks).astype(np.float64)
+    prefix = np.concatenate(([0.0], np.cumsum(block_energy)))
+    energy = prefix[full_blocks:full_blocks + n_frames] - prefix[:n_frames]
+
+    if remainder:
+        tails = np.lib.stride_tricks.sliding_window_view(audio, remainder)[full_blocks * hop_len::hop_len][:n_frames]
+        energy += np.einsum("ij,ij->i", tails, tails)
+    return energy / frame_len
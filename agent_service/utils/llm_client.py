@@ -1,20 +1,72 @@
 import os
+import asyncio
 import logging
-from typing import Any, List, Dict, Union
+import threading
+import time
+from typing import Any, List, Dict, Optional, Union
+import httpx
 from langchain_core.prompts import ChatPromptTemplate
-from openai import OpenAI, AsyncOpenAI
+from openai import APIConnectionError, APIStatusError, OpenAI, AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
+_EXTRA_HEADERS = {"HTTP-Referer": "https://ivreetmeet.com", "X-Title": "IvreetMeet"}
+# Keys rejected as unauthorized are parked this long before being tried again
+_AUTH_FAILURE_COOLDOWN_SECONDS = 300.0
+# Short pause for a key after a transient (non rate-limit) error
+_ERROR_COOLDOWN_SECONDS = 1.0
+# Client errors worth retrying (possibly on another key); any other 4xx is the request's fault
+_RETRYABLE_4XX = frozenset({401, 403, 408, 409, 429})
+_WAIT_POLL_SECONDS = 0.05
+
+
+class _KeyState:
+    """One OpenRouter API key with its pooled clients and load/quota bookkeeping."""
+
+    def __init__(self, key: str, base_url: str):
+        self.key = key
+        self.base_url = base_url
+        self.outstanding = 0
+        self.cooldown_until = 0.0
+        self.remaining: Optional[int] = None  # From x-ratelimit-remaining headers, when reported
+        self.auth_failed = False  # Last error was 401/403; cleared by the next success
+        self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def suffix(self) -> str:
+        return self.key[-4:]
+
+    def client(self) -> OpenAI:
+        if self._client is None:
+            # Retries are handled by the pool so a rate-limited key is not retried in place
+            self._client = OpenAI(base_url=self.base_url, api_key=self.key, max_retries=0)
+        return self._client
+
+    def async_client(self) -> AsyncOpenAI:
+        # Async connections are bound to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(base_url=self.base_url, api_key=self.key, max_retries=0)
+            self._async_loop = loop
+        return self._async_client
+
+
 class LLMClient:
     """
     Unified LLM Client.
     Primary: OpenRouter (Grok)
+
+    Holds one pooled client per API key. Each call goes to the available key with
+    the fewest in-flight requests (ties broken by remaining quota), per-key
+    concurrency is capped, and keys that return 429 are parked for Retry-After.
+    Safe to share across threads and coroutines.
     """
 
     def __init__(self, settings: Any):
         self.settings = settings
-        
+
         # OpenRouter (Primary)
         self.openrouter_keys = [
             k for k in [
@@ -22,10 +74,14 @@ class LLMClient:
                 settings.openrouter_api_key0 or os.getenv("OPENROUTER_API_KEY0"),
             ] if k
         ]
-        self.current_key_index = 0
         self.openrouter_base_url = settings.openrouter_base_url
         self.openrouter_model = settings.openrouter_model or "x-ai/grok-4-fast"
-        
+        self.max_concurrency_per_key = max(1, getattr(settings, "openrouter_max_concurrency_per_key", 8))
+        self.default_retry_after = getattr(settings, "openrouter_default_retry_after_seconds", 5.0)
+
+        self._keys = [_KeyState(k, self.openrouter_base_url) for k in self.openrouter_keys]
+        self._lock = threading.Condition()
+
         if not self.openrouter_keys:
             logger.warning("No OpenRouter API keys configured for LLMClient.")
 
@@ -35,7 +91,7 @@ class LLMClient:
         """
         if self.openrouter_keys:
             return self._invoke_openrouter(prompt_or_messages, input_data or {}, **kwargs)
-            
+
         raise RuntimeError("No available LLM provider configured (OpenRouter API keys missing).")
 
     async def ainvoke(self, prompt_or_messages: Union[ChatPromptTemplate, List[Dict[str, str]]], input_data: Dict[str, Any] = None, **kwargs) -> str:
@@ -44,94 +100,216 @@ class LLMClient:
         """
         if self.openrouter_keys:
             return await self._ainvoke_openrouter(prompt_or_messages, input_data or {}, **kwargs)
-            
+
         raise RuntimeError("No available LLM provider configured (OpenRouter API keys missing).")
 
-    def _get_next_key(self) -> str:
-        """Rotates to the next available API key."""
-        if not self.openrouter_keys:
-            raise RuntimeError("No OpenRouter API keys available.")
-        
-        key = self.openrouter_keys[self.current_key_index]
-        self.current_key_index = (self.current_key_index + 1) % len(self.openrouter_keys)
-        return key
+    def _try_acquire(self, exclude: Optional[_KeyState] = None) -> tuple:
+        """
+        Reserve the best available key.
+
+        Returns:
+            (key state, 0.0) on success, or (None, seconds to wait before retrying)
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                k for k in self._keys
+                if k.cooldown_until <= now and k.outstanding < self.max_concurrency_per_key
+            ]
+            # Prefer a different key than the one that just failed, if another is available
+            if exclude is not None and len(candidates) > 1:
+                candidates = [k for k in candidates if k is not exclude]
+            if candidates:
+                best = min(
+                    candidates,
+                    key=lambda k: (k.outstanding, -(k.remaining if k.remaining is not None else float("inf"))),
+                )
+                best.outstanding += 1
+                return best, 0.0
+            cooling = [k.cooldown_until - now for k in self._keys if k.cooldown_until > now]
+            if len(cooling) == len(self._keys):
+                return None, min(cooling)
+            return None, _WAIT_POLL_SECONDS
+
+    def _check_auth(self, last_error: Optional[Exception]) -> None:
+        """Fail fast instead of waiting out the cooldown when every key is parked for bad credentials."""
+        now = time.monotonic()
+        with self._lock:
+            all_rejected = all(k.auth_failed and k.cooldown_until > now for k in self._keys)
+        if all_rejected:
+            detail = f" Last error: {last_error}" if last_error is not None else ""
+            raise RuntimeError(f"All OpenRouter keys were rejected as unauthorized.{detail}")
+
+    def _acquire(self, exclude: Optional[_KeyState] = None, last_error: Optional[Exception] = None) -> _KeyState:
+        """Reserve a key, blocking the calling thread until one is available."""
+        while True:
+            self._check_auth(last_error)
+            state, wait = self._try_acquire(exclude)
+            if state is not None:
+                return state
+            with self._lock:
+                self._lock.wait(timeout=wait)
+
+    async def _aacquire(self, exclude: Optional[_KeyState] = None, last_error: Optional[Exception] = None) -> _KeyState:
+        """Reserve a key without blocking the event loop."""
+        while True:
+            self._check_auth(last_error)
+            state, wait = self._try_acquire(exclude)
+            if state is not None:
+                return state
+            await asyncio.sleep(wait)
+
+    def _release(self, state: _KeyState, error: Optional[Exception] = None, headers: Any = None) -> None:
+        """Return a key to the pool, recording quota headers or an error cooldown."""
+        with self._lock:
+            state.outstanding -= 1
+            if headers is not None:
+                remaining = _header_int(headers, "x-ratelimit-remaining-requests", "x-ratelimit-remaining")
+                if remaining is not None:
+                    state.remaining = remaining
+            if error is not None:
+                cooldown = self._cooldown_for(error)
+                state.cooldown_until = max(state.cooldown_until, time.monotonic() + cooldown)
+                state.auth_failed = getattr(error, "status_code", None) in (401, 403)
+                logger.warning(f"Key ...{state.suffix} paused for {cooldown:.1f}s after error: {error}")
+            elif headers is not None:
+                state.auth_failed = False
+            self._lock.notify_all()
+
+    def _cooldown_for(self, error: Exception) -> float:
+        """How long to park a key after `error` (honours Retry-After on rate limits)."""
+        status = getattr(error, "status_code", None)
+        if status in (401, 403):
+            return _AUTH_FAILURE_COOLDOWN_SECONDS
+        if status in (429, 503):
+            response = getattr(error, "response", None)
+            retry_after = _parse_retry_after(response.headers if response is not None else None)
+            return retry_after if retry_after is not None else self.default_retry_after
+        return _ERROR_COOLDOWN_SECONDS
+
+    def _request_kwargs(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        request = {
+            "model": self.openrouter_model,
+            "messages": messages,
+            "temperature": 0.6,
+            "max_tokens": 8192,
+            "extra_headers": _EXTRA_HEADERS,
+        }
+        request.update(kwargs)
+        return request
 
     def _invoke_openrouter(self, prompt_or_messages: Union[ChatPromptTemplate, List[Dict[str, str]]], input_data: Dict[str, Any], **kwargs) -> str:
         """Invoke via OpenRouter with fallback (Sync)"""
-        import openai
-        
-        messages = self._format_messages(prompt_or_messages, input_data)
-        extra_body = kwargs.pop("extra_body", None)
-        max_retries = len(self.openrouter_keys) * 2
+        request = self._request_kwargs(self._format_messages(prompt_or_messages, input_data), kwargs)
+        max_retries = len(self._keys) * 2
         last_error = None
-        
+        failed_key = None
+
         for attempt in range(max_retries):
-            current_key = self._get_next_key()
+            state = self._acquire(exclude=failed_key, last_error=last_error)
             try:
-                client = OpenAI(base_url=self.openrouter_base_url, api_key=current_key)
-                logger.info(f"Invoking OpenRouter ({self.openrouter_model}) with key ending in ...{current_key[-4:]} (Attempt {attempt+1})")
-                
-                completion = client.chat.completions.create(
-                    model=self.openrouter_model,
-                    messages=messages,
-                    temperature=0.6,
-                    max_tokens=8192,
-                    extra_headers={"HTTP-Referer": "https://ivreetmeet.com", "X-Title": "IvreetMeet"},
-                    extra_body=extra_body,
-                    **kwargs
-                )
-                return completion.choices[0].message.content
+                logger.info(f"Invoking OpenRouter ({self.openrouter_model}) with key ending in ...{state.suffix} (Attempt {attempt+1})")
+                raw = state.client().chat.completions.with_raw_response.create(**request)
+                completion = raw.parse()
             except Exception as e:
-                logger.warning(f"Error with key ...{current_key[-4:]}: {e}. Rotating...")
+                if not _is_retryable(e):
+                    # The request itself is bad (e.g. 400, context length) or the code failed: same result on any key
+                    self._release(state)
+                    raise
+                self._release(state, error=e)
                 last_error = e
+                failed_key = state
                 continue
-                
+            self._release(state, headers=raw.headers)
+            return completion.choices[0].message.content
+
         raise RuntimeError(f"All OpenRouter keys failed. Last error: {last_error}")
 
     async def _ainvoke_openrouter(self, prompt_or_messages: Union[ChatPromptTemplate, List[Dict[str, str]]], input_data: Dict[str, Any], **kwargs) -> str:
         """Invoke via OpenRouter with fallback (Async)"""
-        import openai
-        
-        messages = self._format_messages(prompt_or_messages, input_data)
-        extra_body = kwargs.pop("extra_body", None)
-        max_retries = len(self.openrouter_keys) * 2
+        request = self._request_kwargs(self._format_messages(prompt_or_messages, input_data), kwargs)
+        max_retries = len(self._keys) * 2
         last_error = None
-        
+        failed_key = None
+
         for attempt in range(max_retries):
-            current_key = self._get_next_key()
+            state = await self._aacquire(exclude=failed_key, last_error=last_error)
             try:
-                client = AsyncOpenAI(base_url=self.openrouter_base_url, api_key=current_key)
-                logger.info(f"Invoking OpenRouter Async ({self.openrouter_model}) with key ending in ...{current_key[-4:]} (Attempt {attempt+1})")
-                
-                completion = await client.chat.completions.create(
-                    model=self.openrouter_model,
-                    messages=messages,
-                    temperature=0.6,
-                    max_tokens=8192,
-                    extra_headers={"HTTP-Referer": "https://ivreetmeet.com", "X-Title": "IvreetMeet"},
-                    extra_body=extra_body,
-                    **kwargs
-                )
-                return completion.choices[0].message.content
+                logger.info(f"Invoking OpenRouter Async ({self.openrouter_model}) with key ending in ...{state.suffix} (Attempt {attempt+1})")
+                raw = await state.async_client().chat.completions.with_raw_response.create(**request)
+                completion = raw.parse()
+            except asyncio.CancelledError:
+                self._release(state)
+                raise
             except Exception as e:
-                logger.warning(f"Async Error with key ...{current_key[-4:]}: {e}. Rotating...")
+                if not _is_retryable(e):
+                    self._release(state)
+                    raise
+                self._release(state, error=e)
                 last_error = e
+                failed_key = state
                 continue
-                
+            self._release(state, headers=raw.headers)
+            return completion.choices[0].message.content
+
         raise RuntimeError(f"All OpenRouter keys failed. Last error: {last_error}")
 
     def _format_messages(self, prompt_or_messages: Union[ChatPromptTemplate, List[Dict[str, str]]], input_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """Helper to format messages for OpenAI API"""
         if isinstance(prompt_or_messages, list):
             return prompt_or_messages
-            
+
         messages = prompt_or_messages.format_messages(**input_data)
         formatted_messages = [{"role": m.type, "content": m.content} for m in messages]
-        
+
         for m in formatted_messages:
             if m["role"] == "human": m["role"] = "user"
             elif m["role"] == "ai": m["role"] = "assistant"
             elif m["role"] == "system": m["role"] = "system"
             else: m["role"] = "user"
-            
+
         return formatted_messages
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Connection errors, timeouts, 5xx, rate limits and auth failures (another key may work) are retried.
+
+    Everything else - other 4xx, or a bug while building the request or parsing the
+    response (TypeError, KeyError, ...) - is raised at once without parking the key.
+    """
+    if isinstance(error, (APIConnectionError, httpx.TransportError, TimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code in _RETRYABLE_4XX
+    return False
+
+
+def _header_int(headers: Any, *names: str) -> Optional[int]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                continue
+    return None
+
+
+def _parse_retry_after(headers: Any) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if headers is None:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -1,8 +1,15 @@
 """XG Agent module for LangGraph/XGBoost analysis workflows."""
 
-from agent_service.xg_agent.agent import Agent, AgentState, create_agent_workflow, get_workflow
-
-__all__ = ["Agent", "AgentState", "create_agent_workflow", "get_workflow"]
+from agent_service.xg_agent.agent import (
+	Agent,
+	AgentState,
+	create_agent_workflow,
+	get_agent,
+	get_compiled_workflow,
+	get_workflow,
+)
+
+__all__ = ["Agent", "AgentState", "create_agent_workflow", "get_agent", "get_compiled_workflow", "get_workflow"]
 
 
 
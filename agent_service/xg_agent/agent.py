@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import TypedDict, List, Optional
+from typing import Annotated, TypedDict, List, Optional
 from langgraph.graph import StateGraph, END
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from langchain_core.prompts import ChatPromptTemplate
@@ -16,10 +16,12 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 import os
+import asyncio
 import base64
 import email
 from datetime import datetime, timedelta
 import json
+from functools import lru_cache
 
 from agent_service.xg_agent.data_processing import load_and_preprocess_data
 from agent_service.xg_agent.analysis import perform_xgboost_analysis, generate_retail_summary
@@ -30,6 +32,15 @@ from agent_service.xg_agent.email_analysis import (
 	generate_email_summary, 
 	save_email_database
 )
+from agent_service.xg_agent.health_scoring import (
+	EMAIL_HEALTH_PROMPT,
+	EMAIL_HEALTH_SCHEMA,
+	HEALTH_DIMENSIONS,
+	email_scores_from_analysis,
+	merge_health_scores,
+	parse_json_response,
+	schema_text,
+)
 from agent_service.config import get_settings
 
 
@@ -49,7 +60,7 @@ class AgentState(TypedDict):
 	email_summary: str
 	# Communication health analysis state
 	preprocessed_emails: List[dict]
-	communication_health_scores: dict  # Individual scores for each dimension
+	communication_health_scores: Annotated[dict, merge_health_scores]  # Individual scores for each dimension (merged across parallel nodes)
 	aggregated_health: dict  # Consolidated results
 	health_explanation: str  # Natural language explanation
 	# User context for database lookups
@@ -59,6 +70,9 @@ class AgentState(TypedDict):
 class Agent:
 	"""
 	The main agent class that orchestrates the data analysis and summarization.
+	
+	Instances hold no per-run state, so one agent (and its LLM client) is shared by
+	all workflow runs in the process; see get_agent().
 	"""
 	def __init__(self):
 		settings = get_settings()
@@ -76,7 +90,6 @@ class Agent:
 			max_tokens=settings.nvidia_max_tokens,
 			extra_body={"chat_template_kwargs": {"thinking": settings.nvidia_enable_thinking}},
 		)
-		self.gmail_service = None
 		self.settings = settings
 
 	def _calculate_communication_health_features(self, email_data: dict) -> dict:
@@ -621,21 +634,20 @@ class Agent:
 		state["email_analysis"] = []
 		state["drafts"] = []
 		
-		# Get Gmail service - this will raise an exception if authentication fails
-		if not self.gmail_service:
-			user_id = state.get("user_id")
-			self.gmail_service = self.get_gmail_service(user_id=user_id)
+		# Get Gmail service - this will raise an exception if authentication fails.
+		# Built per run (not stored on the agent) since one Agent is shared by all users.
+		gmail_service = self.get_gmail_service(user_id=state.get("user_id"))
 		
-		if not self.gmail_service:
+		if not gmail_service:
 			raise Exception("Gmail authentication failed. Please ensure credentials.json is properly configured.")
 		
 		# Fetch real emails from Gmail API
 		try:
-			results = self.gmail_service.users().messages().list(userId='me', maxResults=50).execute()
+			results = gmail_service.users().messages().list(userId='me', maxResults=50).execute()
 			messages = results.get('messages', [])
 			
 			for message in messages:
-				msg = self.gmail_service.users().messages().get(userId='me', id=message['id']).execute()
+				msg = gmail_service.users().messages().get(userId='me', id=message['id']).execute()
 				email_data = self._parse_email_message(msg)
 				state["emails"].append(email_data)
 		except Exception as e:
@@ -667,7 +679,77 @@ class Agent:
 		state["preprocessed_emails"] = preprocessed
 		return state
 	
-	def analyze_clarity_node(self, state: AgentState) -> AgentState:
+	async def _invoke_per_email(self, chain, inputs: List[dict]) -> List[Optional[str]]:
+		"""
+		Runs `chain` once per email input concurrently and returns results in input order.
+		
+		At most settings.email_analysis_concurrency calls are in flight at a time, and each
+		call is bounded by settings.email_analysis_timeout_seconds. A call that fails or
+		times out yields None, so the node records its fallback score for that email.
+		"""
+		semaphore = asyncio.Semaphore(max(1, self.settings.email_analysis_concurrency))
+		timeout = self.settings.email_analysis_timeout_seconds
+		
+		async def _invoke(index: int, chain_input: dict) -> Optional[str]:
+			async with semaphore:
+				try:
+					return await asyncio.wait_for(chain.ainvoke(chain_input), timeout=timeout)
+				except asyncio.TimeoutError:
+					print(f"LLM scoring timed out after {timeout}s (item {index})")
+				except Exception as e:
+					print(f"LLM scoring failed (item {index}): {e}")
+				return None
+		
+		return await asyncio.gather(*(_invoke(i, chain_input) for i, chain_input in enumerate(inputs)))
+	
+	async def analyze_health_combined_node(self, state: AgentState) -> dict:
+		"""
+		Scores all 6 communication health dimensions with one LLM call per email.
+		
+		Algorithm: LLM-based structured-output analysis (DeepSeek v3.1 via NVIDIA API)
+		- Model: deepseek-ai/deepseek-v3.1-terminus
+		- Input: Email subject + body + sender + date
+		- Processing: Single zero-shot prompt covering every dimension, answered as
+		  JSON matching EMAIL_HEALTH_SCHEMA
+		- Output: Same per-dimension entries as the analyze_<dimension> nodes
+		  ({'email_id', '<dimension>_score', 'reasoning'})
+		
+		Rating Principle: Same factors and thresholds as the per-dimension nodes.
+		Sends one request per email instead of six; the per-dimension nodes remain
+		available as a higher-fidelity mode (communication_health_mode="per_dimension").
+		"""
+		print("---ANALYZING COMMUNICATION HEALTH (ALL DIMENSIONS)---")
+		
+		prompt = ChatPromptTemplate.from_template(EMAIL_HEALTH_PROMPT)
+		chain = prompt | self.llm | StrOutputParser()
+		schema = schema_text(EMAIL_HEALTH_SCHEMA)
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
+				"subject": email.get('subject', ''),
+				"body": email.get('body', ''),
+				"sender": email.get('from', ''),
+				"date": email.get('date', ''),
+				"schema": schema
+			}
+			for email in emails
+		])
+		
+		scores = {dim: [] for dim in HEALTH_DIMENSIONS}
+		for email, result in zip(emails, results):
+			try:
+				analysis = parse_json_response(result) if result is not None else None
+			except ValueError as e:
+				print(f"Combined health analysis failed for email {email.get('id')}: {e}")
+				analysis = None
+			
+			for dim, entry in email_scores_from_analysis(email.get('id'), analysis).items():
+				scores[dim].append(entry)
+		
+		return {"communication_health_scores": scores}
+	
+	async def analyze_clarity_node(self, state: AgentState) -> dict:
 		"""
 		Analyzes clarity and conciseness of emails.
 		
@@ -692,29 +774,30 @@ class Agent:
 		"""
 		print("---ANALYZING CLARITY & CONCISENESS---")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
-		scores = []
-		for email in state["preprocessed_emails"]:
-			prompt = ChatPromptTemplate.from_template(
-				"""
-				Evaluate the clarity and conciseness of this email on a scale of 0.0 to 1.0.
-				Consider: readability, directness, absence of jargon, brevity.
-				
-				Subject: {subject}
-				Body: {body}
-				
-				Respond with JSON: {{"clarity_score": 0.0-1.0, "reasoning": "brief explanation"}}
-				"""
-			)
+		prompt = ChatPromptTemplate.from_template(
+			"""
+			Evaluate the clarity and conciseness of this email on a scale of 0.0 to 1.0.
+			Consider: readability, directness, absence of jargon, brevity.
+			
+			Subject: {subject}
+			Body: {body}
 			
-			chain = prompt | self.llm | StrOutputParser()
-			result = chain.invoke({
+			Respond with JSON: {{"clarity_score": 0.0-1.0, "reasoning": "brief explanation"}}
+			"""
+		)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
 				"subject": email.get('subject', ''),
 				"body": email.get('body', '')
-			})
-			
+			}
+			for email in emails
+		])
+		
+		scores = []
+		for email, result in zip(emails, results):
 			try:
 				analysis = json.loads(result)
 				scores.append({
@@ -729,10 +812,9 @@ class Agent:
 					'reasoning': 'Analysis failed'
 				})
 		
-		state["communication_health_scores"]["clarity"] = scores
-		return state
+		return {"communication_health_scores": {"clarity": scores}}
 	
-	def analyze_completeness_node(self, state: AgentState) -> AgentState:
+	async def analyze_completeness_node(self, state: AgentState) -> dict:
 		"""
 		Analyzes completeness of emails.
 		
@@ -757,29 +839,30 @@ class Agent:
 		"""
 		print("---ANALYZING COMPLETENESS---")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
-		scores = []
-		for email in state["preprocessed_emails"]:
-			prompt = ChatPromptTemplate.from_template(
-				"""
-				Evaluate the completeness of this email on a scale of 0.0 to 1.0.
-				Consider: sufficient information, actionable details, clear next steps, answers potential questions.
-				
-				Subject: {subject}
-				Body: {body}
-				
-				Respond with JSON: {{"completeness_score": 0.0-1.0, "reasoning": "brief explanation"}}
-				"""
-			)
+		prompt = ChatPromptTemplate.from_template(
+			"""
+			Evaluate the completeness of this email on a scale of 0.0 to 1.0.
+			Consider: sufficient information, actionable details, clear next steps, answers potential questions.
 			
-			chain = prompt | self.llm | StrOutputParser()
-			result = chain.invoke({
+			Subject: {subject}
+			Body: {body}
+			
+			Respond with JSON: {{"completeness_score": 0.0-1.0, "reasoning": "brief explanation"}}
+			"""
+		)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
 				"subject": email.get('subject', ''),
 				"body": email.get('body', '')
-			})
-			
+			}
+			for email in emails
+		])
+		
+		scores = []
+		for email, result in zip(emails, results):
 			try:
 				analysis = json.loads(result)
 				scores.append({
@@ -794,10 +877,9 @@ class Agent:
 					'reasoning': 'Analysis failed'
 				})
 		
-		state["communication_health_scores"]["completeness"] = scores
-		return state
+		return {"communication_health_scores": {"completeness": scores}}
 	
-	def analyze_correctness_node(self, state: AgentState) -> AgentState:
+	async def analyze_correctness_node(self, state: AgentState) -> dict:
 		"""
 		Analyzes correctness and coherence of emails.
 		
@@ -822,29 +904,30 @@ class Agent:
 		"""
 		print("---ANALYZING CORRECTNESS & COHERENCE---")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
-		scores = []
-		for email in state["preprocessed_emails"]:
-			prompt = ChatPromptTemplate.from_template(
-				"""
-				Evaluate the correctness and coherence of this email on a scale of 0.0 to 1.0.
-				Consider: factual accuracy, grammar/spelling, logical flow, consistent tone.
-				
-				Subject: {subject}
-				Body: {body}
-				
-				Respond with JSON: {{"correctness_score": 0.0-1.0, "reasoning": "brief explanation"}}
-				"""
-			)
+		prompt = ChatPromptTemplate.from_template(
+			"""
+			Evaluate the correctness and coherence of this email on a scale of 0.0 to 1.0.
+			Consider: factual accuracy, grammar/spelling, logical flow, consistent tone.
+			
+			Subject: {subject}
+			Body: {body}
 			
-			chain = prompt | self.llm | StrOutputParser()
-			result = chain.invoke({
+			Respond with JSON: {{"correctness_score": 0.0-1.0, "reasoning": "brief explanation"}}
+			"""
+		)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
 				"subject": email.get('subject', ''),
 				"body": email.get('body', '')
-			})
-			
+			}
+			for email in emails
+		])
+		
+		scores = []
+		for email, result in zip(emails, results):
 			try:
 				analysis = json.loads(result)
 				scores.append({
@@ -859,10 +942,9 @@ class Agent:
 					'reasoning': 'Analysis failed'
 				})
 		
-		state["communication_health_scores"]["correctness"] = scores
-		return state
+		return {"communication_health_scores": {"correctness": scores}}
 	
-	def analyze_courtesy_node(self, state: AgentState) -> AgentState:
+	async def analyze_courtesy_node(self, state: AgentState) -> dict:
 		"""
 		Analyzes courtesy and tone of emails.
 		
@@ -887,29 +969,30 @@ class Agent:
 		"""
 		print("---ANALYZING COURTESY & TONE---")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
-		scores = []
-		for email in state["preprocessed_emails"]:
-			prompt = ChatPromptTemplate.from_template(
-				"""
-				Evaluate the courtesy and tone of this email on a scale of 0.0 to 1.0.
-				Consider: politeness, respect, empathy, professionalism.
-				
-				Subject: {subject}
-				Body: {body}
-				
-				Respond with JSON: {{"courtesy_score": 0.0-1.0, "reasoning": "brief explanation"}}
-				"""
-			)
+		prompt = ChatPromptTemplate.from_template(
+			"""
+			Evaluate the courtesy and tone of this email on a scale of 0.0 to 1.0.
+			Consider: politeness, respect, empathy, professionalism.
 			
-			chain = prompt | self.llm | StrOutputParser()
-			result = chain.invoke({
+			Subject: {subject}
+			Body: {body}
+			
+			Respond with JSON: {{"courtesy_score": 0.0-1.0, "reasoning": "brief explanation"}}
+			"""
+		)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
 				"subject": email.get('subject', ''),
 				"body": email.get('body', '')
-			})
-			
+			}
+			for email in emails
+		])
+		
+		scores = []
+		for email, result in zip(emails, results):
 			try:
 				analysis = json.loads(result)
 				scores.append({
@@ -924,10 +1007,9 @@ class Agent:
 					'reasoning': 'Analysis failed'
 				})
 		
-		state["communication_health_scores"]["courtesy"] = scores
-		return state
+		return {"communication_health_scores": {"courtesy": scores}}
 	
-	def analyze_audience_node(self, state: AgentState) -> AgentState:
+	async def analyze_audience_node(self, state: AgentState) -> dict:
 		"""
 		Analyzes audience-centricity of emails.
 		
@@ -952,31 +1034,32 @@ class Agent:
 		"""
 		print("---ANALYZING AUDIENCE-CENTRICITY---")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
-		scores = []
-		for email in state["preprocessed_emails"]:
-			prompt = ChatPromptTemplate.from_template(
-				"""
-				Evaluate how well this email is tailored to its audience on a scale of 0.0 to 1.0.
-				Consider: relevance to recipient, appropriate knowledge level, personalized content.
-				
-				Subject: {subject}
-				Body: {body}
-				From: {sender}
-				
-				Respond with JSON: {{"audience_score": 0.0-1.0, "reasoning": "brief explanation"}}
-				"""
-			)
+		prompt = ChatPromptTemplate.from_template(
+			"""
+			Evaluate how well this email is tailored to its audience on a scale of 0.0 to 1.0.
+			Consider: relevance to recipient, appropriate knowledge level, personalized content.
+			
+			Subject: {subject}
+			Body: {body}
+			From: {sender}
 			
-			chain = prompt | self.llm | StrOutputParser()
-			result = chain.invoke({
+			Respond with JSON: {{"audience_score": 0.0-1.0, "reasoning": "brief explanation"}}
+			"""
+		)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
 				"subject": email.get('subject', ''),
 				"body": email.get('body', ''),
 				"sender": email.get('from', '')
-			})
-			
+			}
+			for email in emails
+		])
+		
+		scores = []
+		for email, result in zip(emails, results):
 			try:
 				analysis = json.loads(result)
 				scores.append({
@@ -991,10 +1074,9 @@ class Agent:
 					'reasoning': 'Analysis failed'
 				})
 		
-		state["communication_health_scores"]["audience"] = scores
-		return state
+		return {"communication_health_scores": {"audience": scores}}
 	
-	def analyze_timeliness_node(self, state: AgentState) -> AgentState:
+	async def analyze_timeliness_node(self, state: AgentState) -> dict:
 		"""
 		Analyzes timeliness and responsiveness of emails.
 		
@@ -1022,33 +1104,34 @@ class Agent:
 		"""
 		print("---ANALYZING TIMELINESS & RESPONSIVENESS---")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
-		scores = []
-		for email in state["preprocessed_emails"]:
-			# For timeliness, we need to analyze response patterns
-			# This is simplified - would need thread analysis in production
-			prompt = ChatPromptTemplate.from_template(
-				"""
-				Evaluate the timeliness and responsiveness indicated by this email on a scale of 0.0 to 1.0.
-				Consider: appropriate timing, response delays, frequency of follow-ups.
-				
-				Subject: {subject}
-				Body: {body}
-				Date: {date}
-				
-				Respond with JSON: {{"timeliness_score": 0.0-1.0, "reasoning": "brief explanation"}}
-				"""
-			)
+		# For timeliness, we need to analyze response patterns
+		# This is simplified - would need thread analysis in production
+		prompt = ChatPromptTemplate.from_template(
+			"""
+			Evaluate the timeliness and responsiveness indicated by this email on a scale of 0.0 to 1.0.
+			Consider: appropriate timing, response delays, frequency of follow-ups.
 			
-			chain = prompt | self.llm | StrOutputParser()
-			result = chain.invoke({
+			Subject: {subject}
+			Body: {body}
+			Date: {date}
+			
+			Respond with JSON: {{"timeliness_score": 0.0-1.0, "reasoning": "brief explanation"}}
+			"""
+		)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		emails = state["preprocessed_emails"]
+		results = await self._invoke_per_email(chain, [
+			{
 				"subject": email.get('subject', ''),
 				"body": email.get('body', ''),
 				"date": email.get('date', '')
-			})
-			
+			}
+			for email in emails
+		])
+		
+		scores = []
+		for email, result in zip(emails, results):
 			try:
 				analysis = json.loads(result)
 				scores.append({
@@ -1063,13 +1146,12 @@ class Agent:
 					'reasoning': 'Analysis failed'
 				})
 		
-		state["communication_health_scores"]["timeliness"] = scores
-		return state
+		return {"communication_health_scores": {"timeliness": scores}}
 	
 	def aggregate_health_scores_node(self, state: AgentState) -> AgentState:
 		"""
 		Aggregation node: Consolidate all communication health results.
-		This node is idempotent - can be called multiple times safely.
+		Runs once, after the graph has joined all analysis nodes.
 		
 		Algorithm: Weighted Average Aggregation
 		- Input: Individual scores from 6 analysis dimensions
@@ -1090,29 +1172,15 @@ class Agent:
 		  * Poor (0.0-0.4): Low scores, significant improvements needed
 		- No weighting: All dimensions treated equally (can be customized)
 		"""
-		# Check if already aggregated (idempotent check)
-		if "aggregated_health" in state and state.get("aggregated_health"):
-			existing = state["aggregated_health"]
-			# Check if we have all 6 dimensions
-			health_scores = state.get("communication_health_scores", {})
-			expected_dims = {'clarity', 'completeness', 'correctness', 'courtesy', 'audience', 'timeliness'}
-			available_dims = set(health_scores.keys())
-			if expected_dims.issubset(available_dims) and existing.get('average_scores', {}).get('overall'):
-				# Already complete, return early
-				return state
-		
 		print("---AGGREGATING HEALTH SCORES---")
 		
 		health_scores = state.get("communication_health_scores", {})
 		
-		# Wait for all 6 dimensions to be available
-		expected_dims = {'clarity', 'completeness', 'correctness', 'courtesy', 'audience', 'timeliness'}
-		available_dims = set(health_scores.keys())
-		
-		if not expected_dims.issubset(available_dims):
-			# Not all dimensions analyzed yet, return state as-is (will be called again)
-			print(f"Waiting for all dimensions. Available: {available_dims}, Expected: {expected_dims}")
-			return state
+		# The graph joins all analysis nodes before this one, so a missing dimension means
+		# its node produced nothing; it falls back to a neutral 0.5 below
+		missing_dims = set(HEALTH_DIMENSIONS) - set(health_scores.keys())
+		if missing_dims:
+			print(f"No scores for dimensions: {sorted(missing_dims)}")
 		
 		# Aggregate scores per email
 		aggregated = {}
@@ -1490,14 +1558,17 @@ class Agent:
 		return draft
 
 
-def create_agent_workflow(mode: str = "retail"):
+def create_agent_workflow(mode: str = "retail", health_mode: Optional[str] = None):
 	"""
 	Creates and configures the LangGraph agent workflow.
 	
 	Args:
 		mode: "retail" for retail data analysis, "email" for email analysis
+		health_mode: Email mode only. "combined" scores all 6 health dimensions in one
+			LLM call per email; "per_dimension" runs one node (and call) per dimension.
+			Defaults to settings.communication_health_mode.
 	"""
-	agent = Agent()
+	agent = get_agent()
 
 	workflow = StateGraph(AgentState)
 	
@@ -1523,18 +1594,11 @@ def create_agent_workflow(mode: str = "retail"):
 	
 	elif mode == "email":
 		# Communication Health Analysis Workflow (as per diagram)
-		# Input -> Preprocessing -> 6 Parallel Analysis Nodes -> Aggregation -> Explanation -> Output
+		# Input -> Preprocessing -> Health Analysis -> Aggregation -> Explanation -> Output
+		health_mode = health_mode or agent.settings.communication_health_mode
 		workflow.add_node("fetch_emails", agent.fetch_emails_node)
 		workflow.add_node("preprocess_emails", agent.preprocess_emails_node)
 		
-		# Parallel analysis nodes (6 dimensions of communication health)
-		workflow.add_node("analyze_clarity", agent.analyze_clarity_node)
-		workflow.add_node("analyze_completeness", agent.analyze_completeness_node)
-		workflow.add_node("analyze_correctness", agent.analyze_correctness_node)
-		workflow.add_node("analyze_courtesy", agent.analyze_courtesy_node)
-		workflow.add_node("analyze_audience", agent.analyze_audience_node)
-		workflow.add_node("analyze_timeliness", agent.analyze_timeliness_node)
-		
 		# Aggregation and explanation
 		workflow.add_node("aggregate_health", agent.aggregate_health_scores_node)
 		workflow.add_node("explain_health", agent.explain_health_results_node)
@@ -1542,21 +1606,40 @@ def create_agent_workflow(mode: str = "retail"):
 		workflow.set_entry_point("fetch_emails")
 		workflow.add_edge("fetch_emails", "preprocess_emails")
 		
-		# Preprocessing feeds into all 6 parallel analysis nodes
-		workflow.add_edge("preprocess_emails", "analyze_clarity")
-		workflow.add_edge("preprocess_emails", "analyze_completeness")
-		workflow.add_edge("preprocess_emails", "analyze_correctness")
-		workflow.add_edge("preprocess_emails", "analyze_courtesy")
-		workflow.add_edge("preprocess_emails", "analyze_audience")
-		workflow.add_edge("preprocess_emails", "analyze_timeliness")
-		
-		# All parallel nodes feed into aggregation
-		workflow.add_edge("analyze_clarity", "aggregate_health")
-		workflow.add_edge("analyze_completeness", "aggregate_health")
-		workflow.add_edge("analyze_correctness", "aggregate_health")
-		workflow.add_edge("analyze_courtesy", "aggregate_health")
-		workflow.add_edge("analyze_audience", "aggregate_health")
-		workflow.add_edge("analyze_timeliness", "aggregate_health")
+		if health_mode == "per_dimension":
+			# Parallel analysis nodes (6 dimensions of communication health, one LLM call each)
+			workflow.add_node("analyze_clarity", agent.analyze_clarity_node)
+			workflow.add_node("analyze_completeness", agent.analyze_completeness_node)
+			workflow.add_node("analyze_correctness", agent.analyze_correctness_node)
+			workflow.add_node("analyze_courtesy", agent.analyze_courtesy_node)
+			workflow.add_node("analyze_audience", agent.analyze_audience_node)
+			workflow.add_node("analyze_timeliness", agent.analyze_timeliness_node)
+			
+			# Preprocessing feeds into all 6 parallel analysis nodes
+			workflow.add_edge("preprocess_emails", "analyze_clarity")
+			workflow.add_edge("preprocess_emails", "analyze_completeness")
+			workflow.add_edge("preprocess_emails", "analyze_correctness")
+			workflow.add_edge("preprocess_emails", "analyze_courtesy")
+			workflow.add_edge("preprocess_emails", "analyze_audience")
+			workflow.add_edge("preprocess_emails", "analyze_timeliness")
+			
+			# Join: aggregation runs once, after all 6 parallel nodes have finished
+			workflow.add_edge(
+				[
+					"analyze_clarity",
+					"analyze_completeness",
+					"analyze_correctness",
+					"analyze_courtesy",
+					"analyze_audience",
+					"analyze_timeliness",
+				],
+				"aggregate_health",
+			)
+		else:
+			# Combined mode: all 6 dimensions scored in one structured-output call per email
+			workflow.add_node("analyze_health", agent.analyze_health_combined_node)
+			workflow.add_edge("preprocess_emails", "analyze_health")
+			workflow.add_edge("analyze_health", "aggregate_health")
 		
 		# Aggregation -> Explanation -> End
 		workflow.add_edge("aggregate_health", "explain_health")
@@ -1565,14 +1648,37 @@ def create_agent_workflow(mode: str = "retail"):
 	return workflow
 
 
+@lru_cache(maxsize=1)
+def get_agent() -> Agent:
+	"""Process-wide Agent, so the NVIDIA client and its connections are reused across runs."""
+	return Agent()
+
+
+def get_compiled_workflow(mode: str = "retail", health_mode: Optional[str] = None):
+	"""
+	Compiled agent workflow, built once per process and mode.
+	
+	Compiled graphs keep no per-run state (no checkpointer), so a single instance can
+	serve concurrent invoke/ainvoke calls.
+	
+	Args:
+		mode: "retail" or "email"
+		health_mode: See create_agent_workflow
+	"""
+	# Positional call so keyword and positional callers share one cache entry
+	return _compile_workflow(mode, health_mode)
+
+
+@lru_cache(maxsize=None)
+def _compile_workflow(mode: str, health_mode: Optional[str]):
+	return create_agent_workflow(mode=mode, health_mode=health_mode).compile()
+
+
 # For LangGraph Studio, export the compiled workflows
 def get_workflow():
 	"""Export retail workflow for LangGraph Studio."""
-	workflow = create_agent_workflow(mode="retail")
-	return workflow.compile()
+	return get_compiled_workflow(mode="retail")
 
 def get_email_workflow():
 	"""Export email communication health workflow for LangGraph Studio."""
-	workflow = create_agent_workflow(mode="email")
-	return workflow.compile()
-
+	return get_compiled_workflow(mode="email")
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import TypedDict, List, Optional
+from typing import Annotated, TypedDict, List, Optional
 from langgraph.graph import StateGraph, END
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from langchain_core.prompts import ChatPromptTemplate
@@ -10,6 +10,17 @@ from langchain_core.output_parsers import StrOutputParser
 import uuid
 import logging
 import json
+from functools import lru_cache
+
+from agent_service.xg_agent.health_scoring import (
+	HEALTH_DIMENSIONS,
+	MEETING_HEALTH_PROMPT,
+	MEETING_HEALTH_SCHEMA,
+	meeting_scores_from_analysis,
+	merge_health_scores,
+	parse_json_response,
+	schema_text,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +58,7 @@ class ASRMeetingState(TypedDict):
 	
 	# Communication Health Analysis (for meeting transcripts)
 	preprocessed_transcript: Optional[str]  # Full transcript text
-	communication_health_scores: dict  # Per-speaker and overall scores
+	communication_health_scores: Annotated[dict, merge_health_scores]  # Per-speaker and overall scores (merged across parallel nodes)
 	aggregated_health: dict  # Consolidated results
 	health_explanation: Optional[str]  # Natural language explanation
 	
@@ -248,7 +259,41 @@ class ASRWorkflow:
 		
 		return state
 	
-	def analyze_meeting_clarity_node(self, state: ASRMeetingState) -> ASRMeetingState:
+	async def analyze_meeting_health_combined_node(self, state: ASRMeetingState) -> dict:
+		"""
+		Nodes 9-14 (combined): Analyze all 6 meeting health dimensions in one LLM call
+		
+		Algorithm: LLM-based structured-output analysis (DeepSeek v3.1 via NVIDIA API)
+		- Model: deepseek-ai/deepseek-v3.1-terminus
+		- Input: Full meeting transcript with speaker labels
+		- Processing: Single zero-shot prompt covering every dimension, answered as
+		  JSON matching MEETING_HEALTH_SCHEMA
+		- Output: Same per-dimension dicts as the analyze_meeting_<dimension> nodes
+		  (overall + reasoning, plus per_speaker for clarity and courtesy)
+		
+		Rating Principle: Same factors and thresholds as the per-dimension nodes.
+		The transcript is sent once instead of six times; the per-dimension nodes remain
+		available as a higher-fidelity mode (communication_health_mode="per_dimension").
+		"""
+		logger.info("Nodes 9-14/16: Analyzing meeting communication health (all dimensions)")
+		
+		transcript = state.get("preprocessed_transcript", "")
+		if not transcript:
+			return {"communication_health_scores": meeting_scores_from_analysis(None)}
+		
+		prompt = ChatPromptTemplate.from_template(MEETING_HEALTH_PROMPT)
+		chain = prompt | self.llm | StrOutputParser()
+		
+		try:
+			result = await chain.ainvoke({"transcript": transcript, "schema": schema_text(MEETING_HEALTH_SCHEMA)})
+			analysis = parse_json_response(result)
+		except Exception as e:
+			logger.warning(f"Combined meeting health analysis failed: {e}")
+			analysis = None
+		
+		return {"communication_health_scores": meeting_scores_from_analysis(analysis)}
+	
+	async def analyze_meeting_clarity_node(self, state: ASRMeetingState) -> dict:
 		"""
 		Node 9: Analyze Meeting Clarity & Conciseness
 		
@@ -273,13 +318,9 @@ class ASRWorkflow:
 		"""
 		logger.info("Node 9/13: Analyzing meeting clarity & conciseness")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
 		transcript = state.get("preprocessed_transcript", "")
 		if not transcript:
-			state["communication_health_scores"]["clarity"] = []
-			return state
+			return {"communication_health_scores": {"clarity": []}}
 		
 		prompt = ChatPromptTemplate.from_template(
 			"""
@@ -301,25 +342,25 @@ class ASRWorkflow:
 		)
 		
 		chain = prompt | self.llm | StrOutputParser()
-		result = chain.invoke({"transcript": transcript})
+		result = await chain.ainvoke({"transcript": transcript})
 		
 		try:
 			analysis = json.loads(result)
-			state["communication_health_scores"]["clarity"] = {
+			scores = {
 				"overall": float(analysis.get("overall_clarity_score", 0.5)),
 				"per_speaker": analysis.get("per_speaker_scores", {}),
 				"reasoning": analysis.get("reasoning", "")
 			}
 		except:
-			state["communication_health_scores"]["clarity"] = {
+			scores = {
 				"overall": 0.5,
 				"per_speaker": {},
 				"reasoning": "Analysis failed"
 			}
 		
-		return state
+		return {"communication_health_scores": {"clarity": scores}}
 	
-	def analyze_meeting_completeness_node(self, state: ASRMeetingState) -> ASRMeetingState:
+	async def analyze_meeting_completeness_node(self, state: ASRMeetingState) -> dict:
 		"""
 		Node 10: Analyze Meeting Completeness
 		
@@ -344,13 +385,9 @@ class ASRWorkflow:
 		"""
 		logger.info("Node 10/13: Analyzing meeting completeness")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
 		transcript = state.get("preprocessed_transcript", "")
 		if not transcript:
-			state["communication_health_scores"]["completeness"] = {}
-			return state
+			return {"communication_health_scores": {"completeness": {}}}
 		
 		prompt = ChatPromptTemplate.from_template(
 			"""
@@ -365,23 +402,23 @@ class ASRWorkflow:
 		)
 		
 		chain = prompt | self.llm | StrOutputParser()
-		result = chain.invoke({"transcript": transcript})
+		result = await chain.ainvoke({"transcript": transcript})
 		
 		try:
 			analysis = json.loads(result)
-			state["communication_health_scores"]["completeness"] = {
+			scores = {
 				"overall": float(analysis.get("completeness_score", 0.5)),
 				"reasoning": analysis.get("reasoning", "")
 			}
 		except:
-			state["communication_health_scores"]["completeness"] = {
+			scores = {
 				"overall": 0.5,
 				"reasoning": "Analysis failed"
 			}
 		
-		return state
+		return {"communication_health_scores": {"completeness": scores}}
 	
-	def analyze_meeting_correctness_node(self, state: ASRMeetingState) -> ASRMeetingState:
+	async def analyze_meeting_correctness_node(self, state: ASRMeetingState) -> dict:
 		"""
 		Node 11: Analyze Meeting Correctness & Coherence
 		
@@ -406,13 +443,9 @@ class ASRWorkflow:
 		"""
 		logger.info("Node 11/13: Analyzing meeting correctness & coherence")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
 		transcript = state.get("preprocessed_transcript", "")
 		if not transcript:
-			state["communication_health_scores"]["correctness"] = {}
-			return state
+			return {"communication_health_scores": {"correctness": {}}}
 		
 		prompt = ChatPromptTemplate.from_template(
 			"""
@@ -427,23 +460,23 @@ class ASRWorkflow:
 		)
 		
 		chain = prompt | self.llm | StrOutputParser()
-		result = chain.invoke({"transcript": transcript})
+		result = await chain.ainvoke({"transcript": transcript})
 		
 		try:
 			analysis = json.loads(result)
-			state["communication_health_scores"]["correctness"] = {
+			scores = {
 				"overall": float(analysis.get("correctness_score", 0.5)),
 				"reasoning": analysis.get("reasoning", "")
 			}
 		except:
-			state["communication_health_scores"]["correctness"] = {
+			scores = {
 				"overall": 0.5,
 				"reasoning": "Analysis failed"
 			}
 		
-		return state
+		return {"communication_health_scores": {"correctness": scores}}
 	
-	def analyze_meeting_courtesy_node(self, state: ASRMeetingState) -> ASRMeetingState:
+	async def analyze_meeting_courtesy_node(self, state: ASRMeetingState) -> dict:
 		"""
 		Node 12: Analyze Meeting Courtesy & Tone
 		
@@ -468,13 +501,9 @@ class ASRWorkflow:
 		"""
 		logger.info("Node 12/13: Analyzing meeting courtesy & tone")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
 		transcript = state.get("preprocessed_transcript", "")
 		if not transcript:
-			state["communication_health_scores"]["courtesy"] = {}
-			return state
+			return {"communication_health_scores": {"courtesy": {}}}
 		
 		prompt = ChatPromptTemplate.from_template(
 			"""
@@ -496,25 +525,25 @@ class ASRWorkflow:
 		)
 		
 		chain = prompt | self.llm | StrOutputParser()
-		result = chain.invoke({"transcript": transcript})
+		result = await chain.ainvoke({"transcript": transcript})
 		
 		try:
 			analysis = json.loads(result)
-			state["communication_health_scores"]["courtesy"] = {
+			scores = {
 				"overall": float(analysis.get("overall_courtesy_score", 0.5)),
 				"per_speaker": analysis.get("per_speaker_scores", {}),
 				"reasoning": analysis.get("reasoning", "")
 			}
 		except:
-			state["communication_health_scores"]["courtesy"] = {
+			scores = {
 				"overall": 0.5,
 				"per_speaker": {},
 				"reasoning": "Analysis failed"
 			}
 		
-		return state
+		return {"communication_health_scores": {"courtesy": scores}}
 	
-	def analyze_meeting_audience_node(self, state: ASRMeetingState) -> ASRMeetingState:
+	async def analyze_meeting_audience_node(self, state: ASRMeetingState) -> dict:
 		"""
 		Node 13: Analyze Meeting Audience-Centricity
 		
@@ -539,13 +568,9 @@ class ASRWorkflow:
 		"""
 		logger.info("Node 13/13: Analyzing meeting audience-centricity")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
 		transcript = state.get("preprocessed_transcript", "")
 		if not transcript:
-			state["communication_health_scores"]["audience"] = {}
-			return state
+			return {"communication_health_scores": {"audience": {}}}
 		
 		prompt = ChatPromptTemplate.from_template(
 			"""
@@ -560,23 +585,23 @@ class ASRWorkflow:
 		)
 		
 		chain = prompt | self.llm | StrOutputParser()
-		result = chain.invoke({"transcript": transcript})
+		result = await chain.ainvoke({"transcript": transcript})
 		
 		try:
 			analysis = json.loads(result)
-			state["communication_health_scores"]["audience"] = {
+			scores = {
 				"overall": float(analysis.get("audience_score", 0.5)),
 				"reasoning": analysis.get("reasoning", "")
 			}
 		except:
-			state["communication_health_scores"]["audience"] = {
+			scores = {
 				"overall": 0.5,
 				"reasoning": "Analysis failed"
 			}
 		
-		return state
+		return {"communication_health_scores": {"audience": scores}}
 	
-	def analyze_meeting_timeliness_node(self, state: ASRMeetingState) -> ASRMeetingState:
+	async def analyze_meeting_timeliness_node(self, state: ASRMeetingState) -> dict:
 		"""
 		Node 14: Analyze Meeting Timeliness & Efficiency
 		
@@ -604,13 +629,9 @@ class ASRWorkflow:
 		"""
 		logger.info("Node 14/13: Analyzing meeting timeliness & efficiency")
 		
-		if "communication_health_scores" not in state:
-			state["communication_health_scores"] = {}
-		
 		transcript = state.get("preprocessed_transcript", "")
 		if not transcript:
-			state["communication_health_scores"]["timeliness"] = {}
-			return state
+			return {"communication_health_scores": {"timeliness": {}}}
 		
 		prompt = ChatPromptTemplate.from_template(
 			"""
@@ -625,21 +646,21 @@ class ASRWorkflow:
 		)
 		
 		chain = prompt | self.llm | StrOutputParser()
-		result = chain.invoke({"transcript": transcript})
+		result = await chain.ainvoke({"transcript": transcript})
 		
 		try:
 			analysis = json.loads(result)
-			state["communication_health_scores"]["timeliness"] = {
+			scores = {
 				"overall": float(analysis.get("timeliness_score", 0.5)),
 				"reasoning": analysis.get("reasoning", "")
 			}
 		except:
-			state["communication_health_scores"]["timeliness"] = {
+			scores = {
 				"overall": 0.5,
 				"reasoning": "Analysis failed"
 			}
 		
-		return state
+		return {"communication_health_scores": {"timeliness": scores}}
 	
 	def aggregate_meeting_health_node(self, state: ASRMeetingState) -> ASRMeetingState:
 		"""
@@ -663,28 +684,15 @@ class ASRWorkflow:
 		  * Fair (0.4-0.6): Mixed performance, several areas need improvement
 		  * Poor (0.0-0.4): Low scores, significant improvements needed
 		"""
-		# Check if already aggregated (idempotent check)
-		if "aggregated_health" in state and state.get("aggregated_health"):
-			existing = state["aggregated_health"]
-			health_scores = state.get("communication_health_scores", {})
-			expected_dims = {'clarity', 'completeness', 'correctness', 'courtesy', 'audience', 'timeliness'}
-			available_dims = set(health_scores.keys())
-			if expected_dims.issubset(available_dims) and existing.get('overall'):
-				# Already complete, return early
-				return state
-		
 		logger.info("Node 15/16: Aggregating meeting communication health scores")
 		
 		health_scores = state.get("communication_health_scores", {})
 		
-		# Wait for all 6 dimensions to be available
-		expected_dims = {'clarity', 'completeness', 'correctness', 'courtesy', 'audience', 'timeliness'}
-		available_dims = set(health_scores.keys())
-		
-		if not expected_dims.issubset(available_dims):
-			# Not all dimensions analyzed yet, return state as-is (will be called again)
-			logger.info(f"Waiting for all dimensions. Available: {available_dims}, Expected: {expected_dims}")
-			return state
+		# The graph joins all analysis nodes before this one, so a missing dimension means
+		# its node produced nothing; it falls back to a neutral 0.5 below
+		missing_dims = set(HEALTH_DIMENSIONS) - set(health_scores.keys())
+		if missing_dims:
+			logger.warning(f"No scores for dimensions: {sorted(missing_dims)}")
 		
 		# Aggregate overall scores
 		dimension_scores = {}
@@ -788,7 +796,7 @@ class ASRWorkflow:
 		return state
 
 
-def create_asr_workflow():
+def create_asr_workflow(health_mode: Optional[str] = None):
 	"""
 	Creates the ASR meeting processing workflow with communication health analysis.
 	
@@ -801,12 +809,17 @@ def create_asr_workflow():
 	6. extract_names -> Hebrew name extraction
 	7. summarize -> LLM summarization
 	8. preprocess_transcript -> Prepare for communication health analysis
-	9-14. Parallel communication health analysis (6 dimensions)
+	9-14. Communication health analysis (6 dimensions): one combined structured-output
+	   call, or 6 parallel per-dimension nodes when health_mode="per_dimension"
 	15. aggregate_meeting_health -> Consolidate scores
 	16. explain_meeting_health -> Generate explanation
+	
+	Args:
+		health_mode: "combined" or "per_dimension" (defaults to settings.communication_health_mode)
 	"""
 	workflow = StateGraph(ASRMeetingState)
-	asr = ASRWorkflow()
+	asr = get_asr_workflow_instance()
+	health_mode = health_mode or asr.settings.communication_health_mode
 	
 	# Add ASR processing nodes
 	workflow.add_node("transcribe_audio", asr.transcribe_audio_node)
@@ -819,12 +832,6 @@ def create_asr_workflow():
 	
 	# Add communication health analysis nodes
 	workflow.add_node("preprocess_transcript", asr.preprocess_transcript_node)
-	workflow.add_node("analyze_meeting_clarity", asr.analyze_meeting_clarity_node)
-	workflow.add_node("analyze_meeting_completeness", asr.analyze_meeting_completeness_node)
-	workflow.add_node("analyze_meeting_correctness", asr.analyze_meeting_correctness_node)
-	workflow.add_node("analyze_meeting_courtesy", asr.analyze_meeting_courtesy_node)
-	workflow.add_node("analyze_meeting_audience", asr.analyze_meeting_audience_node)
-	workflow.add_node("analyze_meeting_timeliness", asr.analyze_meeting_timeliness_node)
 	workflow.add_node("aggregate_meeting_health", asr.aggregate_meeting_health_node)
 	workflow.add_node("explain_meeting_health", asr.explain_meeting_health_node)
 	
@@ -840,21 +847,39 @@ def create_asr_workflow():
 	# Communication health analysis branch
 	workflow.add_edge("summarize", "preprocess_transcript")
 	
-	# Preprocessing feeds into all 6 parallel analysis nodes
-	workflow.add_edge("preprocess_transcript", "analyze_meeting_clarity")
-	workflow.add_edge("preprocess_transcript", "analyze_meeting_completeness")
-	workflow.add_edge("preprocess_transcript", "analyze_meeting_correctness")
-	workflow.add_edge("preprocess_transcript", "analyze_meeting_courtesy")
-	workflow.add_edge("preprocess_transcript", "analyze_meeting_audience")
-	workflow.add_edge("preprocess_transcript", "analyze_meeting_timeliness")
-	
-	# All parallel nodes feed into aggregation
-	workflow.add_edge("analyze_meeting_clarity", "aggregate_meeting_health")
-	workflow.add_edge("analyze_meeting_completeness", "aggregate_meeting_health")
-	workflow.add_edge("analyze_meeting_correctness", "aggregate_meeting_health")
-	workflow.add_edge("analyze_meeting_courtesy", "aggregate_meeting_health")
-	workflow.add_edge("analyze_meeting_audience", "aggregate_meeting_health")
-	workflow.add_edge("analyze_meeting_timeliness", "aggregate_meeting_health")
+	if health_mode == "per_dimension":
+		workflow.add_node("analyze_meeting_clarity", asr.analyze_meeting_clarity_node)
+		workflow.add_node("analyze_meeting_completeness", asr.analyze_meeting_completeness_node)
+		workflow.add_node("analyze_meeting_correctness", asr.analyze_meeting_correctness_node)
+		workflow.add_node("analyze_meeting_courtesy", asr.analyze_meeting_courtesy_node)
+		workflow.add_node("analyze_meeting_audience", asr.analyze_meeting_audience_node)
+		workflow.add_node("analyze_meeting_timeliness", asr.analyze_meeting_timeliness_node)
+		
+		# Preprocessing feeds into all 6 parallel analysis nodes
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_clarity")
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_completeness")
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_correctness")
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_courtesy")
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_audience")
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_timeliness")
+		
+		# Join: aggregation runs once, after all 6 parallel nodes have finished
+		workflow.add_edge(
+			[
+				"analyze_meeting_clarity",
+				"analyze_meeting_completeness",
+				"analyze_meeting_correctness",
+				"analyze_meeting_courtesy",
+				"analyze_meeting_audience",
+				"analyze_meeting_timeliness",
+			],
+			"aggregate_meeting_health",
+		)
+	else:
+		# Combined mode: all 6 dimensions scored in one structured-output call
+		workflow.add_node("analyze_meeting_health", asr.analyze_meeting_health_combined_node)
+		workflow.add_edge("preprocess_transcript", "analyze_meeting_health")
+		workflow.add_edge("analyze_meeting_health", "aggregate_meeting_health")
 	
 	# Aggregation -> Explanation -> End
 	workflow.add_edge("aggregate_meeting_health", "explain_meeting_health")
@@ -863,7 +888,19 @@ def create_asr_workflow():
 	return workflow
 
 
+@lru_cache(maxsize=1)
+def get_asr_workflow_instance() -> ASRWorkflow:
+	"""Process-wide ASRWorkflow, so the NVIDIA client and its connections are reused across runs."""
+	return ASRWorkflow()
+
+
+@lru_cache(maxsize=1)
 def get_asr_workflow():
-	"""Export ASR workflow for LangGraph Studio."""
+	"""
+	Export ASR workflow for LangGraph Studio.
+	
+	Compiled once per process; the graph keeps no per-run state, so the API shares it
+	across concurrent requests.
+	"""
 	return create_asr_workflow().compile()
 
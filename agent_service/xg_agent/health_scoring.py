@@ -0,0 +1,161 @@
+"""Combined communication-health scoring: all six dimensions in a single LLM call."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+HEALTH_DIMENSIONS = ("clarity", "completeness", "correctness", "courtesy", "audience", "timeliness")
+
+# Dimensions that also get per-speaker scores in meeting analysis
+PER_SPEAKER_DIMENSIONS = ("clarity", "courtesy")
+
+_SCORE = {"type": "number", "minimum": 0.0, "maximum": 1.0}
+_REASONING = {"type": "string", "description": "brief explanation"}
+
+
+def _dimension_schema(per_speaker: bool = False) -> dict[str, Any]:
+	properties: dict[str, Any] = {"score": _SCORE, "reasoning": _REASONING}
+	required = ["score", "reasoning"]
+	if per_speaker:
+		properties["per_speaker_scores"] = {"type": "object", "additionalProperties": _SCORE}
+		required.append("per_speaker_scores")
+	return {"type": "object", "properties": properties, "required": required}
+
+
+EMAIL_HEALTH_SCHEMA: dict[str, Any] = {
+	"type": "object",
+	"properties": {dim: _dimension_schema() for dim in HEALTH_DIMENSIONS},
+	"required": list(HEALTH_DIMENSIONS),
+}
+
+MEETING_HEALTH_SCHEMA: dict[str, Any] = {
+	"type": "object",
+	"properties": {dim: _dimension_schema(dim in PER_SPEAKER_DIMENSIONS) for dim in HEALTH_DIMENSIONS},
+	"required": list(HEALTH_DIMENSIONS),
+}
+
+# ChatPromptTemplate templates; the schema is passed as the {schema} variable since it contains braces
+EMAIL_HEALTH_PROMPT = """
+Evaluate the communication health of this email on six dimensions, each on a scale of 0.0 to 1.0:
+- clarity: readability, directness, absence of jargon, brevity
+- completeness: sufficient information, actionable details, clear next steps, answers potential questions
+- correctness: factual accuracy, grammar/spelling, logical flow, consistent tone
+- courtesy: politeness, respect, empathy, professionalism
+- audience: relevance to recipient, appropriate knowledge level, personalized content
+- timeliness: appropriate timing, response delays, frequency of follow-ups
+
+Subject: {subject}
+Body: {body}
+From: {sender}
+Date: {date}
+
+Respond with JSON only, matching this JSON schema:
+{schema}
+"""
+
+MEETING_HEALTH_PROMPT = """
+Evaluate the communication health of this meeting transcript on six dimensions, each on a scale of 0.0 to 1.0:
+- clarity: articulation quality, logical structure, directness, appropriate use of technical terms
+- completeness: all topics addressed, sufficient information for decisions, clear action items, questions answered
+- correctness: factual accuracy, logical flow, consistency, proper language use
+- courtesy: respect for participants, professionalism, empathy, balanced participation
+- audience: all participants engaged, content relevant to everyone, balanced participation, acknowledgment of perspectives
+- timeliness: appropriate pacing, time management, efficiency, focus on agenda
+
+For clarity and courtesy, also score each speaker by their label (e.g. "SPK_1") in per_speaker_scores.
+
+Meeting Transcript:
+{transcript}
+
+Respond with JSON only, matching this JSON schema:
+{schema}
+"""
+
+
+def merge_health_scores(left: dict[str, Any] | None, right: dict[str, Any] | None) -> dict[str, Any]:
+	"""
+	State reducer for communication_health_scores.
+
+	Parallel analysis nodes each return only their own dimension(s); merging the
+	updates lets them run in the same graph step without overwriting each other.
+	"""
+	return {**(left or {}), **(right or {})}
+
+
+def schema_text(schema: dict[str, Any]) -> str:
+	"""Compact JSON rendering of a schema for inclusion in a prompt."""
+	return json.dumps(schema, separators=(",", ":"))
+
+
+def parse_json_response(text: str) -> dict[str, Any]:
+	"""
+	Parse a JSON object from an LLM response.
+
+	Tolerates Markdown code fences and prose around the object.
+
+	Raises:
+		ValueError: If no JSON object can be parsed
+	"""
+	start = text.find("{")
+	end = text.rfind("}")
+	if start == -1 or end < start:
+		raise ValueError("No JSON object in response")
+	data = json.loads(text[start:end + 1])
+	if not isinstance(data, dict):
+		raise ValueError("Response JSON is not an object")
+	return data
+
+
+def _score(value: Any) -> float:
+	try:
+		return min(1.0, max(0.0, float(value)))
+	except (TypeError, ValueError):
+		return 0.5
+
+
+def email_scores_from_analysis(email_id: Any, analysis: dict[str, Any] | None) -> dict[str, dict[str, Any]]:
+	"""
+	Split a combined email analysis into per-dimension score entries.
+
+	Entries have the same shape the per-dimension nodes produce
+	({'email_id', '<dim>_score', 'reasoning'}), so aggregation is unchanged.
+	A missing analysis or dimension falls back to 0.5 / 'Analysis failed'.
+	"""
+	entries = {}
+	for dim in HEALTH_DIMENSIONS:
+		data = (analysis or {}).get(dim)
+		if isinstance(data, dict):
+			entries[dim] = {
+				'email_id': email_id,
+				f'{dim}_score': _score(data.get('score', 0.5)),
+				'reasoning': data.get('reasoning', ''),
+			}
+		else:
+			entries[dim] = {'email_id': email_id, f'{dim}_score': 0.5, 'reasoning': 'Analysis failed'}
+	return entries
+
+
+def meeting_scores_from_analysis(analysis: dict[str, Any] | None) -> dict[str, dict[str, Any]]:
+	"""
+	Split a combined meeting analysis into per-dimension score dicts.
+
+	Dicts have the same shape the per-dimension meeting nodes produce
+	({'overall', 'reasoning'} plus 'per_speaker' for clarity and courtesy).
+	"""
+	scores = {}
+	for dim in HEALTH_DIMENSIONS:
+		data = (analysis or {}).get(dim)
+		if isinstance(data, dict):
+			entry = {"overall": _score(data.get("score", 0.5)), "reasoning": data.get("reasoning", "")}
+			per_speaker = data.get("per_speaker_scores")
+			if dim in PER_SPEAKER_DIMENSIONS:
+				entry["per_speaker"] = (
+					{str(k): _score(v) for k, v in per_speaker.items()} if isinstance(per_speaker, dict) else {}
+				)
+		else:
+			entry = {"overall": 0.5, "reasoning": "Analysis failed"}
+			if dim in PER_SPEAKER_DIMENSIONS:
+				entry["per_speaker"] = {}
+		scores[dim] = entry
+	return scores
@@ -22,6 +22,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 # Import all necessary components
+from agent_service.clients import close_http_client
 from agent_service.config import get_settings
 from agent_service.database import get_db
 from agent_service.database.models import Meeting, Organization, Speaker, User, UserGmailCredentials, TranscriptionSegment, MeetingSummary
@@ -138,6 +139,11 @@ async def general_exception_handler(request: Request, exc: Exception):
         response.headers["Access-Control-Allow-Headers"] = "*"
     return response
 
+@app.on_event("shutdown")
+async def close_shared_http_client() -> None:
+    """Close the pooled HTTP client shared by Ivrit/RunPod calls."""
+    await close_http_client()
+
 # ==================== Health Check ====================
 
 @app.get("/healthz")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Diarization Benchmark - compare the lightweight diarization backend against PyAnnote
+
+Reports wall-clock latency, real-time factor and diarization error rate (DER) for
+each audio fixture. PyAnnote output is used as the reference unless an RTTM
+reference file is given.
+
+Usage:
+    python scripts/benchmark_diarization.py
+    python scripts/benchmark_diarization.py voice_sample.wav other.wav --output results.json
+    python scripts/benchmark_diarization.py voice_sample.wav --reference voice_sample.rttm
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_FIXTURES = [os.path.join(REPO_ROOT, "voice_sample.wav")]
+
+
+def load_rttm(path: str) -> List[Dict[str, Any]]:
+    """Load reference segments from an RTTM file"""
+    segments = []
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 8 or parts[0] != "SPEAKER":
+                continue
+            start = float(parts[3])
+            segments.append({"start": start, "end": start + float(parts[4]), "speaker": parts[7]})
+    return segments
+
+
+def _segments_to_matrix(
+    segments: List[Dict[str, Any]], n_frames: int, resolution: float
+) -> np.ndarray:
+    """Build a (n_speakers, n_frames) boolean activity matrix"""
+    speakers = sorted({seg["speaker"] for seg in segments})
+    matrix = np.zeros((len(speakers), n_frames), dtype=bool)
+    index = {speaker: i for i, speaker in enumerate(speakers)}
+    for seg in segments:
+        start = int(round(float(seg["start"]) / resolution))
+        end = int(round(float(seg["end"]) / resolution))
+        matrix[index[seg["speaker"]], max(0, start):min(n_frames, end)] = True
+    return matrix
+
+
+def diarization_error_rate(
+    reference: List[Dict[str, Any]],
+    hypothesis: List[Dict[str, Any]],
+    resolution: float = 0.01,
+) -> Dict[str, float]:
+    """
+    Frame-based DER with an optimal one-to-one speaker mapping (no collar)
+
+    Returns:
+        Dict with 'der', 'missed', 'false_alarm' and 'confusion' as fractions of reference speech
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    if not reference:
+        return {"der": 0.0 if not hypothesis else 1.0, "missed": 0.0, "false_alarm": 0.0, "confusion": 0.0}
+
+    duration = max(float(seg["end"]) for seg in reference + hypothesis)
+    n_frames = int(np.ceil(duration / resolution)) + 1
+    ref = _segments_to_matrix(reference, n_frames, resolution)
+    hyp = _segments_to_matrix(hypothesis, n_frames, resolution)
+
+    n_ref = ref.sum(axis=0)
+    n_hyp = hyp.sum(axis=0) if len(hyp) else np.zeros(n_frames, dtype=int)
+    total_ref = float(n_ref.sum())
+
+    correct = 0.0
+    if len(hyp):
+        cooccurrence = ref.astype(np.int64) @ hyp.T.astype(np.int64)
+        rows, cols = linear_sum_assignment(-cooccurrence)
+        correct = float(cooccurrence[rows, cols].sum())
+
+    missed = float(np.maximum(n_ref - n_hyp, 0).sum())
+    false_alarm = float(np.maximum(n_hyp - n_ref, 0).sum())
+    confusion = float(np.minimum(n_ref, n_hyp).sum()) - correct
+
+    return {
+        "der": (missed + false_alarm + confusion) / total_ref,
+        "missed": missed / total_ref,
+        "false_alarm": false_alarm / total_ref,
+        "confusion": confusion / total_ref,
+    }
+
+
+def _run_backend(backend: Any, audio_path: str, num_speakers: Optional[int] = None) -> Dict[str, Any]:
+    """Run one backend and time it"""
+    start = time.perf_counter()
+    segments = backend.diarize(audio_path=audio_path, num_speakers=num_speakers)
+    elapsed = time.perf_counter() - start
+    return {
+        "segments": segments,
+        "latency_seconds": elapsed,
+        "speakers": len({seg["speaker"] for seg in segments}),
+    }
+
+
+def _build_pyannote() -> Optional[Any]:
+    """Create the PyAnnote backend if available"""
+    try:
+        from agent_service.config import get_settings
+        from agent_service.services.diarization_service import DiarizationService
+
+        settings = get_settings()
+        return DiarizationService(
+            model_name=settings.pyannote_model,
+            use_auth_token=settings.pyannote_auth_token,
+        )
+    except Exception as e:
+        print(f"⚠ PyAnnote backend unavailable: {e}", file=sys.stderr)
+        return None
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark lightweight diarization against PyAnnote"
+    )
+    parser.add_argument(
+        "fixtures", nargs="*", default=DEFAULT_FIXTURES, help="Audio files to benchmark"
+    )
+    parser.add_argument(
+        "--reference", help="RTTM reference (single fixture only); defaults to PyAnnote output"
+    )
+    parser.add_argument("--num-speakers", type=int, help="Known number of speakers")
+    parser.add_argument(
+        "--warmup", action="store_true", help="Run each backend once before timing (excludes model load)"
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.reference and len(args.fixtures) != 1:
+        print("✗ --reference requires exactly one fixture", file=sys.stderr)
+        sys.exit(1)
+
+    from agent_service.services.audio_processor import AudioProcessor
+    from agent_service.services.lightweight_diarization import LightweightDiarizationService
+
+    lightweight = LightweightDiarizationService()
+    pyannote = _build_pyannote()
+    audio_processor = AudioProcessor()
+    results = []
+
+    for fixture in args.fixtures:
+        if not os.path.exists(fixture):
+            print(f"✗ Fixture not found: {fixture}", file=sys.stderr)
+            sys.exit(1)
+
+        duration = audio_processor.get_audio_info(fixture)["duration_seconds"]
+        print(f"\n{os.path.basename(fixture)} ({duration:.1f}s)")
+
+        backends = {"lightweight": lightweight}
+        if pyannote is not None:
+            backends["pyannote"] = pyannote
+
+        runs: Dict[str, Dict[str, Any]] = {}
+        for name, backend in backends.items():
+            if args.warmup:
+                backend.diarize(audio_path=fixture)
+            runs[name] = _run_backend(backend, fixture, num_speakers=args.num_speakers)
+
+        reference = load_rttm(args.reference) if args.reference else runs.get("pyannote", {}).get("segments")
+
+        fixture_result: Dict[str, Any] = {"fixture": fixture, "duration_seconds": duration, "backends": {}}
+        for name, run in runs.items():
+            entry = {
+                "latency_seconds": run["latency_seconds"],
+                "real_time_factor": run["latency_seconds"] / duration if duration else None,
+                "speakers": run["speakers"],
+                "segments": len(run["segments"]),
+            }
+            if reference is not None:
+                entry.update(diarization_error_rate(reference, run["segments"]))
+            fixture_result["backends"][name] = entry
+
+            der_text = f"DER {entry['der'] * 100:5.1f}%" if "der" in entry else "DER   n/a"
+            print(
+                f"  {name:<12} {entry['latency_seconds']:7.2f}s  RTF {entry['real_time_factor']:.3f}  "
+                f"{entry['speakers']} speakers  {der_text}"
+            )
+
+        results.append(fixture_result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
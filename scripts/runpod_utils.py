@@ -6,139 +6,36 @@ Usage:
     python runpod_utils.py --help
     python runpod_utils.py test-endpoint --endpoint-id ep-xxxxx --api-key your_key
     python runpod_utils.py get-status --endpoint-id ep-xxxxx --job-id job_xxxxx --api-key your_key
+    python runpod_utils.py cancel-job --endpoint-id ep-xxxxx --job-id job_xxxxx --api-key your_key
     python runpod_utils.py submit-job --endpoint-id ep-xxxxx --api-key your_key --meeting-id uuid --organization-id uuid --audio-s3-key s3://bucket/key
 """
 
 import argparse
+import asyncio
 import json
 import os
 import sys
-import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
-import requests
+import httpx
 
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
 
-class RunPodClient:
-    """Client for interacting with RunPod Serverless API"""
+from agent_service.clients.runpod_jobs import RunPodJobClient
 
-    BASE_URL = "https://api.runpod.io/v2"
-    TIMEOUT = 30
 
-    def __init__(self, endpoint_id: str, api_key: str):
-        """
-        Initialize RunPod client
+def _print_status(job_id: str, status: Dict[str, Any]) -> None:
+    """Progress callback for RunPodJobClient.wait"""
+    print(f"Job {job_id}: {status.get('status', 'UNKNOWN')}")
 
-        Args:
-            endpoint_id: RunPod endpoint ID (e.g., ep-xxxxx)
-            api_key: RunPod API key
-        """
-        self.endpoint_id = endpoint_id
-        self.api_key = api_key
-        self.headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-
-    def submit_job(self, input_data: Dict[str, Any]) -> str:
-        """
-        Submit a job to the RunPod endpoint
-
-        Args:
-            input_data: Input data for the job
-
-        Returns:
-            Job ID
-
-        Raises:
-            RuntimeError: If submission fails
-        """
-        url = f"{self.BASE_URL}/{self.endpoint_id}/run"
-        payload = {"input": input_data}
-
-        try:
-            response = requests.post(
-                url, json=payload, headers=self.headers, timeout=self.TIMEOUT
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            if "id" not in result:
-                raise RuntimeError(f"No job ID in response: {result}")
-
-            return result["id"]
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to submit job: {e}")
-
-    def get_job_status(self, job_id: str) -> Dict[str, Any]:
-        """
-        Get the status of a submitted job
-
-        Args:
-            job_id: RunPod job ID
-
-        Returns:
-            Job status information
-
-        Raises:
-            RuntimeError: If request fails
-        """
-        url = f"{self.BASE_URL}/{self.endpoint_id}/status/{job_id}"
-
-        try:
-            response = requests.get(url, headers=self.headers, timeout=self.TIMEOUT)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to get job status: {e}")
-
-    def wait_for_job(
-        self, job_id: str, timeout: int = 300, poll_interval: int = 5
-    ) -> Dict[str, Any]:
-        """
-        Wait for a job to complete
 
-        Args:
-            job_id: RunPod job ID
-            timeout: Maximum wait time in seconds
-            poll_interval: Interval between status checks in seconds
-
-        Returns:
-            Final job status
-
-        Raises:
-            TimeoutError: If job doesn't complete within timeout
-            RuntimeError: If job fails
-        """
-        start_time = time.time()
-        elapsed = 0
-
-        while elapsed < timeout:
-            status = self.get_job_status(job_id)
-
-            print(f"Job {job_id}: {status.get('status', 'UNKNOWN')} (elapsed: {elapsed}s)")
-
-            if status.get("status") == "COMPLETED":
-                print("✓ Job completed successfully")
-                return status
-            elif status.get("status") == "FAILED":
-                error_msg = status.get("error", "Unknown error")
-                raise RuntimeError(f"Job failed: {error_msg}")
-
-            time.sleep(poll_interval)
-            elapsed = int(time.time() - start_time)
-
-        raise TimeoutError(f"Job did not complete within {timeout} seconds")
-
-
-def test_endpoint(args: argparse.Namespace) -> None:
+async def test_endpoint(args: argparse.Namespace, client: RunPodJobClient) -> None:
     """Test RunPod endpoint connectivity"""
     print("Testing RunPod endpoint connectivity...")
     print(f"Endpoint ID: {args.endpoint_id}")
 
     try:
-        client = RunPodClient(args.endpoint_id, args.api_key)
-
         # Submit a simple test job
         test_payload = {
             "test": True,
@@ -146,12 +43,12 @@ def test_endpoint(args: argparse.Namespace) -> None:
         }
 
         print("Submitting test job...")
-        job_id = client.submit_job(test_payload)
+        job_id = await client.submit(test_payload)
         print(f"✓ Test job submitted successfully (Job ID: {job_id})")
 
         # Wait for result
         print("Waiting for result...")
-        result = client.wait_for_job(job_id, timeout=60)
+        result = await client.wait(job_id, timeout=60, on_status=_print_status)
 
         print("\n✓ Test successful!")
         print(json.dumps(result, indent=2))
@@ -161,11 +58,10 @@ def test_endpoint(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
-def get_status(args: argparse.Namespace) -> None:
+async def get_status(args: argparse.Namespace, client: RunPodJobClient) -> None:
     """Get status of a submitted job"""
     try:
-        client = RunPodClient(args.endpoint_id, args.api_key)
-        status = client.get_job_status(args.job_id)
+        status = await client.status(args.job_id)
 
         print(json.dumps(status, indent=2))
 
@@ -174,11 +70,21 @@ def get_status(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
-def submit_job(args: argparse.Namespace) -> None:
-    """Submit a meeting processing job"""
+async def cancel_job(args: argparse.Namespace, client: RunPodJobClient) -> None:
+    """Cancel a submitted job"""
     try:
-        client = RunPodClient(args.endpoint_id, args.api_key)
+        status = await client.cancel(args.job_id)
+
+        print(json.dumps(status, indent=2))
+
+    except Exception as e:
+        print(f"✗ Failed to cancel job: {e}", file=sys.stderr)
+        sys.exit(1)
+
 
+async def submit_job(args: argparse.Namespace, client: RunPodJobClient) -> None:
+    """Submit a meeting processing job"""
+    try:
         # Build job input
         input_data = {
             "meeting_id": args.meeting_id,
@@ -194,13 +100,13 @@ def submit_job(args: argparse.Namespace) -> None:
         if args.audio_s3_key:
             print(f"Audio S3 Key: {args.audio_s3_key}")
 
-        job_id = client.submit_job(input_data)
+        job_id = await client.submit(input_data)
         print(f"✓ Job submitted successfully (Job ID: {job_id})")
 
         # Optionally wait for completion
         if args.wait:
             print("\nWaiting for job completion...")
-            result = client.wait_for_job(job_id, timeout=args.timeout)
+            result = await client.wait(job_id, timeout=args.timeout, on_status=_print_status)
             print("\n✓ Job completed!")
             print(json.dumps(result, indent=2))
         else:
@@ -215,8 +121,8 @@ def submit_job(args: argparse.Namespace) -> None:
         sys.exit(1)
 
 
-def batch_submit(args: argparse.Namespace) -> None:
-    """Submit multiple meetings for batch processing"""
+async def batch_submit(args: argparse.Namespace, client: RunPodJobClient) -> None:
+    """Submit multiple meetings for batch processing (concurrently)"""
     try:
         # Read meeting data from file
         if not os.path.exists(args.file):
@@ -230,38 +136,54 @@ def batch_submit(args: argparse.Namespace) -> None:
             print("✗ File must contain a JSON array of meetings", file=sys.stderr)
             sys.exit(1)
 
-        client = RunPodClient(args.endpoint_id, args.api_key)
-        results = []
-
-        print(f"Submitting {len(meetings)} meetings for batch processing...")
-
-        for i, meeting in enumerate(meetings, 1):
-            print(f"[{i}/{len(meetings)}] Submitting {meeting.get('meeting_id')}...")
+        if args.delay:
+            # Paced submission: one at a time with a pause in between
+            print(f"Submitting {len(meetings)} meetings for batch processing ({args.delay}s apart)...")
+            job_ids: list[Any] = []
+            for i, meeting in enumerate(meetings):
+                if i:
+                    await asyncio.sleep(args.delay)
+                try:
+                    job_ids.append(await client.submit(meeting))
+                except Exception as e:
+                    job_ids.append(e)
+        else:
+            print(f"Submitting {len(meetings)} meetings for batch processing (concurrency {args.concurrency})...")
+            job_ids = await client.submit_many(meetings)
 
-            try:
-                job_id = client.submit_job(meeting)
+        results = []
+        for meeting, job_id in zip(meetings, job_ids):
+            if isinstance(job_id, BaseException):
                 results.append(
                     {
                         "meeting_id": meeting.get("meeting_id"),
-                        "job_id": job_id,
-                        "status": "submitted",
+                        "status": "failed",
+                        "error": str(job_id),
                     }
                 )
-                print(f"  ✓ Job ID: {job_id}")
-
-                # Optional delay between submissions
-                if args.delay:
-                    time.sleep(args.delay)
-
-            except Exception as e:
+                print(f"  ✗ {meeting.get('meeting_id')}: {job_id}")
+            else:
                 results.append(
                     {
                         "meeting_id": meeting.get("meeting_id"),
-                        "status": "failed",
-                        "error": str(e),
+                        "job_id": job_id,
+                        "status": "submitted",
                     }
                 )
-                print(f"  ✗ Failed: {e}")
+                print(f"  ✓ {meeting.get('meeting_id')}: Job ID {job_id}")
+
+        # Optionally wait for all submitted jobs
+        if args.wait:
+            submitted = [r for r in results if r["status"] == "submitted"]
+            print(f"\nWaiting for {len(submitted)} jobs...")
+            finals = await client.wait_many(
+                [r["job_id"] for r in submitted], timeout=args.timeout, on_status=_print_status
+            )
+            for entry, final in zip(submitted, finals):
+                if isinstance(final, BaseException):
+                    entry.update({"status": "failed", "error": str(final)})
+                else:
+                    entry.update({"status": final.get("status", "COMPLETED").lower(), "output": final.get("output")})
 
         # Write results
         output_file = args.output or "batch_results.json"
@@ -271,15 +193,26 @@ def batch_submit(args: argparse.Namespace) -> None:
         print(f"\n✓ Batch submission complete!")
         print(f"Results saved to: {output_file}")
 
-        successful = sum(1 for r in results if r["status"] == "submitted")
         failed = sum(1 for r in results if r["status"] == "failed")
-        print(f"Submitted: {successful}, Failed: {failed}")
+        print(f"Succeeded: {len(results) - failed}, Failed: {failed}")
 
     except Exception as e:
         print(f"✗ Batch submission failed: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+async def run_command(args: argparse.Namespace) -> None:
+    """Run a command with a RunPod client whose connections are closed afterwards"""
+    async with httpx.AsyncClient() as http_client:
+        client = RunPodJobClient(
+            args.endpoint_id,
+            args.api_key,
+            max_concurrency=getattr(args, "concurrency", 16),
+            http_client=http_client,
+        )
+        await args.func(args, client)
+
+
 def main() -> None:
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -309,6 +242,11 @@ def main() -> None:
     status_parser.add_argument("--job-id", required=True, help="RunPod job ID")
     status_parser.set_defaults(func=get_status)
 
+    # cancel-job command
+    cancel_parser = subparsers.add_parser("cancel-job", help="Cancel a queued or running job")
+    cancel_parser.add_argument("--job-id", required=True, help="RunPod job ID")
+    cancel_parser.set_defaults(func=cancel_job)
+
     # submit-job command
     submit_parser = subparsers.add_parser(
         "submit-job", help="Submit a meeting processing job"
@@ -335,7 +273,16 @@ def main() -> None:
         "--output", help="Output file for results (default: batch_results.json)"
     )
     batch_parser.add_argument(
-        "--delay", type=float, help="Delay between submissions in seconds"
+        "--concurrency", type=int, default=8, help="Maximum concurrent RunPod API requests (default: 8)"
+    )
+    batch_parser.add_argument(
+        "--delay", type=float, help="Delay between submissions in seconds (submits one at a time)"
+    )
+    batch_parser.add_argument(
+        "--wait", action="store_true", help="Wait for all submitted jobs to finish"
+    )
+    batch_parser.add_argument(
+        "--timeout", type=int, default=3600, help="Timeout per job in seconds when waiting (default: 3600)"
     )
     batch_parser.set_defaults(func=batch_submit)
 
@@ -358,7 +305,7 @@ def main() -> None:
         sys.exit(1)
 
     # Execute command
-    args.func(args)
+    asyncio.run(run_command(args))
 
 
 if __name__ == "__main__":